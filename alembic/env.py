@@ -7,8 +7,9 @@ from dotenv import load_dotenv
 
 # Import all models
 from app.models.user import User
+from app.models.UserHistory import UserHistory
 
-from app.database import Base
+from app.models.base import Base
 
 from alembic import context
 
@@ -0,0 +1,43 @@
+"""add user_history (user_id, created_at) index
+
+Revision ID: 3f9c2a7d1b64
+Revises: 
+Create Date: 2026-10-18 16:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d1b64'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so user_history stays writable during the migration
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_user_history_user_id_created_at",
+            "user_history",
+            ["user_id", "created_at"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_user_history_user_id_created_at",
+            table_name="user_history",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
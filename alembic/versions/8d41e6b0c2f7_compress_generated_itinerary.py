@@ -0,0 +1,87 @@
+"""store user_history.generated_itinerary zstd-compressed
+
+Revision ID: 8d41e6b0c2f7
+Revises: 3f9c2a7d1b64
+Create Date: 2026-10-18 16:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import zstandard
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41e6b0c2f7'
+down_revision: Union[str, None] = '3f9c2a7d1b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+# Same level as app.models.types.ZSTD_LEVEL; any level decompresses the same way
+ZSTD_LEVEL = 10
+
+
+def _copy_column(source: str, source_type, target: str, target_type, convert) -> None:
+    """Fills `target` from `source` in id order, BATCH_SIZE rows at a time."""
+    history = sa.table(
+        "user_history",
+        sa.column("id", sa.UUID()),
+        sa.column(source, source_type),
+        sa.column(target, target_type),
+    )
+    update = (
+        history.update()
+        .where(history.c.id == sa.bindparam("row_id"))
+        .values({target: sa.bindparam("value")})
+    )
+    conn = op.get_bind()
+    last_id = None
+    while True:
+        query = sa.select(history.c.id, history.c[source]).order_by(history.c.id).limit(BATCH_SIZE)
+        if last_id is not None:
+            query = query.where(history.c.id > last_id)
+        rows = conn.execute(query).all()
+        if not rows:
+            break
+        conn.execute(update, [{"row_id": row[0], "value": convert(row[1])} for row in rows])
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+
+    op.add_column("user_history", sa.Column("generated_itinerary_zstd", sa.LargeBinary(), nullable=True))
+    _copy_column(
+        "generated_itinerary", sa.Text(),
+        "generated_itinerary_zstd", sa.LargeBinary(),
+        lambda text: compressor.compress((text or "").encode("utf-8")),
+    )
+    op.drop_column("user_history", "generated_itinerary")
+    op.alter_column(
+        "user_history",
+        "generated_itinerary_zstd",
+        new_column_name="generated_itinerary",
+        nullable=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    decompressor = zstandard.ZstdDecompressor()
+
+    op.add_column("user_history", sa.Column("generated_itinerary_text", sa.Text(), nullable=True))
+    _copy_column(
+        "generated_itinerary", sa.LargeBinary(),
+        "generated_itinerary_text", sa.Text(),
+        lambda data: decompressor.decompress(data).decode("utf-8"),
+    )
+    op.drop_column("user_history", "generated_itinerary")
+    op.alter_column(
+        "user_history",
+        "generated_itinerary_text",
+        new_column_name="generated_itinerary",
+        nullable=False,
+    )
@@ -0,0 +1,42 @@
+# Destinations the local trip parser recognises without an LLM call.
+# Canonical spelling first; ALIASES maps alternative spellings onto it.
+
+DESTINATIONS = (
+    # Europe
+    "Amsterdam", "Athens", "Barcelona", "Berlin", "Bordeaux", "Brussels", "Budapest",
+    "Copenhagen", "Dublin", "Dubrovnik", "Edinburgh", "Florence", "Geneva", "Granada",
+    "Hamburg", "Helsinki", "Istanbul", "Krakow", "Lisbon", "London", "Lyon", "Madrid",
+    "Manchester", "Marseille", "Milan", "Munich", "Naples", "Oslo", "Paris",
+    "Porto", "Prague", "Reykjavik", "Rome", "Santorini", "Seville", "Stockholm",
+    "Tallinn", "Valencia", "Venice", "Vienna", "Warsaw", "Zurich",
+    # Americas
+    "Austin", "Bogota", "Boston", "Buenos Aires", "Cancun", "Cartagena", "Chicago",
+    "Havana", "Honolulu", "Las Vegas", "Lima", "Los Angeles", "Mexico City", "Miami",
+    "Montreal", "Nashville", "New Orleans", "New York", "Oaxaca", "Portland",
+    "Rio de Janeiro", "San Francisco", "Santiago", "Sao Paulo", "Seattle", "Toronto",
+    "Vancouver", "Washington",
+    # Africa & Middle East
+    "Abuja", "Accra", "Addis Ababa", "Cairo", "Cape Town", "Casablanca", "Dakar",
+    "Doha", "Dubai", "Johannesburg", "Lagos", "Marrakech", "Nairobi", "Tel Aviv",
+    "Zanzibar",
+    # Asia & Oceania
+    "Auckland", "Bali", "Bangkok", "Beijing", "Chiang Mai", "Delhi", "Goa", "Hanoi",
+    "Ho Chi Minh City", "Hong Kong", "Jaipur", "Kuala Lumpur", "Kyoto", "Manila",
+    "Melbourne", "Mumbai", "Osaka", "Seoul", "Shanghai", "Singapore", "Sydney",
+    "Taipei", "Tokyo",
+)
+
+ALIASES = {
+    "nyc": "New York",
+    "new york city": "New York",
+    "rio": "Rio de Janeiro",
+    "saigon": "Ho Chi Minh City",
+    "são paulo": "Sao Paulo",
+    "bogotá": "Bogota",
+    "kraków": "Krakow",
+    "zürich": "Zurich",
+    "marrakesh": "Marrakech",
+    "new delhi": "Delhi",
+    "washington dc": "Washington",
+    "washington d.c.": "Washington",
+}
@@ -15,6 +15,14 @@ class Settings(BaseSettings):
     QLOO_API_KEY:str
     QLOO_BASE:str
     WEATHERAPPID:str
+    # Connection pool per worker process, for the primary and the replica each
+    POSTGRES_POOL_SIZE: int = 5
+    POSTGRES_MAX_OVERFLOW: int = 10
+    POSTGRES_POOL_TIMEOUT: float = 30
+    POSTGRES_POOL_RECYCLE: int = 1800
+    # Optional read replica (postgresql+asyncpg://...) for history reads;
+    # unset, those reads go to the primary
+    POSTGRES_REPLICA_URL: str | None = None
 
     class Config:
         env_file = ".env"
@@ -1,14 +1,18 @@
 import os
+import time
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncSession,
     async_sessionmaker,
     AsyncEngine,
 )
-from sqlalchemy.orm import declarative_base
-from sqlalchemy.schema import MetaData
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from dotenv import load_dotenv
 
+from app.config import settings
+from app.models.base import Base, metadata  # noqa: F401  (re-exported)
+from app.shared.metrics import register_db_pool
+
 load_dotenv()
 
 DATABASE_URL = (
@@ -20,44 +24,134 @@ DATABASE_URL = (
 
 _engine = None
 _SessionLocal = None
+_read_engine = None
+_ReadSessionLocal = None
 
-metadata = MetaData(
-    naming_convention={
-        "ix": "ix_%(column_0_label)s",
-        "uq": "uq_%(table_name)s_%(column_0_name)s",
-        "ck": "ck_%(table_name)s_%(constraint_name)s",
-        "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
-        "pk": "pk_%(table_name)s",
-    }
-)
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that also counts checkouts that had to wait for a connection
+    (pool and overflow both exhausted) and how long they waited. With
+    `max_overflow=-1` the pool opens a connection instead, so nothing waits.
+    """
+
+    def __init__(self, *args, max_overflow: int = 10, **kwargs):
+        super().__init__(*args, max_overflow=max_overflow, **kwargs)
+        self.max_overflow = max_overflow
+        self.waiting = 0
+        self.waits_total = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _exhausted(self) -> bool:
+        if self.max_overflow < 0:
+            return False
+        return self.checkedin() == 0 and self.checkedout() >= self.size() + self.max_overflow
+
+    def connect(self):
+        if not self._exhausted():
+            return super().connect()
 
-Base = declarative_base(metadata=metadata)
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            waited = time.perf_counter() - started
+            self.waiting -= 1
+            self.waits_total += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        poolclass=TimedQueuePool,
+        pool_pre_ping=True,
+        pool_size=settings.POSTGRES_POOL_SIZE,
+        max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+        pool_timeout=settings.POSTGRES_POOL_TIMEOUT,
+        pool_recycle=settings.POSTGRES_POOL_RECYCLE,
+    )
+
+
+def _create_sessionmaker(engine: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(
+        bind=engine,
+        expire_on_commit=False,
+        autoflush=False,
+        class_=AsyncSession,
+    )
 
 
 def get_engine():
     global _engine
     if _engine is None:
-        _engine = create_async_engine(
-            DATABASE_URL,
-            pool_pre_ping=True,
-            pool_size=5,
-            max_overflow=10,
-            pool_timeout=30,
-            pool_recycle=1800,
-        )
+        _engine = _create_engine(DATABASE_URL)
+        register_db_pool("primary", lambda: pool_stats(_engine))
     return _engine
 
 
+def get_read_engine():
+    """Engine on the read replica, or the primary when no replica is configured."""
+    global _read_engine
+    if _read_engine is None:
+        if settings.POSTGRES_REPLICA_URL:
+            _read_engine = _create_engine(settings.POSTGRES_REPLICA_URL)
+            register_db_pool("replica", lambda: pool_stats(_read_engine))
+        else:
+            _read_engine = get_engine()
+    return _read_engine
+
+
 def get_sessionmaker():
     global _SessionLocal
     if _SessionLocal is None:
-        _SessionLocal = async_sessionmaker(
-            bind=get_engine(),
-            expire_on_commit=False,
-            autoflush=False,
-            class_=AsyncSession,
-        )
+        _SessionLocal = _create_sessionmaker(get_engine())
     return _SessionLocal
 
 
-async_session_maker = get_sessionmaker()
\ No newline at end of file
+def get_read_sessionmaker():
+    """
+    Sessions for reads that tolerate replication lag. Nothing written
+    through them reaches the primary.
+    """
+    global _ReadSessionLocal
+    if _ReadSessionLocal is None:
+        _ReadSessionLocal = _create_sessionmaker(get_read_engine())
+    return _ReadSessionLocal
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    """Snapshot of connection pool usage for an engine."""
+    pool = engine.pool
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": getattr(pool, "max_overflow", None),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # overflow() counts down from -pool_size until the pool is full
+        "overflow": max(pool.overflow(), 0),
+        "requests_waiting": getattr(pool, "waiting", 0),
+        "waits_total": getattr(pool, "waits_total", 0),
+        "wait_seconds_total": round(getattr(pool, "wait_seconds_total", 0.0), 6),
+        "wait_seconds_max": round(getattr(pool, "wait_seconds_max", 0.0), 6),
+    }
+
+
+def all_pool_stats() -> dict:
+    stats = {"primary": pool_stats(get_engine())}
+    if get_read_engine() is not get_engine():
+        stats["replica"] = pool_stats(get_read_engine())
+    return stats
+
+
+async def dispose_engines():
+    if _read_engine is not None and _read_engine is not _engine:
+        await _read_engine.dispose()
+    if _engine is not None:
+        await _engine.dispose()
+
+
+async_session_maker = get_sessionmaker()
+read_session_maker = get_read_sessionmaker()
\ No newline at end of file
@@ -1,4 +1,5 @@
 import os
+import logging
 from jose import jwt, JWTError
 from typing import AsyncIterator, Annotated
 from contextlib import asynccontextmanager
@@ -12,33 +13,45 @@ from app.services.auth_service import AuthService
 from app.repositories.user_repo import UserRepository
 from app.external_adapters import google
 from app.schemas.auth import TokenData
+from app.schemas.user import CurrentUser
+from app.services.user_cache import cache_user, get_cached_user
 
-from .database import get_sessionmaker
+from .database import get_read_sessionmaker, get_sessionmaker
 
 # TODO: Centralize this configs
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
 ALGORITHM = "HS256"
 
+logger = logging.getLogger(__name__)
+
 
 @asynccontextmanager
-async def get_async_session() -> AsyncIterator[AsyncSession]:
+async def get_async_session(session_factory=None, read_only: bool = False) -> AsyncIterator[AsyncSession]:
     """Proper async context manager for database sessions
-    with full transaction handling"""
-    session_factory = get_sessionmaker()
+    with full transaction handling.
+
+    The unit of work commits once, on exit; code using the session should
+    only flush. With `read_only`, the transaction is opened READ ONLY and
+    simply ends when the connection goes back to the pool, without a commit.
+    """
+    session_factory = session_factory or get_sessionmaker()
     session = session_factory()
 
-    print("Database session created")
+    logger.debug("Database session created")
     try:
+        if read_only:
+            await session.connection(execution_options={"postgresql_readonly": True})
         yield session
-        await session.commit()
-        print("Transaction committed")
+        if not read_only:
+            await session.commit()
+            logger.debug("Transaction committed")
     except Exception as e:
         await session.rollback()
-        print(f"Transaction rolled back: {str(e)}")
+        logger.warning("Transaction rolled back: %s", e)
         raise
     finally:
         await session.close()
-        print("Session closed")
+        logger.debug("Session closed")
 
 
 async def get_db() -> AsyncIterator[AsyncSession]:
@@ -46,6 +59,12 @@ async def get_db() -> AsyncIterator[AsyncSession]:
         yield session
 
 
+async def get_read_db() -> AsyncIterator[AsyncSession]:
+    """Read-only session on the read replica when one is configured, else the primary."""
+    async with get_async_session(get_read_sessionmaker(), read_only=True) as session:
+        yield session
+
+
 async def get_user_repo(db: AsyncSession = Depends(get_db)):
     return UserRepository(db)
 
@@ -67,13 +86,14 @@ oauth2_scheme = HTTPBearer()
 
 
 async def get_current_user(
-    user_repo: UserRepoDep,
     credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
-):
+) -> CurrentUser:
+    """
+    The user behind the bearer token. Served from the user cache when
+    possible; a database session is only opened on a cache miss.
+    """
     token = credentials.credentials
 
-    print(f"Credentials {token}")
-
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -89,7 +109,15 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = await user_repo.get_by_email(token_data.email)
-    if user is None:
-        raise credentials_exception
+    user = await get_cached_user(token_data.email)
+    if user is not None:
+        return user
+
+    async with get_async_session(read_only=True) as session:
+        db_user = await UserRepository(session).get_by_email(token_data.email)
+        if db_user is None:
+            raise credentials_exception
+        user = CurrentUser.model_validate(db_user)
+
+    await cache_user(user)
     return user
@@ -1,9 +1,12 @@
 import os
+import logging
 from app.shared.external_api_client import ExternalAPIClient
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 
 class GoogleAdapter:
     def __init__(
@@ -22,12 +25,12 @@ class GoogleAdapter:
     async def get_google_user_info(self, access_token: str):
         headers = {"Authorization": f"Bearer {access_token}"}
 
-        result = await self.client._get(
+        result = await self.client.get(
             endpoint=self.user_info_endpoint,
             headers=headers,
         )
 
-        print(f"GOOGLE USER INFO {str(result)}")
+        logger.debug("Fetched Google user info", extra={"fields": sorted(result) if isinstance(result, dict) else None})
 
         return result
 
@@ -40,14 +43,15 @@ class GoogleAdapter:
             "grant_type": "authorization_code",
         }
 
-        print(f"EXCHANGING TOKEN WITH DATA {str(data)}")
+        # `data` carries the client secret and auth code; log only the target
+        logger.debug("Exchanging Google auth code", extra={"redirect_uri": data["redirect_uri"]})
 
         tokens = await self.oauth_client.post(
             endpoint=self.token_endpoint,
             data=data,
         )
 
-        print(f"TOKEN RESPONSE {str(tokens)}")
+        logger.debug("Received Google tokens", extra={"fields": sorted(tokens) if isinstance(tokens, dict) else None})
 
         return tokens
 
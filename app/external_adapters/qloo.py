@@ -0,0 +1,39 @@
+import os
+import httpx
+from app.shared.external_api_client import ExternalAPIClient
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class QlooAdapter:
+    def __init__(self, client: ExternalAPIClient, api_key: str | None):
+        self.client = client
+        self.api_key = api_key
+
+    async def get_insight(self, endpoint: str):
+        return await self.client.get(
+            endpoint=f"/v2{endpoint}",
+            headers={"X-Api-Key": self.api_key},
+        )
+
+
+qloo_client = ExternalAPIClient(
+    name="qloo",
+    base_url=os.getenv("QLOO_BASE_URL", "https://hackathon.api.qloo.com"),
+    timeout=httpx.Timeout(
+        float(os.getenv("QLOO_HTTP_TIMEOUT", "15")),
+        pool=float(os.getenv("QLOO_POOL_TIMEOUT", "5")),
+    ),
+    limits=httpx.Limits(
+        max_connections=int(os.getenv("QLOO_MAX_CONNECTIONS", "20")),
+        max_keepalive_connections=int(os.getenv("QLOO_MAX_KEEPALIVE_CONNECTIONS", "10")),
+        keepalive_expiry=float(os.getenv("QLOO_KEEPALIVE_EXPIRY", "60")),
+    ),
+    http2=os.getenv("QLOO_HTTP2", "false").lower() == "true",
+)
+
+qloo_adapter = QlooAdapter(
+    client=qloo_client,
+    api_key=os.getenv("QLOO_API_KEY"),
+)
@@ -1,6 +1,9 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 # Routers
 from app.routers import auth as auth_router, student_route, trip_route
@@ -11,13 +14,49 @@ from app.routers import itinerary_route
 
 import logging
 
+from app.database import dispose_engines
+from app.external_adapters.qloo import qloo_client
+from app.services.history_writer import history_writer
+from app.services.itinerary_job_service import itinerary_jobs
+from app.services.openai_client import client as openai_client
+from app.services.text_extractor_service import extraction_pool
+from app.services.weather_service import weather_client
 from app.shared.errors import AppError
+from app.shared.log_config import setup_logging
+from app.shared.metrics import render_metrics
+from app.shared.middleware import RequestIdMiddleware, RequestMetricsMiddleware
+from app.shared.redis_client import close_redis
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # Long-lived pooled HTTP clients are opened once per worker and
+    # closed on shutdown so connections are reused across requests.
+    await qloo_client.open()
+    await weather_client.open()
+    await history_writer.start()
+    await itinerary_jobs.start()
+    try:
+        yield
+    finally:
+        await itinerary_jobs.stop()
+        # After the job workers, so their last itineraries are flushed too
+        await history_writer.stop()
+        await dispose_engines()
+        await qloo_client.close()
+        await weather_client.close()
+        await openai_client.close()
+        # Waits for the worker processes to exit
+        await asyncio.to_thread(extraction_pool.shutdown)
+        await close_redis()
+
 
 # Initialize app
 app = FastAPI(
     title="FastAPI + MySQL Starter",
     description="A sample FastAPI app with MySQL and modular structure",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Create the main API router with a shared prefix
@@ -33,8 +72,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Basic logging config
-logging.basicConfig(level=logging.INFO)
+# Added last, so it runs first and its id is set for the metrics and the app
+app.add_middleware(RequestMetricsMiddleware)
+app.add_middleware(RequestIdMiddleware)
+
+# Queue-backed JSON logging, see app/shared/log_config.py
+setup_logging()
 logger = logging.getLogger(__name__)
 
 
@@ -49,12 +92,18 @@ async def app_exception_handler(_: Request, err: AppError):
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
-    logger.error(f"Error occurred on path {request.url.path}: {str(exc)}")
+    # Runs outside the request-id middleware, so the id is passed explicitly
+    request_id = getattr(request.state, "request_id", "-")
+    logger.error(
+        "Error occurred on path %s: %s", request.url.path, exc,
+        exc_info=exc, extra={"request_id": request_id},
+    )
     return JSONResponse(
         status_code=500,
         content={
             "detail": "An unexpected error occurred. Please try again later.",
         },
+        headers={"X-Request-ID": request_id},
     )
 
 
@@ -64,6 +113,13 @@ def read_root():
     return {"message": "Welcome to FastAPI + MySQL 🚀"}
 
 
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 
 
 # Register your sub-routers to the main router
@@ -1,13 +1,17 @@
 from datetime import datetime
 from uuid import UUID as PyUUID
-from sqlalchemy import JSON, UUID, Column, String, Text, DateTime, ForeignKey, func
-from sqlalchemy.orm import relationship
-from app.database import Base
+from sqlalchemy import JSON, UUID, Column, String, Text, DateTime, ForeignKey, Index, func
+from sqlalchemy.orm import deferred, relationship
+from app.models.base import Base
+from app.models.types import ZstdText
 
 class UserHistory(Base):
     __tablename__ = "user_history"
+    __table_args__ = (
+        # Serves the per-user, newest-first history pages
+        Index("ix_user_history_user_id_created_at", "user_id", "created_at"),
+    )
 
-    
     id = Column(UUID(as_uuid=True), primary_key=True, nullable=False)
     prompt = Column(Text, nullable=False)
     destination = Column(String, nullable=True)
@@ -15,7 +19,8 @@ class UserHistory(Base):
     tastes = Column(Text, nullable=True)
     style = Column(Text, nullable=True)
 
-    generated_itinerary = Column(Text, nullable=False)
+    # Stored zstd-compressed and deferred: only loaded when asked for (detail fetch)
+    generated_itinerary = deferred(Column(ZstdText, nullable=False))
     
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
 
@@ -30,8 +35,9 @@ class UserHistory(Base):
 #     duration VARCHAR,
 #     tastes TEXT,
 #     style TEXT,
-#     generated_itinerary TEXT,
+#     generated_itinerary BYTEA NOT NULL,  -- zstd-compressed
 #     user_id UUID NOT NULL REFERENCES users(id),
 #     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
 #     updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-# );
\ No newline at end of file
+# );
+# CREATE INDEX ix_user_history_user_id_created_at ON user_history (user_id, created_at);
\ No newline at end of file
@@ -0,0 +1,16 @@
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.schema import MetaData
+
+# Kept free of engine and settings imports so alembic can load the models
+# without the app's configuration.
+metadata = MetaData(
+    naming_convention={
+        "ix": "ix_%(column_0_label)s",
+        "uq": "uq_%(table_name)s_%(column_0_name)s",
+        "ck": "ck_%(table_name)s_%(constraint_name)s",
+        "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
+        "pk": "pk_%(table_name)s",
+    }
+)
+
+Base = declarative_base(metadata=metadata)
@@ -1,7 +1,7 @@
 from sqlalchemy import Column, DateTime, func, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.types import String, JSON
-from app.database import Base
+from app.models.base import Base
 from uuid import UUID as PyUUID
 
 class ClaimResult(Base):
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, DateTime, Integer, String, func
-from app.database import Base
+from app.models.base import Base
 
 class Student(Base):
     __tablename__ = "students"
@@ -0,0 +1,28 @@
+import zstandard
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+# Itineraries are a few KB of markdown; level 10 compresses them well and
+# still takes well under a millisecond per row.
+ZSTD_LEVEL = 10
+
+
+def compress_text(value: str) -> bytes:
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(value.encode("utf-8"))
+
+
+def decompress_text(value: bytes) -> str:
+    return zstandard.ZstdDecompressor().decompress(value).decode("utf-8")
+
+
+class ZstdText(TypeDecorator):
+    """Text stored zstd-compressed in a binary column; compressed and decompressed transparently."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else decompress_text(bytes(value))
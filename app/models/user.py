@@ -1,6 +1,6 @@
 from sqlalchemy import String, DateTime, UUID, Column, func
 from sqlalchemy.orm import Mapped, mapped_column
-from app.database import Base
+from app.models.base import Base
 from datetime import datetime, timezone
 from uuid import UUID as PyUUID
 
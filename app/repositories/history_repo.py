@@ -0,0 +1,128 @@
+from datetime import datetime
+from uuid import UUID
+from typing import AsyncIterator, List, Optional, Sequence
+
+from sqlalchemy import Row, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+
+from app.models.UserHistory import UserHistory
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+# Everything but the (multi-KB) itinerary body
+SUMMARY_COLUMNS = (
+    UserHistory.id,
+    UserHistory.user_id,
+    UserHistory.prompt,
+    UserHistory.destination,
+    UserHistory.duration,
+    UserHistory.tastes,
+    UserHistory.style,
+    UserHistory.created_at,
+    UserHistory.updated_at,
+)
+FULL_COLUMNS = SUMMARY_COLUMNS + (UserHistory.generated_itinerary,)
+
+
+def serialize_history(history, include_itinerary: bool = False) -> dict:
+    item = {
+        "id": str(history.id),
+        "user_id": str(history.user_id),
+        "prompt": history.prompt,
+        "destination": history.destination,
+        "duration": history.duration,
+        "tastes": history.tastes,
+        "style": history.style,
+        "created_at": history.created_at.isoformat(),
+        "updated_at": history.updated_at.isoformat(),
+    }
+    if include_itinerary:
+        item["generated_itinerary"] = history.generated_itinerary
+    return item
+
+
+class HistoryRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, history_id: UUID) -> Optional[UserHistory]:
+        """A single entry with its (decompressed) itinerary body loaded."""
+        return await self.db.get(
+            UserHistory,
+            history_id,
+            options=[undefer(UserHistory.generated_itinerary)],
+        )
+
+    async def insert_many(self, rows: List[dict]):
+        """
+        One multi-row INSERT. Rows carry their own ids, so a retry after an
+        ambiguous failure (committed, but the connection dropped) is a no-op.
+        """
+        statement = insert(UserHistory).values(rows).on_conflict_do_nothing(index_elements=[UserHistory.id])
+        await self.db.execute(statement)
+
+    async def page(
+        self,
+        user_id: Optional[UUID] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        summary: bool = False,
+    ) -> tuple[List[Row], Optional[str]]:
+        """
+        One page of history, newest first, using keyset pagination on
+        (created_at, id) so later pages cost the same as the first.
+
+        Returns:
+            tuple[List[Row], Optional[str]]: The rows and the cursor for the
+            next page, or None when this is the last page.
+        """
+        columns: Sequence = SUMMARY_COLUMNS if summary else FULL_COLUMNS
+        query = select(*columns).order_by(UserHistory.created_at.desc(), UserHistory.id.desc())
+
+        if user_id is not None:
+            query = query.where(UserHistory.user_id == user_id)
+        if cursor is not None:
+            created_at, history_id = decode_cursor(cursor)
+            query = query.where(tuple_(UserHistory.created_at, UserHistory.id) < (created_at, history_id))
+
+        # One extra row tells whether another page exists
+        result = await self.db.execute(query.limit(limit + 1))
+        rows = list(result.all())
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+        return rows, next_cursor
+
+    async def stream(
+        self,
+        user_id: Optional[UUID] = None,
+        destination: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        summary: bool = False,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Row]:
+        """
+        Every matching row, oldest first, read through a server-side cursor
+        `batch_size` rows at a time so memory does not grow with the table.
+        """
+        columns: Sequence = SUMMARY_COLUMNS if summary else FULL_COLUMNS
+        query = select(*columns).order_by(UserHistory.created_at, UserHistory.id)
+
+        if user_id is not None:
+            query = query.where(UserHistory.user_id == user_id)
+        if destination is not None:
+            query = query.where(func.lower(UserHistory.destination) == destination.lower())
+        if created_from is not None:
+            query = query.where(UserHistory.created_at >= created_from)
+        if created_to is not None:
+            query = query.where(UserHistory.created_at < created_to)
+
+        result = await self.db.stream(query.execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            for row in partition:
+                yield row
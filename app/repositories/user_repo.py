@@ -5,11 +5,18 @@ from app.schemas.user import UserCreate
 from uuid import UUID, uuid4
 from typing import Self
 
+# Session.info key collecting the emails of users changed in the current
+# transaction; the user cache drops them once the transaction commits.
+CHANGED_USER_EMAILS = "changed_user_emails"
+
 
 class UserRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    def _mark_changed(self, email: str):
+        self.db.info.setdefault(CHANGED_USER_EMAILS, set()).add(email)
+
     async def get(self, user_id: UUID) -> User | None:
         return await self.db.get(User, user_id)
 
@@ -26,6 +33,22 @@ class UserRepository:
         )
         self.db.add(db_user)
         await self.db.flush()
+        self._mark_changed(db_user.email)
+        return db_user
+
+    async def update(self, user_id: UUID, **changes) -> User | None:
+        """Applies profile changes (e.g. name, email); cached copies are dropped on commit."""
+        db_user = await self.get(user_id)
+        if db_user is None:
+            return None
+
+        previous_email = db_user.email
+        for field, value in changes.items():
+            setattr(db_user, field, value)
+        await self.db.flush()
+
+        self._mark_changed(previous_email)
+        self._mark_changed(db_user.email)
         return db_user
 
     @classmethod
@@ -1,18 +1,22 @@
+import logging
 from fastapi import APIRouter
 from app.dependencies import AuthServiceDep
 from app.schemas.auth import AuthRequest, AuthResponse
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
 @router.post("/google/callback", response_model=AuthResponse)
 async def process_google_auth(req: AuthRequest, service: AuthServiceDep):
-    print(f"Received Google auth code: {req.code}")
     """
     Process Google authentication.
     This endpoint receives a Google authentication 
     code, exchanges it for tokens,
     retrieves user information, and returns an authentication response.
     """
+    # The auth code is a credential; never log it
+    logger.info("Received Google auth callback")
 
     return await service.google_login(req.code)
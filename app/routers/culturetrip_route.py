@@ -1,11 +1,16 @@
+import logging
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List
-from app.database import async_session_maker
-from app.routers.student_route import save_user_itinerary
-from app.services.llm_service import fetch_weather_forecast, generate_itinerary
-from app.services.qloo_service import get_insight
+from app.services.llm_service import generate_itinerary, stream_itinerary
+from app.services.trip_planner_service import fetch_culture_insights, save_itinerary_history
+from app.services.weather_service import fetch_weather_forecast
+from app.external_adapters.qloo import qloo_client
+from app.shared.errors import AppError, error_payload
+from app.utils.helpers import SSE_HEADERS, format_sse
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -22,6 +27,11 @@ def read_root():
     return {"message": "Welcome to FastAPI + Qloo 🚀"}
 
 
+@router.get("/qloo/pool-stats")
+def qloo_pool_stats():
+    return qloo_client.pool_stats()
+
+
 @router.post("/plan-trip")
 async def plan_trip(payload: TripPlanRequest):
     destination = payload.destination
@@ -34,40 +44,11 @@ async def plan_trip(payload: TripPlanRequest):
         raise HTTPException(status_code=400, detail="Both 'destination' and at least one 'taste' are required.")
 
     try:
-        all_places = []
-        heatmap_neighborhoods = []
-        demographics_summary = []
-        related_tags = []  # optional: if you want to enrich later
-
-        for taste in tastes:
-            tag = f"urn:tag:genre:{taste}"
-
-            # Basic insights: place recommendations
-            basic = await get_insight(
-                f"/insights/?filter.type=urn:entity:place&signal.interests.tags={tag}&filter.location.query={destination}"
-            )
-            taste_places = [place.get("name") for place in basic.get("data", [])]
-            all_places.extend([{"name": p} for p in taste_places])
-
-            # Demographics: summarize affinity by age/gender
-            demographics = await get_insight(
-                f"/insights/?filter.type=urn:demographics&signal.interests.tags={tag}"
-            )
-            if "data" in demographics:
-                summary = f"For taste '{taste}': " \
-                          + ", ".join([f"{g['group']}s score {g['score']:.2f}" for g in demographics.get("data", {}).get("age", [])])
-                demographics_summary.append(summary)
-
-            # Heatmap: get high-affinity neighborhoods
-            heatmap = await get_insight(
-                f"/insights/?filter.type=urn:heatmap&filter.location.query={destination}&signal.interests.tags={tag}"
-            )
-            heatmap_points = heatmap.get("data", {}).get("points", [])
-            heatmap_neighborhoods.extend([f"Lat:{pt['location']['latitude']:.4f}, Lon:{pt['location']['longitude']:.4f}" for pt in heatmap_points[:3]])
+        insights = await fetch_culture_insights(destination, tastes)
 
-        weather_forecast = fetch_weather_forecast(destination, original_prompt)
+        weather_forecast = await fetch_weather_forecast(destination, original_prompt)
         # Call the LLM itinerary builder
-        itinerary = generate_itinerary(
+        itinerary = await generate_itinerary(
             # openAI_model=request.model,
             openAI_model="gpt-4",
             original_prompt=original_prompt,
@@ -75,30 +56,21 @@ async def plan_trip(payload: TripPlanRequest):
             duration=duration,
             tastes=tastes,
             style=style,
-            qloo_places=all_places,
             weather_forecast=weather_forecast,
-            demographics_summary="\n".join(demographics_summary),
-            related_tags=related_tags,  # optional
-            heatmap_neighborhoods=heatmap_neighborhoods
+            **insights
         )
 
-        tastes_str = ", ".join(tastes)  # tastes is a list
-        style_str = ", ".join(style)    # style is a list
-
         # Step 7: Save to PostgreSQL
-        async with async_session_maker() as db:
-            if getattr(payload, "loggedIn", False) is True:
-                print("📅 Saving User history itinerary")
-                await save_user_itinerary(
-                    db=db,
-                    user_id=getattr(payload, "sessionId", None),
-                    prompt=original_prompt,
-                    destination=destination,
-                    duration=duration,
-                    tastes=tastes_str,
-                    style=style_str,
-                    generated_itinerary=itinerary
-                )
+        await save_itinerary_history(
+            logged_in=getattr(payload, "loggedIn", False),
+            user_id=getattr(payload, "sessionId", None),
+            prompt=original_prompt,
+            destination=destination,
+            duration=duration,
+            tastes=tastes,
+            style=style,
+            itinerary=itinerary
+        )
 
         return {
             "destination": destination,
@@ -108,12 +80,81 @@ async def plan_trip(payload: TripPlanRequest):
             "itinerary": itinerary
         }
 
-    except HTTPException as e:
+    except (HTTPException, AppError) as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
 
+@router.post("/plan-trip/stream")
+async def plan_trip_stream(payload: TripPlanRequest):
+    """
+    Server-sent events variant of /plan-trip.
+
+    Emits `progress` events while insights and weather are gathered, then a
+    `token` event per chunk of itinerary text, and finally `done` with the
+    same body /plan-trip returns. Failures after the stream has started are
+    reported as an `error` event.
+    """
+    destination = payload.destination
+    tastes = payload.tastes
+    style = payload.style
+    duration = payload.duration
+    original_prompt = payload.original_prompt
+
+    if not destination or not tastes:
+        raise HTTPException(status_code=400, detail="Both 'destination' and at least one 'taste' are required.")
+
+    async def events():
+        try:
+            yield format_sse({"stage": "insights"}, event="progress")
+            insights = await fetch_culture_insights(destination, tastes)
+
+            yield format_sse({"stage": "weather"}, event="progress")
+            weather_forecast = await fetch_weather_forecast(destination, original_prompt)
+
+            yield format_sse({"stage": "itinerary"}, event="progress")
+            chunks = []
+            async for token in stream_itinerary(
+                openAI_model="gpt-4",
+                original_prompt=original_prompt,
+                destination=destination,
+                duration=duration,
+                tastes=tastes,
+                style=style,
+                weather_forecast=weather_forecast,
+                **insights
+            ):
+                chunks.append(token)
+                yield format_sse({"text": token}, event="token")
+            itinerary = "".join(chunks)
+
+            # Persist only once the whole itinerary has been streamed
+            await save_itinerary_history(
+                logged_in=getattr(payload, "loggedIn", False),
+                user_id=getattr(payload, "sessionId", None),
+                prompt=original_prompt,
+                destination=destination,
+                duration=duration,
+                tastes=tastes,
+                style=style,
+                itinerary=itinerary
+            )
+
+            yield format_sse({
+                "destination": destination,
+                "tastes": tastes,
+                "style": style,
+                "duration": duration,
+                "itinerary": itinerary
+            }, event="done")
+
+        except Exception as e:
+            yield format_sse(error_payload(e, "Error during culture plan-trip stream"), event="error")
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 # @router.post("/plan-trip")
 # async def plan_trip(payload: TripPlanRequest):
 #     destination = payload.destination
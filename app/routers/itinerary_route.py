@@ -1,122 +1,155 @@
+import logging
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 import httpx
 from pydantic import BaseModel
-from app.database import async_session_maker
 from app.dependencies import get_db
-from app.routers.student_route import save_user_itinerary
-from app.schemas.prompt_request import PromptRequest
-from app.services.trip_extraction_service import generate_trip_json, parse_trip_data
+from app.schemas.prompt_request import BatchPromptRequest, PromptRequest
+from app.services.batch_planner_service import plan_trips_batch
+from app.services.trip_extraction_service import extract_trip_data, generate_trip_json, parse_trip_data
+from app.services.trip_planner_service import (
+    fetch_primary_taste_places,
+    plan_prompt_trip,
+    save_itinerary_history,
+)
+from app.services.itinerary_job_service import get_job, itinerary_jobs
+from app.services.weather_service import fetch_weather_forecast
 from app.services.qloo_service import get_insight
-from app.services.llm_service import fetch_weather_forecast, generate_itinerary
+from app.services.llm_service import stream_itinerary
+from app.shared.errors import AppError, error_payload
+from app.utils.helpers import SSE_HEADERS, format_sse
 import os
 from dotenv import load_dotenv
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 @router.post("/plan-trip")
 async def plan_trip(request: PromptRequest):
-    prompt = request.prompt
-    print("📩 Received prompt:", prompt)
+    logger.debug("Received prompt", extra={"prompt_chars": len(request.prompt), "model": request.model})
 
     try:
-        # 🔹 Step 1: Extract structured trip JSON from prompt
-        json_str = generate_trip_json(prompt, request.model)
-        print("✅ Extracted JSON from LLM:", json_str)
+        return await plan_prompt_trip(request)
 
-        # 🔹 Step 2: Parse structured data into Pydantic model
-        trip = parse_trip_data(json_str, prompt)
-        print("✅ Parsed trip data:", trip)
+    except AppError:
+        raise
+    except Exception as e:
+        logger.exception("Error during plan-trip")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        destination = trip.destination
-        duration = trip.duration
-        tastes = trip.tastes
-        style = trip.style
-        original_prompt = trip.original_prompt
 
-        print(f"🗺️ Destination: {destination} | ⏳ Duration: {duration}")
-        print(f"🎨 Tastes: {tastes} | 🧘 Style: {style}")
+@router.post("/plan-trip/stream")
+async def plan_trip_stream(request: PromptRequest):
+    """
+    Server-sent events variant of /plan-trip.
 
-        # 🔹 Step 3: Use only the first taste
-        if not tastes:
-            raise HTTPException(status_code=400, detail="No tastes provided in prompt.")
+    Emits `progress` events for each pipeline stage (with the extracted trip
+    once known), then a `token` event per chunk of itinerary text, and
+    finally `done` with the same body /plan-trip returns. Failures are
+    reported as an `error` event since the response has already started.
+    """
+    prompt = request.prompt
+    logger.debug("Received prompt (stream)", extra={"prompt_chars": len(prompt), "model": request.model})
+
+    async def events():
+        try:
+            yield format_sse({"stage": "extracting"}, event="progress")
+            trip = await extract_trip_data(prompt, request.model)
+
+            yield format_sse({"stage": "insights", "trip": trip.model_dump()}, event="progress")
+            qloo_places = await fetch_primary_taste_places(trip)
+
+            yield format_sse({"stage": "weather"}, event="progress")
+            weather_forecast = await fetch_weather_forecast(trip.destination, trip.original_prompt)
+
+            yield format_sse({"stage": "itinerary"}, event="progress")
+            chunks = []
+            async for token in stream_itinerary(
+                openAI_model=request.model,
+                original_prompt=trip.original_prompt,
+                destination=trip.destination,
+                duration=trip.duration,
+                tastes=trip.tastes,
+                style=trip.style,
+                qloo_places=qloo_places,
+                weather_forecast=weather_forecast
+            ):
+                chunks.append(token)
+                yield format_sse({"text": token}, event="token")
+            itinerary = "".join(chunks)
+
+            # Persist only once the whole itinerary has been streamed
+            await save_itinerary_history(
+                logged_in=getattr(request, "loggedIn", False),
+                user_id=getattr(request, "sessionId", None),
+                prompt=prompt,
+                destination=trip.destination,
+                duration=trip.duration,
+                tastes=trip.tastes,
+                style=trip.style,
+                itinerary=itinerary
+            )
+
+            yield format_sse({
+                "destination": trip.destination,
+                "tastes": trip.tastes,
+                "style": trip.style,
+                "duration": trip.duration,
+                "itinerary": itinerary
+            }, event="done")
+
+        except Exception as e:
+            yield format_sse(error_payload(e, "Error during plan-trip stream"), event="error")
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+    
 
-        primary_taste = tastes[0]
-        tag = f"urn:tag:genre:{primary_taste}"
-        print(f"🔍 Fetching Qloo data for tag: {tag}")
+@router.post("/plan-trip/batch")
+async def plan_trip_batch(batch: BatchPromptRequest):
+    """
+    Plans up to 200 prompts in one request. Responds with NDJSON, one line
+    per prompt as soon as its itinerary is ready (not in input order):
+    {"index", "prompt", "status": "ok", "result"} or {..., "status": "error", "error"}.
+    """
+    return StreamingResponse(plan_trips_batch(batch), media_type="application/x-ndjson")
 
-        # 🔹 Step 4: Fetch Qloo place insights for that one taste
-        basic = await get_insight(
-            f"/insights/?filter.type=urn:entity:place&signal.interests.tags={tag}&filter.location.query={destination}"
-        )
 
-        # 🔹 Step 5: Fetch weather forecast
-        weather_forecast = fetch_weather_forecast(destination, original_prompt)
-
-        print(weather_forecast)
-        
-        # 🔹 Step 5: Generate the itinerary using basic place insights
-        print("\n🧠 Calling LLM with aggregated insights...")
-        itinerary = generate_itinerary(
-            openAI_model=request.model,
-            original_prompt=original_prompt,
-            destination=destination,
-            duration=duration,
-            tastes=tastes,
-            style=style,
-            qloo_places=basic.get("results", {}).get("entities", []),
-            weather_forecast=weather_forecast  # ✅ Pass this to the LLM prompt
-        )
-        print("📅 Generated itinerary")
-
-        tastes_str = ", ".join(tastes)  # tastes is a list
-        style_str = ", ".join(style)    # style is a list
-
-        # Step 7: Save to PostgreSQL
-        async with async_session_maker() as db:
-            if getattr(request, "loggedIn", False) is True:
-                print("📅 Saving User history itinerary")
-                await save_user_itinerary(
-                    db=db,
-                    user_id=getattr(request, "sessionId", None),
-                    prompt=prompt,
-                    destination=destination,
-                    duration=duration,
-                    tastes=tastes_str,
-                    style=style_str,
-                    generated_itinerary=itinerary
-                )
+@router.post("/plan-trip/jobs", status_code=202)
+async def submit_plan_trip_job(request: PromptRequest):
+    """
+    Queues /plan-trip as a background job and returns its id immediately.
+    Poll GET /plan-trip/jobs/{job_id} for status, stage and result.
+    """
+    job = await itinerary_jobs.submit(request)
+    return {"job_id": job["job_id"], "status": job["status"]}
 
-        return {
-            "destination": destination,
-            "tastes": tastes,
-            "style": style,
-            "duration": duration,
-            "itinerary": itinerary
-        }
 
-    except Exception as e:
-        print("❌ Error during plan-trip:", str(e))
-        raise HTTPException(status_code=500, detail=str(e))
-    
+@router.get("/plan-trip/jobs/{job_id}")
+async def get_plan_trip_job(job_id: str):
+    job = await get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
 
 @router.post("/qloo-only-trip")
 async def qloo_basic_trip(request: PromptRequest):
     prompt = request.prompt
-    print("📩 Received prompt:", prompt)
+    logger.debug("Received prompt", extra={"prompt_chars": len(prompt), "model": request.model})
 
     try:
         # Step 1: Extract structured trip data from prompt
-        json_str = generate_trip_json(prompt)
-        trip = parse_trip_data(json_str)
+        json_str = await generate_trip_json(prompt, request.model)
+        trip = parse_trip_data(json_str, prompt)
 
         destination = trip.destination
         duration = trip.duration
         tastes = trip.tastes
         style = trip.style
 
-        print(f"🗺️ Destination: {destination} | ⏳ Duration: {duration}")
-        print(f"🎨 Tastes: {tastes} | 🧘 Style: {style}")
+        logger.debug("Parsed trip data", extra={"destination": destination, "duration": duration, "tastes": tastes, "style": style})
 
         if not tastes:
             raise HTTPException(status_code=400, detail="No tastes found in prompt")
@@ -125,13 +158,12 @@ async def qloo_basic_trip(request: PromptRequest):
         primary_taste = tastes[0]
         tag = f"urn:tag:genre:{primary_taste.lower().replace(' ', '-')}"  # e.g., jazz music → jazz-music
 
-        print(f"🔍 Using taste tag '{tag}'")
+        logger.debug("Using taste tag %s", tag)
 
         # Step 3: Fetch Qloo place recommendations
         basic = await get_insight(
             f"/insights/?filter.type=urn:entity:place&signal.interests.tags={tag}&filter.location.query={destination}"
         )
-        print(f"/insights/?filter.type=urn:entity:place&signal.interests.tags={tag}&filter.location.query={destination}")
         # taste_places = [place.get("name") for place in basic.get("data", [])]
         # all_places = [{"name": p} for p in taste_places]
 
@@ -143,8 +175,10 @@ async def qloo_basic_trip(request: PromptRequest):
             "qloo_places":  basic.get("results", {}).get("entities", [])
         }
 
+    except AppError:
+        raise
     except Exception as e:
-        print("❌ Error during Qloo basic trip:", str(e))
+        logger.exception("Error during Qloo basic trip")
         raise HTTPException(status_code=500, detail=str(e))
 
     
@@ -168,5 +202,5 @@ async def test_qloo_insight():
             response.raise_for_status()
             return response.json()
     except httpx.HTTPError as e:
-        print("❌ Qloo API error:", str(e))
+        logger.error("Qloo API error: %s", e)
         raise HTTPException(status_code=500, detail="Failed to fetch from Qloo")
\ No newline at end of file
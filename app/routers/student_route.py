@@ -1,16 +1,23 @@
+from datetime import datetime
 from uuid import UUID, uuid4
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.dependencies import get_db
+from app.database import all_pool_stats
+from app.dependencies import get_db, get_read_db
 from app.models.UserHistory import UserHistory
 from app.models.student import Student
+from app.repositories.history_repo import HistoryRepository, serialize_history
 from app.schemas.student import StudentCreate
+from app.services.history_export_service import export_history
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 
 router = APIRouter()
 
+HISTORY_PAGE_MAX = 100
+
 @router.post("/save")
 def create_student(student: StudentCreate, db: Session = Depends(get_db)):
     existing = db.query(Student).filter(Student.email == student.email).first()
@@ -57,78 +64,101 @@ async def save_test_history(db: AsyncSession = Depends(get_db)):
 """
     )
     db.add(test_history)
-    await db.commit()
     return {"message": "Test user history with JSON itinerary saved!"}
 
 
-
-async def save_user_itinerary(
+async def history_page(
     db: AsyncSession,
-    user_id: str,
-    prompt: str,
-    destination: str,
-    duration: str,
-    tastes: str,
-    style: str,
-    generated_itinerary: dict
+    user_id: UUID | None,
+    limit: int,
+    cursor: str | None,
+    summary: bool,
+) -> dict:
+    try:
+        rows, next_cursor = await HistoryRepository(db).page(
+            user_id=user_id,
+            limit=limit,
+            cursor=cursor,
+            summary=summary,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "items": [serialize_history(row, include_itinerary=not summary) for row in rows],
+        "next_cursor": next_cursor,
+    }
+
+
+@router.get("/pool-stats")
+def db_pool_stats():
+    return all_pool_stats()
+
+
+@router.get("/history")
+async def get_all_user_history(
+    limit: int = Query(20, ge=1, le=HISTORY_PAGE_MAX),
+    cursor: str | None = Query(None, description="`next_cursor` from the previous page"),
+    summary: bool = Query(True, description="Leave out generated_itinerary; fetch it per entry instead"),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    itinerary = UserHistory(
-        id=uuid4(),
+    """
+    One page of all history, newest first: `{"items": [...], "next_cursor": ...}`.
+    Breaking change: this used to return a bare list of every entry; see README "API changes".
+    """
+    return await history_page(db, None, limit, cursor, summary)
+
+# Declared before /history/{user_id} so "export" is not read as a user id
+@router.get("/history/export")
+async def export_user_history(
+    user_id: UUID | None = None,
+    destination: str | None = None,
+    created_from: datetime | None = Query(None, description="Inclusive lower bound on created_at"),
+    created_to: datetime | None = Query(None, description="Exclusive upper bound on created_at"),
+    summary: bool = Query(False, description="Leave out generated_itinerary"),
+    gzip: bool = Query(False, description="Gzip-compress the NDJSON stream"),
+):
+    """Streams matching history rows as NDJSON, oldest first, without loading them all in memory."""
+    rows = export_history(
         user_id=user_id,
-        prompt=prompt,
         destination=destination,
-        duration=duration,
-        tastes=tastes,
-        style=style,
-        generated_itinerary=generated_itinerary
+        created_from=created_from,
+        created_to=created_to,
+        summary=summary,
+        compress=gzip,
     )
-    db.add(itinerary)
-    await db.commit()
-    await db.refresh(itinerary)  # Optional: to return the saved object with DB-generated fields
-    return {"message": "User itinerary saved!", "id": str(itinerary.id)}
+    if gzip:
+        return StreamingResponse(
+            rows,
+            media_type="application/gzip",
+            headers={"Content-Disposition": 'attachment; filename="user_history.ndjson.gz"'},
+        )
+    return StreamingResponse(rows, media_type="application/x-ndjson")
 
+@router.get("/history/{user_id}")
+async def get_user_history(
+    user_id: UUID,
+    limit: int = Query(20, ge=1, le=HISTORY_PAGE_MAX),
+    cursor: str | None = Query(None, description="`next_cursor` from the previous page"),
+    summary: bool = Query(True, description="Leave out generated_itinerary; fetch it per entry instead"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    One page of a user's history, newest first: `{"items": [...], "next_cursor": ...}`.
+    Breaking change: this used to return a bare list of every entry; see README "API changes".
+    """
+    page = await history_page(db, user_id, limit, cursor, summary)
 
-@router.get("/history")
-async def get_all_user_history(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(UserHistory))
-    histories = result.scalars().all()
+    if not page["items"] and cursor is None:
+        raise HTTPException(status_code=404, detail="No history found for this user")
 
-    return [
-        {
-            "id": str(history.id),
-            "user_id": str(history.user_id),
-            "prompt": history.prompt,
-            "destination": history.destination,
-            "duration": history.duration,
-            "tastes": history.tastes,
-            "style": history.style,
-            "generated_itinerary": history.generated_itinerary,  # already JSON
-            "created_at": history.created_at.isoformat(),
-            "updated_at": history.updated_at.isoformat(),
-        }
-        for history in histories
-    ]
+    return page
 
-@router.get("/history/{user_id}")
-async def get_user_history(user_id: UUID, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(UserHistory).where(UserHistory.user_id == user_id))
-    histories = result.scalars().all()
+@router.get("/history/{user_id}/{history_id}")
+async def get_user_history_entry(user_id: UUID, history_id: UUID, db: AsyncSession = Depends(get_read_db)):
+    history = await HistoryRepository(db).get(history_id)
 
-    if not histories:
-        raise HTTPException(status_code=404, detail="No history found for this user")
+    if history is None or history.user_id != user_id:
+        raise HTTPException(status_code=404, detail="History entry not found")
 
-    return [
-        {
-            "id": str(history.id),
-            "user_id": str(history.user_id),
-            "prompt": history.prompt,
-            "destination": history.destination,
-            "duration": history.duration,
-            "tastes": history.tastes,
-            "style": history.style,
-            "generated_itinerary": history.generated_itinerary,
-            "created_at": history.created_at.isoformat(),
-            "updated_at": history.updated_at.isoformat(),
-        }
-        for history in histories
-    ]
+    return serialize_history(history, include_itinerary=True)
@@ -1,5 +1,8 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from app.services.text_extractor_service import extract_text_from_file
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from app.services.text_extractor_service import extract_text_from_file, stream_text_from_file
+from app.shared.errors import AppError
 
 
 router = APIRouter()
@@ -10,10 +13,25 @@ router = APIRouter()
         description="Accepts PDF or Word files and extracts raw plain text for NLP tasks.",
         tags=["Text Extraction"]
         )
-async def extract_text(file: UploadFile = File(...)):
+async def extract_text(
+    file: UploadFile = File(...),
+    stream: bool = Query(False, description="Stream NDJSON `{page, text}` records as PDF pages are extracted"),
+    first_page: int | None = Query(None, ge=1, description="First page to stream (1-based); requires `stream`"),
+    last_page: int | None = Query(None, ge=1, description="Last page to stream, inclusive; requires `stream`"),
+):
+    if not stream and (first_page is not None or last_page is not None):
+        raise HTTPException(status_code=400, detail="first_page and last_page require stream=true")
+
     try:
+        if stream:
+            records = await stream_text_from_file(file, first_page or 1, last_page)
+            # Releases the spooled upload even if the client goes away
+            # before the body is sent
+            return StreamingResponse(records, media_type="application/x-ndjson", background=BackgroundTask(records.aclose))
         text = await extract_text_from_file(file)
         return {"extracted_text": text}
+    except AppError:
+        raise
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
@@ -3,16 +3,26 @@ from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from app.schemas.prompt_request import PromptRequest
 from app.services.trip_extraction_service import (
-    validate_user_input,
-    generate_trip_json,
-    parse_trip_data,
+    cache_trip,
+    get_cached_trip,
+    validate_and_extract_trip,
 )
 
 router = APIRouter()
 
 @router.post("/extract-info")
 async def extract_trip_from_input(request: PromptRequest):
-    if not validate_user_input(request.prompt):
+    # Only trips that already passed this validation are served from the cache
+    cached = get_cached_trip(request.prompt, request.model, validated=True)
+    if cached is not None:
+        return cached
+
+    try:
+        result = await validate_and_extract_trip(request.prompt, request.model)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    if result.missing_fields:
         raise HTTPException(
             status_code=400,
             detail=(
@@ -24,13 +34,8 @@ async def extract_trip_from_input(request: PromptRequest):
             ),
         )
 
-    json_str = generate_trip_json(request.prompt, request.model)
-
-    try:
-        trip = parse_trip_data(json_str,request.prompt)
-        return trip
-    except ValueError as e:
-        raise HTTPException(status_code=422, detail=str(e))
+    cache_trip(result.trip, request.model, validated=True)
+    return result.trip
     
 @router.get("/test")
 def get_demo_itinerary():
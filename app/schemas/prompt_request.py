@@ -1,5 +1,5 @@
-from typing import Optional
-from pydantic import BaseModel, field_validator
+from typing import List, Optional
+from pydantic import BaseModel, Field, field_validator
 
 class PromptRequest(BaseModel):
     prompt: str
@@ -14,3 +14,23 @@ class PromptRequest(BaseModel):
         if v not in allowed:
             return "gpt-4"
         return v
+
+
+class BatchPromptRequest(BaseModel):
+    prompts: List[str] = Field(min_length=1, max_length=200)
+    model: Optional[str] = "gpt-4"
+    loggedIn: Optional[bool] = False
+    sessionId: Optional[str] = None
+
+    @field_validator("model", mode="before")
+    @classmethod
+    def validate_model(cls, v):
+        return PromptRequest.validate_model(v)
+
+    def item(self, prompt: str) -> PromptRequest:
+        return PromptRequest(
+            prompt=prompt,
+            model=self.model,
+            loggedIn=self.loggedIn,
+            sessionId=self.sessionId,
+        )
@@ -1,9 +1,18 @@
 from pydantic import BaseModel, ValidationError
-from typing import List
+from typing import List, Literal, Optional
 
 class TripData(BaseModel):
     destination: str
     duration: str
     tastes: List[str]
     style: List[str]
-    original_prompt: str 
\ No newline at end of file
+    original_prompt: str
+
+
+TripField = Literal["destination", "duration", "tastes", "style"]
+
+
+class TripExtractionResult(BaseModel):
+    """Outcome of the combined validate + extract call: a trip, or what is missing."""
+    trip: Optional[TripData] = None
+    missing_fields: List[TripField] = []
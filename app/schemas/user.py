@@ -1,4 +1,5 @@
-from pydantic import BaseModel, EmailStr
+from uuid import UUID
+from pydantic import BaseModel, ConfigDict, EmailStr
 
 
 class UserBase(BaseModel):
@@ -12,3 +13,12 @@ class UserCreate(UserBase):
 
 class UserCreateResponse(UserBase):
     id: str
+
+
+class CurrentUser(UserBase):
+    """Snapshot of the authenticated user, safe to cache across requests."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    google_id: str | None = None
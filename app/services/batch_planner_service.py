@@ -0,0 +1,77 @@
+import os
+import json
+import asyncio
+from typing import AsyncIterator, Dict, List
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.schemas.prompt_request import BatchPromptRequest
+from app.services.insight_cache import insight_cache_key
+from app.services.qloo_service import QLOO_MAX_CONCURRENCY, get_insights
+from app.services.trip_extraction_service import extract_trip_data
+from app.services.trip_planner_service import (
+    complete_prompt_trip,
+    place_entities,
+    primary_taste_endpoint,
+)
+from app.shared.errors import error_payload
+
+BATCH_EXTRACTION_CONCURRENCY = int(os.getenv("BATCH_EXTRACTION_CONCURRENCY", "10"))
+BATCH_GENERATION_CONCURRENCY = int(os.getenv("BATCH_GENERATION_CONCURRENCY", "5"))
+
+
+def _line(record: dict) -> str:
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+async def plan_trips_batch(batch: BatchPromptRequest) -> AsyncIterator[str]:
+    """
+    Plans many prompts at once and yields one NDJSON line per prompt.
+
+    Every prompt goes through extraction, its Qloo place lookup and
+    generation on its own, so a quick prompt is not held back by the
+    slowest extraction or lookup of the batch. Lookups are shared by
+    normalized (tag, destination) endpoint: each is fetched once per batch
+    (and served from the insight cache / single-flight as usual). Lines are
+    yielded in completion order and carry the prompt's `index`.
+    """
+    prompts = batch.prompts
+    extraction_slots = asyncio.Semaphore(BATCH_EXTRACTION_CONCURRENCY)
+    lookup_slots = asyncio.Semaphore(QLOO_MAX_CONCURRENCY)
+    generation_slots = asyncio.Semaphore(BATCH_GENERATION_CONCURRENCY)
+    lookups: Dict[str, asyncio.Task] = {}
+
+    async def fetch(endpoint: str) -> dict:
+        async with lookup_slots:
+            [insight] = await get_insights([endpoint], return_exceptions=True)
+        if isinstance(insight, Exception):
+            raise insight
+        return insight
+
+    async def lookup(endpoint: str) -> dict:
+        key = insight_cache_key(endpoint)
+        if key not in lookups:
+            lookups[key] = asyncio.create_task(fetch(endpoint))
+        # Shielded: other prompts may be waiting on the same lookup
+        return await asyncio.shield(lookups[key])
+
+    async def plan(index: int) -> dict:
+        prompt = prompts[index]
+        try:
+            async with extraction_slots:
+                trip = await extract_trip_data(prompt, batch.model)
+            places = place_entities(await lookup(primary_taste_endpoint(trip)))
+            async with generation_slots:
+                result = await complete_prompt_trip(batch.item(prompt), trip, places)
+            return {"index": index, "prompt": prompt, "status": "ok", "result": result}
+        except Exception as e:
+            return {"index": index, "prompt": prompt, "status": "error", "error": error_payload(e, f"Error planning batch prompt {index}")}
+
+    tasks: List[asyncio.Task] = [asyncio.create_task(plan(index)) for index in range(len(prompts))]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield _line(await finished)
+    finally:
+        # The client went away: stop generating what nobody will read
+        for task in [*tasks, *lookups.values()]:
+            task.cancel()
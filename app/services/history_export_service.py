@@ -0,0 +1,61 @@
+import os
+import json
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from uuid import UUID
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.database import read_session_maker
+from app.repositories.history_repo import HistoryRepository, serialize_history
+
+HISTORY_EXPORT_BATCH_SIZE = int(os.getenv("HISTORY_EXPORT_BATCH_SIZE", "1000"))
+# Lines are buffered up to this many bytes before a chunk is sent
+HISTORY_EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+async def export_history(
+    user_id: Optional[UUID] = None,
+    destination: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    summary: bool = False,
+    compress: bool = False,
+) -> AsyncIterator[bytes]:
+    """
+    Yields user history as NDJSON, one row per line, in chunks of about
+    HISTORY_EXPORT_CHUNK_BYTES (gzip-compressed when `compress` is set).
+
+    Opens its own session on the read replica: the response outlives the
+    request's dependencies.
+    """
+    gzip = zlib.compressobj(wbits=31) if compress else None
+    buffer = bytearray()
+
+    def emit(data: bytes) -> bytes:
+        return gzip.compress(data) if gzip is not None else data
+
+    async with read_session_maker() as session:
+        await session.connection(execution_options={"postgresql_readonly": True})
+        rows = HistoryRepository(session).stream(
+            user_id=user_id,
+            destination=destination,
+            created_from=created_from,
+            created_to=created_to,
+            summary=summary,
+            batch_size=HISTORY_EXPORT_BATCH_SIZE,
+        )
+        async for row in rows:
+            buffer += json.dumps(serialize_history(row, include_itinerary=not summary), ensure_ascii=False).encode() + b"\n"
+            if len(buffer) >= HISTORY_EXPORT_CHUNK_BYTES:
+                chunk = emit(bytes(buffer))
+                buffer.clear()
+                if chunk:
+                    yield chunk
+
+    tail = emit(bytes(buffer))
+    if gzip is not None:
+        tail += gzip.flush()
+    if tail:
+        yield tail
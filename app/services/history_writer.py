@@ -0,0 +1,165 @@
+import os
+import asyncio
+import logging
+from typing import List, Optional
+from dotenv import load_dotenv
+load_dotenv()
+from sqlalchemy import exc as sa_exc
+
+from app.database import async_session_maker
+from app.repositories.history_repo import HistoryRepository
+from app.shared.metrics import HISTORY_BUFFER_DEPTH, HISTORY_WRITES, span
+
+
+logger = logging.getLogger(__name__)
+
+HISTORY_FLUSH_INTERVAL_MS = int(os.getenv("HISTORY_FLUSH_INTERVAL_MS", "200"))
+HISTORY_FLUSH_MAX_ROWS = int(os.getenv("HISTORY_FLUSH_MAX_ROWS", "100"))
+HISTORY_BUFFER_SIZE = int(os.getenv("HISTORY_BUFFER_SIZE", "10000"))
+HISTORY_SHUTDOWN_TIMEOUT = float(os.getenv("HISTORY_SHUTDOWN_TIMEOUT", "10"))
+
+RETRY_BACKOFF_CAP = 5.0
+
+_STOP = object()
+
+
+def _is_transient(error: Exception) -> bool:
+    """Connection-level failures are retried until they succeed; anything else is a bad row."""
+    if isinstance(error, sa_exc.DBAPIError):
+        return error.connection_invalidated or isinstance(error, (sa_exc.OperationalError, sa_exc.InterfaceError))
+    return isinstance(error, (OSError, asyncio.TimeoutError))
+
+
+async def insert_history_rows(rows: List[dict]):
+    """Writes one batch in its own transaction."""
+    async with async_session_maker() as session:
+        await HistoryRepository(session).insert_many(rows)
+        await session.commit()
+
+
+class HistoryWriteBuffer:
+    """
+    Write-behind buffer for itinerary history.
+
+    Rows are queued by the request and written by a single flusher task as
+    one multi-row INSERT every `flush_interval` seconds or `max_rows` rows,
+    whichever comes first. Connection failures are retried with backoff
+    until the database is back (the bounded queue applies backpressure in
+    the meantime). A batch the database rejects is split right away, and
+    the rows it rejects on their own are dropped with an error log. Queued
+    rows are flushed on `stop()`, but are lost if the process dies before then.
+    """
+
+    def __init__(self, flush_interval: float, max_rows: int, buffer_size: int):
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self.buffer_size = buffer_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.buffer_size)
+        self._flusher = asyncio.create_task(self._run(), name="history-write-buffer")
+
+    async def stop(self):
+        if self._flusher is None:
+            return
+        flusher, self._flusher = self._flusher, None
+
+        async def drain():
+            await self._queue.put(_STOP)
+            await flusher
+
+        try:
+            await asyncio.wait_for(drain(), HISTORY_SHUTDOWN_TIMEOUT)
+        except asyncio.TimeoutError:
+            flusher.cancel()
+            logger.error("History flush timed out on shutdown; %d rows not written", self.depth)
+
+    @property
+    def running(self) -> bool:
+        return self._flusher is not None
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def add(self, row: dict):
+        """
+        Queues a row. When the buffer is not running (scripts, tests, before
+        startup) the row is written inline in a single attempt, and errors
+        reach the caller instead of being retried on the request path.
+        """
+        if not self.running:
+            with span("history_flush"):
+                await insert_history_rows([row])
+            HISTORY_WRITES.labels("written").inc()
+            return
+        await self._queue.put(row)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                break
+
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_rows:
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), deadline - loop.time())
+                except asyncio.TimeoutError:
+                    break
+                if row is _STOP:
+                    stopping = True
+                    break
+                batch.append(row)
+            await self._write(batch)
+
+        # Drain whatever was queued before stop()
+        remaining = []
+        while not self._queue.empty():
+            row = self._queue.get_nowait()
+            if row is not _STOP:
+                remaining.append(row)
+        for start in range(0, len(remaining), self.max_rows):
+            await self._write(remaining[start:start + self.max_rows])
+
+    async def _write(self, batch: List[dict]):
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                with span("history_flush"):
+                    await insert_history_rows(batch)
+                HISTORY_WRITES.labels("written").inc(len(batch))
+                return
+            except Exception as e:
+                if not _is_transient(e):
+                    # The same rows would fail the same way again
+                    error = e
+                    break
+                HISTORY_WRITES.labels("retried").inc(len(batch))
+                delay = min(0.1 * 2 ** attempt, RETRY_BACKOFF_CAP)
+                logger.warning("History write of %d rows failed (attempt %d), retrying in %.1fs: %s", len(batch), attempt, delay, e)
+                await asyncio.sleep(delay)
+
+        if len(batch) > 1:
+            # Find the rows the database rejects instead of dropping the batch
+            for row in batch:
+                await self._write([row])
+            return
+
+        row = batch[0]
+        HISTORY_WRITES.labels("dropped").inc()
+        logger.error("Dropping history entry %s for user %s: %s", row["id"], row["user_id"], error)
+
+
+history_writer = HistoryWriteBuffer(
+    flush_interval=HISTORY_FLUSH_INTERVAL_MS / 1000,
+    max_rows=HISTORY_FLUSH_MAX_ROWS,
+    buffer_size=HISTORY_BUFFER_SIZE,
+)
+HISTORY_BUFFER_DEPTH.set_function(lambda: history_writer.depth)
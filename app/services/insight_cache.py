@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.shared.metrics import record_cache_lookup
+from app.shared.redis_client import get_redis, mark_redis_unavailable, redis_available
+
+
+logger = logging.getLogger(__name__)
+
+QLOO_CACHE_ENABLED = os.getenv("QLOO_CACHE_ENABLED", "true").lower() == "true"
+
+# How long an insight is served as fresh, per `filter.type`. Demographics do
+# not depend on the destination and change slowly; places and heatmaps do.
+INSIGHT_TTLS = {
+    "urn:demographics": int(os.getenv("QLOO_DEMOGRAPHICS_TTL", str(7 * 24 * 3600))),
+    "urn:entity:place": int(os.getenv("QLOO_PLACES_TTL", str(6 * 3600))),
+    "urn:heatmap": int(os.getenv("QLOO_HEATMAP_TTL", str(6 * 3600))),
+}
+DEFAULT_INSIGHT_TTL = int(os.getenv("QLOO_DEFAULT_TTL", "3600"))
+
+# How long past its TTL an entry may still be served while it is refreshed.
+INSIGHT_STALE_TTL = int(os.getenv("QLOO_STALE_TTL", str(24 * 3600)))
+REFRESH_LOCK_SECONDS = 30
+
+KEY_PREFIX = "qloo:insight:"
+
+
+def _normalize_endpoint(endpoint: str) -> tuple[str, dict]:
+    parts = urlsplit(endpoint)
+    path = parts.path.rstrip("/") or "/"
+    params = {
+        name: " ".join(value.lower().split())
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+    }
+    return path, params
+
+
+def insight_cache_key(endpoint: str) -> str:
+    """Cache key for an insight endpoint, independent of parameter order, case and spacing."""
+    path, params = _normalize_endpoint(endpoint)
+    canonical = f"{path}?{urlencode(sorted(params.items()))}"
+    return KEY_PREFIX + hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def insight_type(endpoint: str) -> str:
+    """Short insight type of an endpoint, e.g. `place`, `demographics`, `heatmap`."""
+    _, params = _normalize_endpoint(endpoint)
+    return params.get("filter.type", "").rsplit(":", 1)[-1] or "other"
+
+
+def insight_ttl(endpoint: str) -> int:
+    _, params = _normalize_endpoint(endpoint)
+    return INSIGHT_TTLS.get(params.get("filter.type", ""), DEFAULT_INSIGHT_TTL)
+
+
+async def get_cached_insight(endpoint: str) -> tuple[dict, bool] | None:
+    """
+    Looks up a cached insight.
+
+    Returns:
+        tuple[dict, bool] | None: The insight and whether it is stale, or
+        None on a miss. Redis failures are treated as a miss.
+    """
+    if not QLOO_CACHE_ENABLED:
+        return None
+    if not redis_available():
+        record_cache_lookup("qloo_insight", "bypass")
+        return None
+
+    try:
+        raw = await get_redis().get(insight_cache_key(endpoint))
+    except Exception as e:
+        logger.warning("Qloo cache read failed: %s", e)
+        mark_redis_unavailable()
+        record_cache_lookup("qloo_insight", "error")
+        return None
+
+    if raw is None:
+        record_cache_lookup("qloo_insight", "miss")
+        return None
+
+    entry = json.loads(raw)
+    is_stale = time.time() - entry["fetched_at"] > insight_ttl(endpoint)
+    record_cache_lookup("qloo_insight", "stale" if is_stale else "hit")
+    return entry["data"], is_stale
+
+
+async def set_cached_insight(endpoint: str, data: dict):
+    if not QLOO_CACHE_ENABLED or not redis_available():
+        return
+
+    entry = json.dumps({"fetched_at": time.time(), "data": data})
+    try:
+        await get_redis().set(
+            insight_cache_key(endpoint),
+            entry,
+            ex=insight_ttl(endpoint) + INSIGHT_STALE_TTL,
+        )
+    except Exception as e:
+        logger.warning("Qloo cache write failed: %s", e)
+        mark_redis_unavailable()
+
+
+async def acquire_refresh_lock(endpoint: str) -> bool:
+    """Ensures only one replica refreshes a stale entry at a time."""
+    try:
+        return bool(await get_redis().set(
+            insight_cache_key(endpoint) + ":refresh",
+            b"1",
+            ex=REFRESH_LOCK_SECONDS,
+            nx=True,
+        ))
+    except Exception as e:
+        logger.warning("Qloo cache lock failed: %s", e)
+        mark_redis_unavailable()
+        return False
@@ -0,0 +1,154 @@
+import os
+import json
+import uuid
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import List, Optional
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.schemas.prompt_request import PromptRequest
+from app.services.trip_planner_service import plan_prompt_trip
+from app.shared.errors import InternalAppError, error_payload
+from app.shared.redis_client import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+ITINERARY_JOB_WORKERS = int(os.getenv("ITINERARY_JOB_WORKERS", "4"))
+ITINERARY_JOB_QUEUE_SIZE = int(os.getenv("ITINERARY_JOB_QUEUE_SIZE", "100"))
+ITINERARY_JOB_TTL = int(os.getenv("ITINERARY_JOB_TTL", str(24 * 3600)))
+# On shutdown, running jobs get this long to finish before they are cancelled
+ITINERARY_JOB_STOP_TIMEOUT = float(os.getenv("ITINERARY_JOB_STOP_TIMEOUT", "20"))
+
+KEY_PREFIX = "itinerary:job:"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+async def _save_job(job: dict):
+    job["updated_at"] = _now()
+    await get_redis().set(KEY_PREFIX + job["job_id"], json.dumps(job), ex=ITINERARY_JOB_TTL)
+
+
+async def get_job(job_id: str) -> Optional[dict]:
+    """Current state of a job from Redis, so any replica can answer a poll."""
+    raw = await get_redis().get(KEY_PREFIX + job_id)
+    return json.loads(raw) if raw is not None else None
+
+
+async def _interrupt(job: dict):
+    """Records a job the worker stopped before it could finish."""
+    job.update(status="failed", error={"detail": "Interrupted by a server restart, please resubmit", "status_code": 503})
+    try:
+        await _save_job(job)
+    except Exception as e:
+        logger.warning("Could not record interrupted job %s: %s", job["job_id"], e)
+
+
+class ItineraryJobQueue:
+    """
+    Bounded in-process queue of plan-trip jobs served by a fixed worker pool.
+
+    Job state (status, stage, result, error) lives in Redis; the queue itself
+    is per worker process, so jobs still queued when a process dies are lost
+    and will stay `queued` until their Redis entry expires. On a graceful
+    stop, queued jobs and running jobs that do not finish within
+    ITINERARY_JOB_STOP_TIMEOUT are recorded as `failed` (interrupted).
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.worker_count = workers
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"itinerary-job-worker-{index}")
+            for index in range(self.worker_count)
+        ]
+
+    async def stop(self):
+        queue, self._queue = self._queue, None
+        if queue is not None:
+            while not queue.empty():
+                job, _ = queue.get_nowait()
+                await _interrupt(job)
+                queue.task_done()
+            try:
+                await asyncio.wait_for(queue.join(), ITINERARY_JOB_STOP_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning("Itinerary jobs still running after %ss; interrupting them", ITINERARY_JOB_STOP_TIMEOUT)
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, request: PromptRequest) -> dict:
+        if self._queue is None:
+            raise InternalAppError("Itinerary job workers are not running", code=503)
+        if self._queue.full():
+            raise InternalAppError("Too many itinerary jobs queued, please retry shortly", code=503)
+
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": "queued",
+            "stage": None,
+            "result": None,
+            "error": None,
+            "created_at": _now(),
+        }
+        try:
+            await _save_job(job)
+        except Exception as e:
+            logger.error("Could not record itinerary job: %s", e)
+            raise InternalAppError("Job store unavailable, please retry shortly", code=503) from e
+        self._queue.put_nowait((job, request))
+        return job
+
+    async def _work(self):
+        queue = self._queue
+        while True:
+            job, request = await queue.get()
+            try:
+                await self._run(job, request)
+            except Exception:
+                logger.exception("Itinerary job %s could not be recorded", job["job_id"])
+            finally:
+                queue.task_done()
+
+    async def _run(self, job: dict, request: PromptRequest):
+        async def on_stage(stage: str):
+            job["stage"] = stage
+            try:
+                await _save_job(job)
+            except Exception as e:
+                # A missed progress update must not fail the job itself
+                logger.warning("Could not record stage of job %s: %s", job["job_id"], e)
+
+        job["status"] = "running"
+        try:
+            job["result"] = await plan_prompt_trip(request, on_stage=on_stage)
+            job["status"] = "succeeded"
+        except asyncio.CancelledError:
+            await _interrupt(job)
+            raise
+        except Exception as e:
+            job.update(status="failed", error=error_payload(e, f"Itinerary job {job['job_id']} failed"))
+        await _save_job(job)
+
+
+itinerary_jobs = ItineraryJobQueue(
+    workers=ITINERARY_JOB_WORKERS,
+    queue_size=ITINERARY_JOB_QUEUE_SIZE,
+)
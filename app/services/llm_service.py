@@ -1,46 +1,20 @@
 # services/llm_service.py
-import requests
-from openai import OpenAI
-from typing import List
+from typing import AsyncIterator, List
 from dotenv import load_dotenv
 load_dotenv()
 import os
-import re
 
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-
-OPENWEATHERMAP_API_KEY = os.getenv('WEATHERAPPID')
+from app.services.local_trip_parser import parse_duration_days
+from app.services.openai_client import client
+from app.shared.metrics import span, traced
 
 def extract_duration_days(prompt: str) -> int:
-    match = re.search(r'(\d+)[-\s]*day', prompt.lower())
-    return int(match.group(1)) if match else 5  # default to 5
+    # Same patterns as the local trip parser, so weeks, nights ("3 nights"
+    # is 4 days, counting the departure day), weekends and date ranges count
+    # too, not only "N day"
+    return parse_duration_days(prompt) or 5  # default to 5
 
-def fetch_weather_forecast(city: str, prompt: str) -> str:
-    try:
-        url = (
-            f"https://api.openweathermap.org/data/2.5/forecast?q={city}&units=metric&appid={OPENWEATHERMAP_API_KEY}"
-        )
-        res = requests.get(url)
-        data = res.json()
-        
-        if "list" not in data:
-            return "Weather data unavailable."
-
-        # Grab daily forecasts at noon (12:00:00)
-        daily = [
-            f"{entry['dt_txt'].split(' ')[0]}: {entry['weather'][0]['description'].title()}, "
-            f"{entry['main']['temp']}°C"
-            for entry in data["list"]
-            if "12:00:00" in entry["dt_txt"]
-        ][:extract_duration_days(prompt)]  # limit to 5 days
-
-        return "\n".join(daily)
-    
-    except Exception as e:
-        return f"⚠️ Error fetching weather: {str(e)}"
-
-def generate_itinerary(
-    openAI_model:str,
+def build_itinerary_messages(
     original_prompt: str,
     destination: str,
     duration: str,
@@ -51,7 +25,7 @@ def generate_itinerary(
     demographics_summary: str = "",
     related_tags: List[str] = [],
     heatmap_neighborhoods: List[str] = []
-) -> str:
+) -> List[dict]:
     qloo_places = qloo_places or []
 
     def format_place(place):
@@ -76,7 +50,6 @@ def generate_itinerary(
 
     formatted_places = "\n".join([format_place(place) for place in qloo_places]) or "No recommended places available."
 
-    print("Olamide")
     # print(formatted_places)
     # print(weather_forecast)
     # Compose the GPT prompt
@@ -116,12 +89,31 @@ End with a short, stylish **trip summary caption** (Instagram-worthy).
 Make it fun, detailed, and personalized!
 """
 
-    response = client.chat.completions.create(
+    return [
+        {"role": "system", "content": "You are a culturally intelligent travel planner that creates rich, fun, and personalized itineraries."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+@traced("llm_itinerary")
+async def generate_itinerary(openAI_model: str, **trip_context) -> str:
+    response = await client.chat.completions.create(
         model=openAI_model,
-        messages=[
-            {"role": "system", "content": "You are a culturally intelligent travel planner that creates rich, fun, and personalized itineraries."},
-            {"role": "user", "content": prompt}
-        ]
+        messages=build_itinerary_messages(**trip_context)
     )
 
     return response.choices[0].message.content
+
+
+async def stream_itinerary(openAI_model: str, **trip_context) -> AsyncIterator[str]:
+    """Yields the itinerary text piece by piece as the model produces it."""
+    with span("llm_itinerary_stream"):
+        stream = await client.chat.completions.create(
+            model=openAI_model,
+            messages=build_itinerary_messages(**trip_context),
+            stream=True
+        )
+
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
@@ -0,0 +1,244 @@
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from typing import List, Optional, Tuple
+
+from app.assets.gazetteer import ALIASES, DESTINATIONS
+from app.schemas.tripdata import TripData
+
+# Minimum confidence at which a locally parsed trip is trusted over the LLM.
+# With the weights below, 0.9 takes trips with all four fields (even a vague
+# duration like "a weekend"); 0.85 also takes trips without a style, 1.0
+# only those with an explicit duration.
+LOCAL_PARSER_MIN_CONFIDENCE = float(os.getenv("LOCAL_PARSER_MIN_CONFIDENCE", "0.9"))
+
+# Confidence added by each field found; they sum to 1.0
+DESTINATION_WEIGHT = 0.35
+# A counted duration ("5 days", "June 3-8") vs. a vague one ("a weekend")
+EXPLICIT_DURATION_WEIGHT = 0.25
+VAGUE_DURATION_WEIGHT = 0.15
+TASTES_WEIGHT = 0.25
+STYLE_WEIGHT = 0.15
+# Several destinations: the prompt is ambiguous, so no trip is built
+AMBIGUOUS_DESTINATION_WEIGHT = 0.1
+
+# Keyword -> taste label (also used as the Qloo genre tag)
+TASTE_KEYWORDS = {
+    "jazz": "jazz", "blues": "blues", "hip hop": "hip hop", "hip-hop": "hip hop",
+    "afrobeats": "afrobeats", "afrobeat": "afrobeats", "reggae": "reggae",
+    "techno": "techno", "house music": "house", "electronic music": "electronic",
+    "classical music": "classical", "opera": "opera", "rock": "rock", "indie music": "indie",
+    "live music": "live music", "fado": "fado", "salsa": "salsa", "k-pop": "k-pop",
+    "seafood": "seafood", "street food": "street food", "sushi": "sushi", "ramen": "ramen",
+    "tacos": "tacos", "vegan": "vegan", "vegetarian": "vegetarian", "wine": "wine",
+    "craft beer": "craft beer", "coffee": "coffee", "cafes": "cafes", "cafés": "cafes",
+    "tea": "tea", "fine dining": "fine dining", "food": "food", "bakeries": "bakeries",
+    "bookstores": "bookstores", "bookshops": "bookstores", "books": "books",
+    "museums": "museums", "art galleries": "art galleries", "galleries": "art galleries",
+    "art": "art", "architecture": "architecture", "history": "history",
+    "theater": "theater", "theatre": "theater", "film": "film", "cinema": "film",
+    "fashion": "fashion", "vintage shopping": "vintage", "vintage": "vintage",
+    "shopping": "shopping", "markets": "markets", "nightlife": "nightlife",
+    "beaches": "beaches", "beach": "beaches", "hiking": "hiking", "nature": "nature",
+    "surfing": "surfing", "shrines": "shrines", "temples": "temples", "photography": "photography",
+}
+
+# Keyword -> travel style label
+STYLE_KEYWORDS = {
+    "relaxing": "relaxing", "relaxed": "relaxing", "chill": "relaxing", "laid-back": "relaxing",
+    "peaceful": "peaceful", "quiet": "peaceful", "slow": "slow-paced",
+    "adventurous": "adventurous", "adventure": "adventurous", "active": "active",
+    "luxury": "luxury", "luxurious": "luxury", "upscale": "luxury",
+    "low budget": "low budget", "budget": "budget-friendly", "cheap": "budget-friendly",
+    "affordable": "budget-friendly", "backpacking": "backpacking",
+    "romantic": "romantic", "family": "family-friendly", "family-friendly": "family-friendly",
+    "solo": "solo", "cultural": "cultural", "culturally rich": "cultural",
+    "artistic": "artistic", "cozy": "cozy", "party": "party", "spontaneous": "spontaneous",
+    "foodie": "foodie", "off the beaten path": "off the beaten path",
+}
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+    "thirteen": 13, "fourteen": 14, "fifteen": 15, "twenty": 20, "thirty": 30,
+}
+
+MONTHS = {
+    name: index
+    for index, names in enumerate(
+        [("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"),
+         ("may",), ("jun", "june"), ("jul", "july"), ("aug", "august"),
+         ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"), ("dec", "december")],
+        start=1,
+    )
+    for name in names
+}
+
+_NUMBER = r"(\d{1,2}|" + "|".join(NUMBER_WORDS) + r")"
+_MONTH = r"(" + "|".join(sorted(MONTHS, key=len, reverse=True)) + r")\.?"
+_ORDINAL = r"(?:st|nd|rd|th)?"
+
+_DAYS_RE = re.compile(rf"\b{_NUMBER}[-\s]*(?:full\s+)?days?\b")
+_NIGHTS_RE = re.compile(rf"\b{_NUMBER}[-\s]*nights?\b")
+_WEEKS_RE = re.compile(rf"\b{_NUMBER}[-\s]*weeks?\b")
+_WEEKEND_RE = re.compile(r"\b(?:long\s+)?weekend\b")
+_FORTNIGHT_RE = re.compile(r"\bfortnight\b")
+# "a day in Rome", "a week in Bali"; not "twice a day" or "3 times a week"
+_ARTICLE_RE = re.compile(r"(?<!once )(?<!twice )(?<!times )\ba\s+(day|week)\b")
+# "June 3 to June 8", "june 3-8", "Jun 28 – Jul 2"
+_DATE_RANGE_RE = re.compile(
+    rf"\b{_MONTH}\s+(\d{{1,2}}){_ORDINAL}\s*(?:-|–|to|until|through|thru)\s*(?:{_MONTH}\s+)?(\d{{1,2}}){_ORDINAL}\b"
+)
+# "3rd to 8th of June", "3-8 June"
+_DAY_FIRST_RANGE_RE = re.compile(
+    rf"\b(\d{{1,2}}){_ORDINAL}\s*(?:-|–|to|until|through|thru)\s*(\d{{1,2}}){_ORDINAL}\s+(?:of\s+)?{_MONTH}\b"
+)
+
+
+def _phrase_pattern(phrases) -> re.Pattern:
+    ordered = sorted(phrases, key=len, reverse=True)  # longest phrase wins
+    return re.compile(r"(?<![\w-])(" + "|".join(re.escape(p) for p in ordered) + r")(?![\w-])")
+
+
+_DESTINATION_NAMES = {name.lower(): name for name in DESTINATIONS}
+_DESTINATION_NAMES.update(ALIASES)
+_DESTINATION_RE = _phrase_pattern(_DESTINATION_NAMES)
+_TASTE_RE = _phrase_pattern(TASTE_KEYWORDS)
+_STYLE_RE = _phrase_pattern(STYLE_KEYWORDS)
+
+
+@dataclass
+class LocalParseResult:
+    """What the local parser found, and how far it trusts it (0.0 - 1.0)."""
+    confidence: float
+    destination: Optional[str] = None
+    duration_days: Optional[int] = None
+    tastes: List[str] = field(default_factory=list)
+    style: List[str] = field(default_factory=list)
+    trip: Optional[TripData] = None
+
+    @property
+    def is_confident(self) -> bool:
+        return self.trip is not None and self.confidence >= LOCAL_PARSER_MIN_CONFIDENCE
+
+
+def _to_number(token: str) -> int:
+    return int(token) if token.isdigit() else NUMBER_WORDS[token]
+
+
+def _date_span(start_month: int, start_day: int, end_month: int, end_day: int) -> Optional[int]:
+    year = date.today().year
+    try:
+        start = date(year, start_month, start_day)
+        end = date(year + (end_month < start_month), end_month, end_day)
+    except ValueError:
+        return None
+    days = (end - start).days + 1
+    return days if 0 < days <= 60 else None
+
+
+def _parse_duration(text: str) -> Optional[Tuple[int, bool]]:
+    """(days, whether the duration was counted out) for lower-cased text."""
+    match = _DAYS_RE.search(text)
+    if match:
+        return _to_number(match.group(1)), True
+
+    match = _WEEKS_RE.search(text)
+    if match:
+        return _to_number(match.group(1)) * 7, True
+
+    match = _NIGHTS_RE.search(text)
+    if match:
+        return _to_number(match.group(1)) + 1, True
+
+    match = _DATE_RANGE_RE.search(text)
+    if match:
+        start_month = MONTHS[match.group(1)]
+        end_month = MONTHS[match.group(3)] if match.group(3) else start_month
+        days = _date_span(start_month, int(match.group(2)), end_month, int(match.group(4)))
+        return (days, True) if days else None
+
+    match = _DAY_FIRST_RANGE_RE.search(text)
+    if match:
+        month = MONTHS[match.group(3)]
+        days = _date_span(month, int(match.group(1)), month, int(match.group(2)))
+        return (days, True) if days else None
+
+    if _FORTNIGHT_RE.search(text):
+        return 14, False
+    if _WEEKEND_RE.search(text):
+        return (3 if "long weekend" in text else 2), False
+    match = _ARTICLE_RE.search(text)
+    if match:
+        return (1 if match.group(1) == "day" else 7), False
+
+    return None
+
+
+def parse_duration_days(prompt: str) -> Optional[int]:
+    """
+    Trip length in days from durations ("5-day", "a week", "two weeks") or
+    date ranges. Nights count the departure day too: "3 nights" is 4 days.
+    """
+    parsed = _parse_duration(prompt.lower())
+    return parsed[0] if parsed else None
+
+
+def _unique_matches(pattern: re.Pattern, text: str, labels: dict) -> List[str]:
+    found = []
+    for match in pattern.finditer(text):
+        label = labels[match.group(1)]
+        if label not in found:
+            found.append(label)
+    return found
+
+
+def parse_trip_locally(prompt: str) -> LocalParseResult:
+    """
+    Deterministic, LLM-free trip extraction.
+
+    Scores what it finds (see the *_WEIGHT constants): a single known
+    destination, a duration (counted out, or vague such as "a weekend"), at
+    least one taste and at least one style each add to the confidence. A
+    trip is built once destination, duration and tastes are known; the style
+    may be empty, which keeps it under the default threshold. More than one
+    destination makes the prompt ambiguous and no trip is built.
+    """
+    text = prompt.lower()
+
+    destinations = _unique_matches(_DESTINATION_RE, text, _DESTINATION_NAMES)
+    duration = _parse_duration(text)
+    duration_days = duration[0] if duration else None
+    tastes = _unique_matches(_TASTE_RE, text, TASTE_KEYWORDS)
+    style = _unique_matches(_STYLE_RE, text, STYLE_KEYWORDS)
+
+    confidence = 0.0
+    if len(destinations) == 1:
+        confidence += DESTINATION_WEIGHT
+    elif destinations:
+        confidence += AMBIGUOUS_DESTINATION_WEIGHT
+    if duration:
+        confidence += EXPLICIT_DURATION_WEIGHT if duration[1] else VAGUE_DURATION_WEIGHT
+    if tastes:
+        confidence += TASTES_WEIGHT
+    if style:
+        confidence += STYLE_WEIGHT
+
+    result = LocalParseResult(
+        confidence=round(confidence, 2),
+        destination=destinations[0] if len(destinations) == 1 else None,
+        duration_days=duration_days,
+        tastes=tastes,
+        style=style,
+    )
+
+    if result.destination and duration_days and tastes:
+        result.trip = TripData(
+            destination=result.destination,
+            duration=f"{duration_days} day" if duration_days == 1 else f"{duration_days} days",
+            tastes=tastes,
+            style=style,
+            original_prompt=prompt,
+        )
+    return result
@@ -0,0 +1,36 @@
+import os
+from dotenv import load_dotenv
+load_dotenv()
+# The SDK is built on httpx2 (installed with it); its client only accepts
+# transports and responses from that package
+import httpx2
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from app.shared.metrics import MeteredTransport
+
+
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "120"))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+
+# One pooled async client per worker, shared by every LLM call site.
+# The base URL is taken from OPENAI_BASE_URL when set. The transport is
+# wrapped so LLM calls show up in the outbound metrics.
+client = AsyncOpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    timeout=httpx2.Timeout(OPENAI_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+    max_retries=OPENAI_MAX_RETRIES,
+    http_client=DefaultAsyncHttpxClient(
+        transport=MeteredTransport(
+            "openai",
+            httpx2.AsyncHTTPTransport(
+                limits=httpx2.Limits(
+                    max_connections=OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                ),
+            ),
+        ),
+    ),
+)
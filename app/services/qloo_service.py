@@ -1,36 +1,124 @@
 import os
+import asyncio
+import logging
+from typing import List
 from dotenv import load_dotenv
 load_dotenv()
 import httpx
 from fastapi import HTTPException
 
+from app.external_adapters.qloo import qloo_adapter
+from app.services.insight_cache import (
+    acquire_refresh_lock,
+    get_cached_insight,
+    insight_cache_key,
+    insight_type,
+    set_cached_insight,
+)
+from app.shared.errors import InternalAppError
+from app.shared.metrics import INSIGHT_TIMEOUTS, span
+from app.shared.single_flight import SingleFlight
 
 
+logger = logging.getLogger(__name__)
+
 QLOO_API_KEY = os.getenv("QLOO_API_KEY")
-QLOO_BASE_URL = os.getenv("QLOO_BASE_URL", "https://hackathon.api.qloo.com")
+QLOO_MAX_CONCURRENCY = int(os.getenv("QLOO_MAX_CONCURRENCY", "6"))
+QLOO_CALL_TIMEOUT = float(os.getenv("QLOO_CALL_TIMEOUT", "10"))
+
+# Keeps background refreshes alive until they finish
+_refresh_tasks: set = set()
+_insight_flight = SingleFlight("qloo_insight")
+
+
+async def _fetch_insight(endpoint: str) -> dict:
+    try:
+        data = await qloo_adapter.get_insight(endpoint)
+    except httpx.RequestError as e:
+        raise InternalAppError(f"Qloo request error: {str(e)}") from e
+
+    await set_cached_insight(endpoint, data)
+    return data
+
+
+async def _refresh_insight(endpoint: str):
+    if not await acquire_refresh_lock(endpoint):
+        return
+    try:
+        await _fetch_insight(endpoint)
+    except Exception as e:
+        logger.warning("Background Qloo refresh failed for %s: %s", endpoint, e)
+
 
 async def get_insight(endpoint: str) -> dict:
+    """
+    Fetches a Qloo insight, served from the Redis cache when possible.
+
+    Stale entries are returned immediately and refreshed in the background.
+    """
     if not QLOO_API_KEY:
         raise HTTPException(status_code=500, detail="Qloo API key not found in environment variables.")
 
-    headers = {
-        "X-Api-Key": QLOO_API_KEY
-    }
+    # Identical concurrent lookups share one cache read / outbound call
+    with span(f"qloo_{insight_type(endpoint)}"):
+        return await _insight_flight.do(
+            insight_cache_key(endpoint),
+            lambda: _load_insight(endpoint),
+        )
 
-    url = f"{QLOO_BASE_URL}/v2{endpoint}"
-    print(url)
 
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers)
+async def _load_insight(endpoint: str) -> dict:
+    cached = await get_cached_insight(endpoint)
+    if cached is not None:
+        data, is_stale = cached
+        if is_stale:
+            task = asyncio.create_task(_refresh_insight(endpoint))
+            _refresh_tasks.add(task)
+            task.add_done_callback(_refresh_tasks.discard)
+        return data
 
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Qloo API Error: {response.text}"
-                )
+    return await _fetch_insight(endpoint)
 
-            return response.json()
 
-    except httpx.RequestError as e:
-        raise HTTPException(status_code=500, detail=f"Request error: {str(e)}")
+async def get_insights(
+    endpoints: List[str],
+    max_concurrency: int = QLOO_MAX_CONCURRENCY,
+    timeout: float = QLOO_CALL_TIMEOUT,
+    return_exceptions: bool = False,
+) -> List[dict]:
+    """
+    Fetches several Qloo insights concurrently.
+
+    At most `max_concurrency` calls are in flight at once and each call is
+    bounded by `timeout` seconds. A call that times out yields an empty dict
+    so the caller can still build a (partial) answer, and is logged and
+    counted in `qloo_insight_timeouts_total`; any other error is
+    raised and the remaining calls are cancelled, unless `return_exceptions`
+    is set, in which case the exception takes that endpoint's place.
+
+    Returns:
+        List[dict]: One result per endpoint, in the same order as `endpoints`.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def fetch(endpoint: str) -> dict:
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(get_insight(endpoint), timeout)
+            except asyncio.TimeoutError:
+                # Counted apart from genuinely empty insights
+                INSIGHT_TIMEOUTS.labels(insight_type(endpoint)).inc()
+                logger.warning("Qloo insight timed out after %.1fs: %s", timeout, endpoint)
+                return {}
+            except Exception as e:
+                if return_exceptions:
+                    return e
+                raise
+
+    tasks = [asyncio.create_task(fetch(endpoint)) for endpoint in endpoints]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
@@ -0,0 +1,67 @@
+import os
+import asyncio
+import logging
+from typing import Optional
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.models.types import compress_text, decompress_text
+from app.shared.metrics import record_cache_lookup
+from app.shared.redis_client import get_redis, mark_redis_unavailable, redis_available
+
+
+logger = logging.getLogger(__name__)
+
+TEXT_CACHE_ENABLED = os.getenv("TEXT_CACHE_ENABLED", "true").lower() == "true"
+TEXT_CACHE_TTL = int(os.getenv("TEXT_CACHE_TTL", str(7 * 24 * 3600)))
+# Larger results are not cached, to keep single Redis values reasonable
+TEXT_CACHE_MAX_BYTES = int(os.getenv("TEXT_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+
+# Bump when extraction output changes so old entries are no longer served
+TEXT_CACHE_VERSION = 1
+KEY_PREFIX = "text:extracted:"
+
+
+def text_cache_key(sha256: str, kind: str) -> str:
+    """Key for the text extracted from a file with this content hash, e.g. kind `pdf`."""
+    return f"{KEY_PREFIX}v{TEXT_CACHE_VERSION}:{kind}:{sha256}"
+
+
+async def get_cached_text(sha256: str, kind: str) -> Optional[str]:
+    """Text previously extracted from identical file bytes; Redis failures are a miss."""
+    if not TEXT_CACHE_ENABLED:
+        return None
+    if not redis_available():
+        record_cache_lookup("extracted_text", "bypass")
+        return None
+
+    try:
+        raw = await get_redis().get(text_cache_key(sha256, kind))
+    except Exception as e:
+        logger.warning("Extracted text cache read failed: %s", e)
+        mark_redis_unavailable()
+        record_cache_lookup("extracted_text", "error")
+        return None
+
+    if raw is None:
+        record_cache_lookup("extracted_text", "miss")
+        return None
+
+    record_cache_lookup("extracted_text", "hit")
+    return await asyncio.to_thread(decompress_text, raw)
+
+
+async def set_cached_text(sha256: str, kind: str, text: str):
+    if not TEXT_CACHE_ENABLED or not redis_available():
+        return
+
+    # Documents can run to megabytes of text; compress off the event loop
+    compressed = await asyncio.to_thread(compress_text, text)
+    if len(compressed) > TEXT_CACHE_MAX_BYTES:
+        return
+
+    try:
+        await get_redis().set(text_cache_key(sha256, kind), compressed, ex=TEXT_CACHE_TTL)
+    except Exception as e:
+        logger.warning("Extracted text cache write failed: %s", e)
+        mark_redis_unavailable()
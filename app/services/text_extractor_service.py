@@ -1,30 +1,234 @@
 import io
+import os
+import json
+import asyncio
+import hashlib
+import tempfile
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, NamedTuple, Optional, Tuple, Union
+from dotenv import load_dotenv
+load_dotenv()
 import fitz  # PyMuPDF
 from docx import Document
 
+from app.services.text_cache import get_cached_text, set_cached_text
+from app.shared.errors import AppError
+from app.shared.metrics import span
+from app.shared.process_pool import BoundedProcessPool
+
+TEXT_EXTRACT_MAX_UPLOAD_MB = int(os.getenv("TEXT_EXTRACT_MAX_UPLOAD_MB", "50"))
+# Uploads larger than this are written to a temporary file instead of
+# being held in memory, and are passed to the workers by path
+TEXT_EXTRACT_SPOOL_BYTES = int(os.getenv("TEXT_EXTRACT_SPOOL_BYTES", str(2 * 1024 * 1024)))
+# PDF pages per worker task; larger documents are extracted in parallel
+TEXT_EXTRACT_PAGES_PER_TASK = int(os.getenv("TEXT_EXTRACT_PAGES_PER_TASK", "25"))
+# Smaller ranges when streaming, so the first pages go out sooner
+TEXT_EXTRACT_STREAM_PAGES_PER_TASK = int(os.getenv("TEXT_EXTRACT_STREAM_PAGES_PER_TASK", "5"))
+TEXT_EXTRACT_WORKERS = int(os.getenv("TEXT_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+TEXT_EXTRACT_MAX_PENDING = int(os.getenv("TEXT_EXTRACT_MAX_PENDING", str(TEXT_EXTRACT_WORKERS * 4)))
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+# The upload's bytes, or the path of the file it was spooled to
+Source = Union[bytes, str]
+
+
+class SpooledUpload(NamedTuple):
+    source: Source
+    size: int
+    # Hex SHA-256 of the file bytes, computed as they were read
+    sha256: str
+
+
+extraction_pool = BoundedProcessPool(
+    "text-extraction",
+    workers=TEXT_EXTRACT_WORKERS,
+    max_pending=TEXT_EXTRACT_MAX_PENDING,
+    max_tasks_per_child=100,
+)
+
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".png", ".jpg", ".jpeg", ".mp3", ".wav")
+# Results of these are cached by content hash
+CACHED_EXTENSIONS = (".pdf", ".docx")
+
+
 async def extract_text_from_file(file):
     filename = file.filename.lower()
-    content = await file.read()
-
-    if filename.endswith(".pdf"):
-        return extract_pdf(content)
-    elif filename.endswith(".docx"):
-        return extract_docx(content)
-    elif filename.endswith((".png", ".jpg", ".jpeg")):
-        return extract_image(content)
-    elif filename.endswith((".mp3", ".wav")):
-        return transcribe_audio(content, filename)
-    else:
+    if not filename.endswith(SUPPORTED_EXTENSIONS):
         raise ValueError("Unsupported file type. Only .pdf and .docx are allowed.")
 
-def extract_pdf(file_bytes):
-    with fitz.open(stream=file_bytes, filetype="pdf") as doc:
-        return "\n".join(page.get_text() for page in doc)
+    kind = os.path.splitext(filename)[1].lstrip(".")
+    cached = filename.endswith(CACHED_EXTENSIONS)
+
+    async with spooled_upload(file) as upload:
+        if cached:
+            text = await get_cached_text(upload.sha256, kind)
+            if text is not None:
+                return text
+
+        source = upload.source
+        with span("text_extraction"):
+            if filename.endswith(".pdf"):
+                text = await extract_pdf(source)
+            elif filename.endswith(".docx"):
+                text = await extraction_pool.run(extract_docx, source)
+            elif filename.endswith((".png", ".jpg", ".jpeg")):
+                text = extract_image(source)
+            else:
+                text = transcribe_audio(source, filename)
+
+    if cached:
+        await set_cached_text(upload.sha256, kind, text)
+    return text
+
+
+@asynccontextmanager
+async def spooled_upload(file) -> AsyncIterator[SpooledUpload]:
+    """
+    Reads the upload in chunks, enforcing TEXT_EXTRACT_MAX_UPLOAD_MB and
+    hashing it on the way. The source is the upload's bytes, or the path of
+    a temporary copy once it grows past TEXT_EXTRACT_SPOOL_BYTES; the copy
+    is removed on exit.
+    """
+    max_bytes = TEXT_EXTRACT_MAX_UPLOAD_MB * 1024 * 1024
+    digest = hashlib.sha256()
+    buffer = bytearray()
+    spool = None
+    size = 0
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+            size += len(chunk)
+            digest.update(chunk)
+            if size > max_bytes:
+                raise AppError(f"File is too large; the limit is {TEXT_EXTRACT_MAX_UPLOAD_MB} MB", 413)
+
+            if spool is None and size > TEXT_EXTRACT_SPOOL_BYTES:
+                spool = tempfile.NamedTemporaryFile(prefix="upload-", delete=False)
+                await asyncio.to_thread(spool.write, bytes(buffer))
+                buffer = bytearray()
+            if spool is not None:
+                await asyncio.to_thread(spool.write, chunk)
+            else:
+                buffer += chunk
+
+        if spool is None:
+            yield SpooledUpload(bytes(buffer), size, digest.hexdigest())
+        else:
+            spool.close()
+            yield SpooledUpload(spool.name, size, digest.hexdigest())
+    finally:
+        if spool is not None:
+            spool.close()
+            os.unlink(spool.name)
+
 
-def extract_docx(file_bytes):
-    doc = Document(io.BytesIO(file_bytes))
+def _open_pdf(source: Source):
+    if isinstance(source, bytes):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source, filetype="pdf")
+
+
+def pdf_page_count(source: Source) -> int:
+    # Opening only reads the document's cross-reference table, not its pages
+    with _open_pdf(source) as doc:
+        return doc.page_count
+
+
+def extract_pdf_pages(source: Source, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop). Runs in a worker process."""
+    with _open_pdf(source) as doc:
+        return [doc[index].get_text() for index in range(start, min(stop, doc.page_count))]
+
+
+async def extract_pdf(source: Source) -> str:
+    # The page count comes from a cheap open here, so every range can be
+    # handed to the workers at once
+    page_count = await asyncio.to_thread(pdf_page_count, source)
+    step = TEXT_EXTRACT_PAGES_PER_TASK
+    parts = await asyncio.gather(
+        *(extraction_pool.run(extract_pdf_pages, source, start, start + step) for start in range(0, page_count, step))
+    )
+    return "\n".join(text for part in parts for text in part)
+
+
+async def stream_pdf_pages(source: Source, first_page: int = 1, last_page: Optional[int] = None) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Yields (page number, text) for pages first_page..last_page (1-based,
+    inclusive; last_page defaults to the end) in order, as they are
+    extracted. At most TEXT_EXTRACT_WORKERS ranges are extracted ahead of
+    the consumer, so a slow client does not make the text pile up in memory.
+    """
+    step = TEXT_EXTRACT_STREAM_PAGES_PER_TASK
+    start = first_page - 1
+    page_count = await asyncio.to_thread(pdf_page_count, source)
+    if start >= page_count:
+        raise AppError(f"first_page is past the end of the document ({page_count} pages)", 416)
+
+    end = page_count if last_page is None else min(last_page, page_count)
+    ranges = deque((begin, min(begin + step, end)) for begin in range(start, end, step))
+    pending = deque()
+    try:
+        while ranges or pending:
+            while ranges and len(pending) < TEXT_EXTRACT_WORKERS:
+                begin, finish = ranges.popleft()
+                pending.append((begin, asyncio.ensure_future(extraction_pool.run(extract_pdf_pages, source, begin, finish))))
+            begin, task = pending.popleft()
+            texts = await task
+            for offset, text in enumerate(texts):
+                yield begin + offset + 1, text
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+
+def _page_record(page: int, text: str) -> bytes:
+    return json.dumps({"page": page, "text": text}, ensure_ascii=False).encode() + b"\n"
+
+
+async def _page_records(file, first_page: int, last_page: Optional[int]) -> AsyncIterator[Optional[bytes]]:
+    # Yields None once the upload is spooled and the first range extracted,
+    # then the records. The spooled copy and pending ranges are released
+    # when the generator finishes, is closed, or is collected unfinished.
+    async with spooled_upload(file) as upload:
+        pages = stream_pdf_pages(upload.source, first_page, last_page)
+        try:
+            first = await anext(pages)
+            yield None
+            yield _page_record(*first)
+            async for page, text in pages:
+                yield _page_record(page, text)
+        finally:
+            await pages.aclose()
+
+
+async def stream_text_from_file(file, first_page: int = 1, last_page: Optional[int] = None) -> AsyncIterator[bytes]:
+    """
+    Reads the upload and returns an NDJSON stream of `{"page", "text"}`
+    records, one per PDF page. The upload is read (and its size checked)
+    and the first pages extracted before this returns, so an unreadable
+    file or a first_page past the end fails the request instead of the
+    stream. Call `aclose()` on the stream to release the spooled copy if it
+    is not read to the end. Streams are not served from the extracted-text
+    cache, which holds whole documents only.
+    """
+    if not file.filename.lower().endswith(".pdf"):
+        raise ValueError("Streaming is only supported for .pdf files.")
+    if last_page is not None and last_page < first_page:
+        raise ValueError("last_page must not be before first_page.")
+
+    records = _page_records(file, first_page, last_page)
+    await anext(records)
+    return records
+
+
+def extract_docx(source: Source) -> str:
+    """Runs in a worker process."""
+    doc = Document(io.BytesIO(source) if isinstance(source, bytes) else source)
     return "\n".join([p.text for p in doc.paragraphs])
 
+
 def extract_image(file_bytes):
     return "Image to Text"
     # image = Image.open(io.BytesIO(file_bytes))
@@ -1,18 +1,28 @@
 import json
-import openai
-from pydantic import ValidationError
-from app.schemas.tripdata import TripData
-from dotenv import load_dotenv
-load_dotenv()
 import os
+import re
+from pydantic import ValidationError
+from app.schemas.tripdata import TripData, TripExtractionResult
+from app.services.local_trip_parser import parse_trip_locally
+from app.services.openai_client import client
+from app.shared.cache import TTLCache
+from app.shared.metrics import record_cache_lookup, span, traced
+from app.shared.single_flight import SingleFlight
 
+_extraction_flight = SingleFlight("trip_extraction")
 
-
-client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+# Complete parsed trips keyed by (namespace, model, normalized prompt); least
+# recently used entries are evicted once the cache is full. Trips that
+# passed the report_trip validation (/trip/extract-info) are kept apart from
+# plain extractions, so the validation is never skipped for a prompt that
+# another endpoint happened to see first.
+TRIP_CACHE_TTL = float(os.getenv("TRIP_CACHE_TTL", str(24 * 3600)))
+TRIP_CACHE_SIZE = int(os.getenv("TRIP_CACHE_SIZE", "4096"))
+_trip_cache = TTLCache(maxsize=TRIP_CACHE_SIZE, ttl=TRIP_CACHE_TTL)
 
 
-def validate_user_input(user_input: str) -> bool:
-    response = client.chat.completions.create(
+async def validate_user_input(user_input: str) -> bool:
+    response = await client.chat.completions.create(
         model="gpt-4",
         messages=[
             {
@@ -29,8 +39,16 @@ def validate_user_input(user_input: str) -> bool:
     return response.choices[0].message.content.strip().lower() == "true"
 
 
-def generate_trip_json(user_input: str, openAI_model:str) -> str:
-    response = client.chat.completions.create(
+async def generate_trip_json(user_input: str, openAI_model:str) -> str:
+    # Identical prompts in flight at the same time share one completion
+    return await _extraction_flight.do(
+        (openAI_model, user_input),
+        lambda: _complete_trip_json(user_input, openAI_model),
+    )
+
+
+async def _complete_trip_json(user_input: str, openAI_model: str) -> str:
+    response = await client.chat.completions.create(
         model=openAI_model,
         messages=[
             {
@@ -47,6 +65,97 @@ def generate_trip_json(user_input: str, openAI_model:str) -> str:
     return response.choices[0].message.content
 
 
+TRIP_FIELDS = ["destination", "duration", "tastes", "style"]
+
+# Forced tool call so every model we allow returns the same structured shape
+REPORT_TRIP_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "report_trip",
+        "description": "Report the structured trip extracted from the user's input, or which details are missing.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "is_complete": {
+                    "type": "boolean",
+                    "description": "True only if the input has a destination, a trip duration, at least one interest and a travel style.",
+                },
+                "destination": {"type": "string"},
+                "duration": {"type": "string"},
+                "tastes": {"type": "array", "items": {"type": "string"}},
+                "style": {"type": "array", "items": {"type": "string"}},
+                "missing_fields": {
+                    "type": "array",
+                    "items": {"type": "string", "enum": TRIP_FIELDS},
+                },
+            },
+            "required": ["is_complete", "missing_fields"],
+        },
+    },
+}
+
+
+@traced("trip_validation")
+async def validate_and_extract_trip(user_input: str, openAI_model: str) -> TripExtractionResult:
+    """
+    One LLM call that both validates the input and extracts the trip.
+
+    Raises:
+        ValueError: If the model reports a complete trip that does not parse.
+    """
+    arguments = await _extraction_flight.do(
+        ("validate", openAI_model, user_input),
+        lambda: _complete_trip_report(user_input, openAI_model),
+    )
+
+    try:
+        report = json.loads(arguments)
+    except json.JSONDecodeError as e:
+        raise ValueError(
+            "Invalid trip structure. Please include destination, duration, tastes, and travel style."
+        ) from e
+
+    missing = [
+        field for field in TRIP_FIELDS
+        if field in report.get("missing_fields", []) or not report.get(field)
+    ]
+    if not report.get("is_complete") or missing:
+        return TripExtractionResult(missing_fields=missing or TRIP_FIELDS)
+
+    try:
+        trip = TripData(
+            **{field: report[field] for field in TRIP_FIELDS},
+            original_prompt=user_input,
+        )
+    except ValidationError as e:
+        raise ValueError(
+            "Invalid trip structure. Please include destination, duration, tastes, and travel style."
+        ) from e
+    return TripExtractionResult(trip=trip)
+
+
+async def _complete_trip_report(user_input: str, openAI_model: str) -> str:
+    response = await client.chat.completions.create(
+        model=openAI_model,
+        messages=[
+            {
+                "role": "system",
+                "content": (
+                    "Decide whether the user's input contains enough information to generate a personalized travel itinerary "
+                    "and extract it. It must include: a destination, a trip duration, at least one interest (like food, music, fashion), "
+                    "and a travel style (e.g., relaxing, adventurous). Report the result with the report_trip tool, "
+                    "listing every missing detail in missing_fields."
+                )
+            },
+            {"role": "user", "content": user_input}
+        ],
+        tools=[REPORT_TRIP_TOOL],
+        tool_choice={"type": "function", "function": {"name": "report_trip"}},
+    )
+    tool_calls = response.choices[0].message.tool_calls or []
+    return tool_calls[0].function.arguments if tool_calls else "{}"
+
+
 def parse_trip_data(json_str: str, original_prompt: str) -> TripData:
     try:
         structured = json.loads(json_str)
@@ -57,3 +166,53 @@ def parse_trip_data(json_str: str, original_prompt: str) -> TripData:
         raise ValueError(
             "Invalid trip structure. Please include destination, duration, tastes, and travel style."
         ) from e
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Folds case, punctuation and whitespace so near-identical prompts share a key."""
+    return " ".join(re.sub(r"[^\w\s]", " ", prompt.lower()).split())
+
+
+def is_complete_trip(trip: TripData) -> bool:
+    return all(getattr(trip, field) for field in TRIP_FIELDS)
+
+
+def _trip_cache_key(prompt: str, openAI_model: str, validated: bool) -> tuple:
+    return ("validated" if validated else "extracted", openAI_model, normalize_prompt(prompt))
+
+
+def get_cached_trip(prompt: str, openAI_model: str, validated: bool = False) -> TripData | None:
+    trip = _trip_cache.get(_trip_cache_key(prompt, openAI_model, validated))
+    record_cache_lookup("trip_validation" if validated else "trip_extraction", "miss" if trip is None else "hit")
+    if trip is None:
+        return None
+    return trip.model_copy(update={"original_prompt": prompt})
+
+
+def cache_trip(trip: TripData, openAI_model: str, validated: bool = False):
+    """Caches a trip unless a field is empty; `validated` marks trips that passed report_trip."""
+    if is_complete_trip(trip):
+        _trip_cache.set(_trip_cache_key(trip.original_prompt, openAI_model, validated), trip)
+
+
+async def extract_trip_data(prompt: str, openAI_model: str) -> TripData:
+    """
+    Prompt -> TripData, answered from the cache when the prompt was seen
+    before, or by the local parser when it is confident, before falling back
+    to the LLM.
+    """
+    with span("trip_extraction"):
+        trip = get_cached_trip(prompt, openAI_model)
+        if trip is not None:
+            return trip
+
+        local = parse_trip_locally(prompt)
+        if local.is_confident:
+            cache_trip(local.trip, openAI_model)
+            return local.trip
+
+        with span("trip_extraction_llm"):
+            json_str = await generate_trip_json(prompt, openAI_model)
+        trip = parse_trip_data(json_str, prompt)
+        cache_trip(trip, openAI_model)
+        return trip
@@ -0,0 +1,210 @@
+import uuid
+import logging
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, Optional
+from fastapi import HTTPException
+
+from app.schemas.prompt_request import PromptRequest
+from app.schemas.tripdata import TripData
+from app.services.llm_service import generate_itinerary
+from app.services.history_writer import history_writer
+from app.services.qloo_service import get_insight, get_insights
+from app.services.trip_extraction_service import extract_trip_data
+from app.services.weather_service import fetch_weather_forecast
+from app.shared.metrics import span, traced
+
+logger = logging.getLogger(__name__)
+
+StageCallback = Callable[[str], Awaitable[None]]
+
+
+def primary_taste_endpoint(trip: TripData) -> str:
+    """Qloo place-insight endpoint for the first taste only (prompt-based planner)."""
+    if not trip.tastes:
+        raise HTTPException(status_code=400, detail="No tastes provided in prompt.")
+
+    tag = f"urn:tag:genre:{trip.tastes[0]}"
+    return f"/insights/?filter.type=urn:entity:place&signal.interests.tags={tag}&filter.location.query={trip.destination}"
+
+
+def place_entities(insight: dict) -> List[dict]:
+    return insight.get("results", {}).get("entities", [])
+
+
+@traced("insights")
+async def fetch_primary_taste_places(trip: TripData) -> List[dict]:
+    endpoint = primary_taste_endpoint(trip)
+    logger.debug("Fetching Qloo data: %s", endpoint)
+
+    return place_entities(await get_insight(endpoint))
+
+
+@traced("insights")
+async def fetch_culture_insights(destination: str, tastes: List[str]) -> dict:
+    """
+    Places, demographics and heatmap insights for every taste (culture-trip planner).
+
+    Returns:
+        dict: Keyword arguments for `generate_itinerary` / `stream_itinerary`.
+    """
+    all_places = []
+    heatmap_neighborhoods = []
+    demographics_summary = []
+    related_tags = []  # optional: if you want to enrich later
+
+    # Fire the place, demographics and heatmap lookups for every taste at once.
+    # Results come back in request order, so the merge below stays deterministic.
+    endpoints = []
+    for taste in tastes:
+        tag = f"urn:tag:genre:{taste}"
+        endpoints.extend([
+            f"/insights/?filter.type=urn:entity:place&signal.interests.tags={tag}&filter.location.query={destination}",
+            f"/insights/?filter.type=urn:demographics&signal.interests.tags={tag}",
+            f"/insights/?filter.type=urn:heatmap&filter.location.query={destination}&signal.interests.tags={tag}",
+        ])
+    insights = await get_insights(endpoints)
+
+    for index, taste in enumerate(tastes):
+        basic, demographics, heatmap = insights[index * 3:index * 3 + 3]
+
+        # Basic insights: place recommendations
+        taste_places = [place.get("name") for place in basic.get("data", [])]
+        all_places.extend([{"name": p} for p in taste_places])
+
+        # Demographics: summarize affinity by age/gender
+        if "data" in demographics:
+            summary = f"For taste '{taste}': " \
+                      + ", ".join([f"{g['group']}s score {g['score']:.2f}" for g in demographics.get("data", {}).get("age", [])])
+            demographics_summary.append(summary)
+
+        # Heatmap: get high-affinity neighborhoods
+        heatmap_points = heatmap.get("data", {}).get("points", [])
+        heatmap_neighborhoods.extend([f"Lat:{pt['location']['latitude']:.4f}, Lon:{pt['location']['longitude']:.4f}" for pt in heatmap_points[:3]])
+
+    return {
+        "qloo_places": all_places,
+        "demographics_summary": "\n".join(demographics_summary),
+        "related_tags": related_tags,
+        "heatmap_neighborhoods": heatmap_neighborhoods,
+    }
+
+
+async def save_itinerary_history(
+    logged_in: bool,
+    user_id: str | None,
+    prompt: str,
+    destination: str,
+    duration: str,
+    tastes: List[str],
+    style: List[str],
+    itinerary: str,
+):
+    """
+    Queues the itinerary for the write-behind history buffer; the response
+    does not wait for the database. Anonymous requests save nothing.
+    """
+    if logged_in is not True:
+        return
+
+    logger.debug("Saving user history itinerary")
+    with span("history_enqueue"):
+        await history_writer.add({
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "prompt": prompt,
+            "destination": destination,
+            "duration": duration,
+            "tastes": ", ".join(tastes),  # tastes is a list
+            "style": ", ".join(style),    # style is a list
+            "generated_itinerary": itinerary,
+            # Stamped now, not at flush time, so history keeps request order
+            "created_at": datetime.now(timezone.utc),
+            "updated_at": datetime.now(timezone.utc),
+        })
+
+
+async def plan_prompt_trip(request: PromptRequest, on_stage: Optional[StageCallback] = None) -> dict:
+    """
+    Full prompt -> itinerary pipeline behind /endpoint/plan-trip.
+
+    `on_stage` is awaited with the name of each stage as it starts
+    (extracting, insights, weather, itinerary, saving).
+    """
+    async def notify(stage: str):
+        if on_stage is not None:
+            await on_stage(stage)
+
+    prompt = request.prompt
+
+    # 🔹 Step 1 & 2: Extract structured trip data from the prompt (cached per prompt)
+    await notify("extracting")
+    trip = await extract_trip_data(prompt, request.model)
+    logger.debug(
+        "Parsed trip data",
+        extra={"destination": trip.destination, "duration": trip.duration, "tastes": trip.tastes, "style": trip.style},
+    )
+
+    # 🔹 Step 3 & 4: Fetch Qloo place insights for the first taste
+    await notify("insights")
+    qloo_places = await fetch_primary_taste_places(trip)
+
+    return await complete_prompt_trip(request, trip, qloo_places, on_stage)
+
+
+async def complete_prompt_trip(
+    request: PromptRequest,
+    trip: TripData,
+    qloo_places: List[dict],
+    on_stage: Optional[StageCallback] = None,
+) -> dict:
+    """Weather, itinerary generation and history save for an already extracted trip."""
+    async def notify(stage: str):
+        if on_stage is not None:
+            await on_stage(stage)
+
+    destination = trip.destination
+    duration = trip.duration
+    tastes = trip.tastes
+    style = trip.style
+    original_prompt = trip.original_prompt
+
+    # 🔹 Step 5: Fetch weather forecast
+    await notify("weather")
+    weather_forecast = await fetch_weather_forecast(destination, original_prompt)
+    logger.debug("Weather forecast for %s: %s", destination, weather_forecast)
+
+    # 🔹 Step 5: Generate the itinerary using basic place insights
+    await notify("itinerary")
+    logger.debug("Calling LLM with aggregated insights")
+    itinerary = await generate_itinerary(
+        openAI_model=request.model,
+        original_prompt=original_prompt,
+        destination=destination,
+        duration=duration,
+        tastes=tastes,
+        style=style,
+        qloo_places=qloo_places,
+        weather_forecast=weather_forecast  # ✅ Pass this to the LLM prompt
+    )
+    logger.debug("Generated itinerary", extra={"itinerary_chars": len(itinerary or "")})
+
+    # Step 7: Save to PostgreSQL
+    await notify("saving")
+    await save_itinerary_history(
+        logged_in=getattr(request, "loggedIn", False),
+        user_id=getattr(request, "sessionId", None),
+        prompt=original_prompt,
+        destination=destination,
+        duration=duration,
+        tastes=tastes,
+        style=style,
+        itinerary=itinerary
+    )
+
+    return {
+        "destination": destination,
+        "tastes": tastes,
+        "style": style,
+        "duration": duration,
+        "itinerary": itinerary
+    }
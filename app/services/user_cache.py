@@ -0,0 +1,121 @@
+import os
+import asyncio
+import hashlib
+import logging
+from typing import Iterable, Optional, Set
+from dotenv import load_dotenv
+load_dotenv()
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.repositories.user_repo import CHANGED_USER_EMAILS
+from app.schemas.user import CurrentUser
+from app.shared.cache import TTLCache
+from app.shared.metrics import record_cache_lookup
+from app.shared.redis_client import get_redis, mark_redis_unavailable, redis_available
+
+
+logger = logging.getLogger(__name__)
+
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+# Optional shared tier so a user looked up by one worker is warm in all of them
+USER_CACHE_REDIS = os.getenv("USER_CACHE_REDIS", "false").lower() == "true"
+USER_CACHE_REDIS_TTL = int(os.getenv("USER_CACHE_REDIS_TTL", "300"))
+
+KEY_PREFIX = "user:by-email:"
+
+# Invalidation reaches this worker and Redis; other workers' in-process
+# entries age out within USER_CACHE_TTL, so keep it short.
+_users = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+
+def _redis_key(email: str) -> str:
+    # Hashed so Redis keys do not expose email addresses
+    return KEY_PREFIX + hashlib.sha256(email.encode()).hexdigest()
+
+
+def _redis_enabled() -> bool:
+    return USER_CACHE_REDIS and redis_available()
+
+
+async def get_cached_user(email: str) -> Optional[CurrentUser]:
+    user = _users.get(email)
+    if user is not None:
+        record_cache_lookup("user", "hit")
+        return user
+
+    if _redis_enabled():
+        try:
+            raw = await get_redis().get(_redis_key(email))
+        except Exception as e:
+            logger.warning("User cache read failed: %s", e)
+            mark_redis_unavailable()
+            raw = None
+        if raw is not None:
+            user = CurrentUser.model_validate_json(raw)
+            _users.set(email, user)
+            record_cache_lookup("user", "hit")
+            return user
+
+    record_cache_lookup("user", "miss")
+    return None
+
+
+async def cache_user(user: CurrentUser):
+    _users.set(user.email, user)
+
+    if _redis_enabled():
+        try:
+            await get_redis().set(_redis_key(user.email), user.model_dump_json(), ex=USER_CACHE_REDIS_TTL)
+        except Exception as e:
+            logger.warning("User cache write failed: %s", e)
+            mark_redis_unavailable()
+
+
+async def invalidate_users(emails: Iterable[str]):
+    emails = list(emails)
+    for email in emails:
+        _users.pop(email)
+
+    if USER_CACHE_REDIS and emails:
+        try:
+            await get_redis().delete(*[_redis_key(email) for email in emails])
+        except Exception as e:
+            # A stale shared entry expires within USER_CACHE_REDIS_TTL
+            logger.warning("User cache invalidation failed: %s", e)
+            mark_redis_unavailable()
+
+
+# Redis deletes scheduled from the commit hook; kept so they are not
+# garbage collected before they run
+_pending_invalidations: Set[asyncio.Task] = set()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session):
+    """
+    Drops users changed through UserRepository once their transaction has
+    committed, so a concurrent lookup cannot re-cache the old row and a
+    rollback leaves the cache alone.
+    """
+    emails = session.info.pop(CHANGED_USER_EMAILS, None)
+    if not emails:
+        return
+
+    for email in emails:
+        _users.pop(email)
+    if not USER_CACHE_REDIS:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    task = loop.create_task(invalidate_users(emails))
+    _pending_invalidations.add(task)
+    task.add_done_callback(_pending_invalidations.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_users(session: Session):
+    session.info.pop(CHANGED_USER_EMAILS, None)
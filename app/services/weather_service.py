@@ -0,0 +1,131 @@
+import os
+import time
+import asyncio
+import logging
+from typing import List, Optional
+from dotenv import load_dotenv
+load_dotenv()
+import httpx
+
+from app.services.llm_service import extract_duration_days
+from app.shared.cache import TTLCache
+from app.shared.errors import InternalAppError
+from app.shared.external_api_client import ExternalAPIClient
+from app.shared.metrics import record_cache_lookup, span
+from app.shared.single_flight import SingleFlight
+
+
+logger = logging.getLogger(__name__)
+
+OPENWEATHERMAP_API_KEY = os.getenv("WEATHERAPPID")
+OPENWEATHERMAP_BASE_URL = os.getenv("OPENWEATHERMAP_BASE_URL", "https://api.openweathermap.org/data/2.5")
+
+# OpenWeatherMap publishes its forecast in 3-hour steps, so a forecast fetched
+# within the same 3-hour bucket is as fresh as a new one.
+FORECAST_BUCKET_SECONDS = 3 * 60 * 60
+WEATHER_CACHE_SIZE = int(os.getenv("WEATHER_CACHE_SIZE", "2048"))
+
+weather_client = ExternalAPIClient(
+    name="openweathermap",
+    base_url=OPENWEATHERMAP_BASE_URL,
+    timeout=httpx.Timeout(float(os.getenv("WEATHER_HTTP_TIMEOUT", "10")), pool=5.0),
+    limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+)
+
+# Entries are kept for two buckets: the current one is served as fresh, the
+# previous one is served stale while a refresh runs in the background.
+_forecast_cache = TTLCache(maxsize=WEATHER_CACHE_SIZE, ttl=2 * FORECAST_BUCKET_SECONDS)
+_refresh_tasks: dict = {}
+_forecast_flight = SingleFlight("weather_forecast")
+
+
+def _normalize_city(city: str) -> str:
+    return " ".join(city.lower().split())
+
+
+def _current_bucket() -> int:
+    return int(time.time() // FORECAST_BUCKET_SECONDS)
+
+
+async def _refresh(city: str, bucket: int) -> Optional[List[dict]]:
+    try:
+        data = await weather_client.get(
+            "/forecast",
+            params={"q": city, "units": "metric", "appid": OPENWEATHERMAP_API_KEY},
+        )
+    except InternalAppError as e:
+        # Unknown city: there is no forecast, which is not an error
+        if e.status_code == 404:
+            return None
+        raise
+    entries = data.get("list") if isinstance(data, dict) else None
+    if entries is not None:
+        _forecast_cache.set((_normalize_city(city), bucket), entries)
+    return entries
+
+
+def _schedule_refresh(city: str, bucket: int):
+    key = (_normalize_city(city), bucket)
+    if key in _refresh_tasks:
+        return
+
+    async def run():
+        try:
+            await _refresh(city, bucket)
+        except Exception as e:
+            logger.warning("Background weather refresh failed for %s: %s", city, e)
+        finally:
+            _refresh_tasks.pop(key, None)
+
+    _refresh_tasks[key] = asyncio.create_task(run())
+
+
+async def get_forecast_entries(city: str) -> Optional[List[dict]]:
+    """
+    Returns the raw 3-hourly forecast entries for a city.
+
+    Served from cache when the current bucket is known; a forecast from the
+    previous bucket is returned immediately while it is refreshed in the
+    background (stale-while-revalidate).
+    """
+    normalized = _normalize_city(city)
+    bucket = _current_bucket()
+
+    entries = _forecast_cache.get((normalized, bucket))
+    if entries is not None:
+        record_cache_lookup("weather_forecast", "hit")
+        return entries
+
+    stale = _forecast_cache.get((normalized, bucket - 1))
+    if stale is not None:
+        record_cache_lookup("weather_forecast", "stale")
+        _schedule_refresh(city, bucket)
+        return stale
+
+    record_cache_lookup("weather_forecast", "miss")
+    return await _forecast_flight.do(
+        (normalized, bucket),
+        lambda: _refresh(city, bucket),
+    )
+
+
+async def fetch_weather_forecast(city: str, prompt: str) -> str:
+    try:
+        with span("weather"):
+            entries = await get_forecast_entries(city)
+
+        if entries is None:
+            return "Weather data unavailable."
+
+        # Grab daily forecasts at noon (12:00:00)
+        daily = [
+            f"{entry['dt_txt'].split(' ')[0]}: {entry['weather'][0]['description'].title()}, "
+            f"{entry['main']['temp']}°C"
+            for entry in entries
+            if "12:00:00" in entry["dt_txt"]
+        ][:extract_duration_days(prompt)]
+
+        return "\n".join(daily)
+
+    except Exception as e:
+        return f"⚠️ Error fetching weather: {getattr(e, 'message', None) or str(e)}"
@@ -1,5 +1,11 @@
+import logging
 from typing import Optional, Any
 
+from fastapi import HTTPException
+
+
+logger = logging.getLogger(__name__)
+
 
 class AppError(Exception):
     """Base class for an App Error"""
@@ -39,3 +45,18 @@ class InternalAppError(AppError):
         code: int = 500,
     ):
         super().__init__(message, code, payload)
+
+
+def error_payload(error: Exception, context: str = "Unexpected error") -> dict:
+    """
+    `{"detail", "status_code"}` for reporting a failure inside a response
+    that has already started (SSE / NDJSON streams) or in a job record.
+    Errors other than HTTPException and AppError are logged here, under
+    `context`, and reported as 500.
+    """
+    if isinstance(error, HTTPException):
+        return {"detail": error.detail, "status_code": error.status_code}
+    if isinstance(error, AppError):
+        return {"detail": error.message, "status_code": error.status_code}
+    logger.error(context, exc_info=error)
+    return {"detail": str(error), "status_code": 500}
@@ -1,17 +1,69 @@
+import asyncio
 import logging
+import time
+from urllib.parse import urlsplit
 import httpx
 
 from app.shared.errors import InternalAppError
+from app.shared.metrics import OUTBOUND_IN_FLIGHT, OUTBOUND_REQUESTS, OUTBOUND_SECONDS, register_pool
 
-logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
 
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
 class ExternalAPIClient:
-    def __init__(self, base_url: str, headers: dict | None = None):
+    def __init__(
+        self,
+        base_url: str,
+        headers: dict | None = None,
+        timeout: float | httpx.Timeout = 30.0,
+        limits: httpx.Limits | None = None,
+        http2: bool = False,
+        name: str | None = None,
+    ):
         self.base_url = base_url
+        # Label used for this upstream in /metrics
+        self.name = name or urlsplit(base_url).hostname or base_url
         self.headers = headers or {}
-        self.client = httpx.AsyncClient(timeout=30.0)  # Optional: reuse client
+        self.timeout = timeout
+        self.limits = limits or httpx.Limits()
+        if http2 and not _http2_available():
+            logger.warning("HTTP/2 requested for %s but 'h2' is not installed; using HTTP/1.1", base_url)
+            http2 = False
+        self.http2 = http2
+
+        # Requests are admitted through a semaphore sized like the pool, so the
+        # time spent waiting for a free connection can be measured.
+        max_connections = self.limits.max_connections
+        self._slots = asyncio.Semaphore(max_connections) if max_connections else None
+        self._pool_timeout = httpx.Timeout(timeout).pool
+        self._in_flight = 0
+        self._waiting = 0
+        self._requests_total = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+        self.client = self._build_client()
+        register_pool(self.name, self)
+
+    def _build_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=self.limits,
+            http2=self.http2,
+        )
+
+    async def open(self):
+        """(Re)creates the underlying pooled client if it has been closed."""
+        if self.client.is_closed:
+            self.client = self._build_client()
 
     def _get_url(self, endpoint: str) -> str:
         return f"{self.base_url.rstrip('/')}/{endpoint.lstrip('/')}"
@@ -23,24 +75,28 @@ class ExternalAPIClient:
         except httpx.HTTPStatusError as e:
             try:
                 err_json = response.json()
+            except ValueError:
                 logger.error(
-                    "HTTP error occurred: %s, Response JSON: %s",
+                    "HTTP Error: %s, Response Text: %s",
                     e,
-                    err_json,
+                    response.text,
                 )
-
                 raise InternalAppError(
-                    err_json.get("message", "An unknown error occurred"),
+                    response.text or "An unknown error occurred",
                     code=response.status_code,
-                    payload=err_json,
                 ) from e
-            except Exception:
-                logger.error(
-                    "HTTP Error: %s, Response Text: %s",
-                    e,
-                    response.text,
-                )
-                raise
+
+            logger.error(
+                "HTTP error occurred: %s, Response JSON: %s",
+                e,
+                err_json,
+            )
+            message = err_json.get("message") if isinstance(err_json, dict) else None
+            raise InternalAppError(
+                message or "An unknown error occurred",
+                code=response.status_code,
+                payload=err_json if isinstance(err_json, dict) else None,
+            ) from e
         except ValueError as e:
             logger.error(
                 "JSON Decode Error: %s, Response Text: %s",
@@ -49,18 +105,55 @@ class ExternalAPIClient:
             )
             raise
 
-    async def _get(
+    async def _send(self, method: str, endpoint: str, **kwargs) -> httpx.Response:
+        url = self._get_url(endpoint)
+        headers = {**self.headers, **(kwargs.pop("headers", None) or {})}
+
+        self._waiting += 1
+        started = time.perf_counter()
+        try:
+            if self._slots is not None:
+                await asyncio.wait_for(self._slots.acquire(), self._pool_timeout)
+        except asyncio.TimeoutError as e:
+            OUTBOUND_REQUESTS.labels(self.name, method, "PoolTimeout").inc()
+            raise httpx.PoolTimeout(f"Timed out waiting for a connection to {self.base_url}") from e
+        finally:
+            self._waiting -= 1
+        waited = time.perf_counter() - started
+
+        self._requests_total += 1
+        self._wait_seconds_total += waited
+        self._wait_seconds_max = max(self._wait_seconds_max, waited)
+        self._in_flight += 1
+        OUTBOUND_IN_FLIGHT.labels(self.name).inc()
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+            status = str(response.status_code)
+            return response
+        except Exception as e:
+            status = type(e).__name__
+            raise
+        finally:
+            OUTBOUND_SECONDS.labels(self.name, method).observe(time.perf_counter() - started)
+            OUTBOUND_REQUESTS.labels(self.name, method, status).inc()
+            OUTBOUND_IN_FLIGHT.labels(self.name).dec()
+            self._in_flight -= 1
+            if self._slots is not None:
+                self._slots.release()
+
+    async def get(
         self,
         endpoint: str,
         params: dict | None = None,
         headers: dict | None = None,
     ):
-        url = self._get_url(endpoint)
-        merged_headers = {**self.headers, **(headers or {})}
-        response = await self.client.get(
-            url,
+        response = await self._send(
+            "GET",
+            endpoint,
             params=params,
-            headers=merged_headers,
+            headers=headers,
         )
         return await self._handle_response(response)
 
@@ -70,12 +163,11 @@ class ExternalAPIClient:
         data: dict | None = None,
         headers: dict | None = None,
     ):
-        url = self._get_url(endpoint)
-        merged_headers = {**self.headers, **(headers or {})}
-        response = await self.client.post(
-            url,
+        response = await self._send(
+            "POST",
+            endpoint,
             json=data,
-            headers=merged_headers,
+            headers=headers,
         )
         return await self._handle_response(response)
 
@@ -85,12 +177,11 @@ class ExternalAPIClient:
         data: dict | None = None,
         headers: dict | None = None,
     ):
-        url = self._get_url(endpoint)
-        merged_headers = {**self.headers, **(headers or {})}
-        response = await self.client.put(
-            url,
+        response = await self._send(
+            "PUT",
+            endpoint,
             json=data,
-            headers=merged_headers,
+            headers=headers,
         )
         return await self._handle_response(response)
 
@@ -100,14 +191,30 @@ class ExternalAPIClient:
         data: dict | None = None,
         headers: dict | None = None,
     ):
-        url = self._get_url(endpoint)
-        merged_headers = {**self.headers, **(headers or {})}
-        response = await self.client.delete(
-            url,
+        response = await self._send(
+            "DELETE",
+            endpoint,
             params=data,
-            headers=merged_headers,
+            headers=headers,
         )
         return await self._handle_response(response)
 
+    def pool_stats(self) -> dict:
+        """
+        Snapshot of connection pool usage for this client, as seen by the
+        admission semaphore (httpx does not expose its pool's connections).
+        """
+        return {
+            "base_url": self.base_url,
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "requests_in_flight": self._in_flight,
+            "requests_waiting": self._waiting,
+            "requests_total": self._requests_total,
+            "pool_wait_seconds_total": round(self._wait_seconds_total, 6),
+            "pool_wait_seconds_max": round(self._wait_seconds_max, 6),
+        }
+
     async def close(self):
         await self.client.aclose()
@@ -0,0 +1,194 @@
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator
+
+import httpx
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily, CounterMetricFamily, REGISTRY
+
+from app.shared.single_flight import single_flight_stats
+
+# Metrics live in the default registry of each worker process; with several
+# uvicorn workers every scrape sees one worker only.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+
+STAGE_SECONDS = Histogram(
+    "trip_stage_seconds",
+    "Time spent in one stage of trip planning.",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_ERRORS = Counter(
+    "trip_stage_errors_total",
+    "Stages that ended with an exception.",
+    ["stage"],
+)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_seconds",
+    "Latency of requests served by this app, by route template.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being served by this worker.",
+)
+
+OUTBOUND_REQUESTS = Counter(
+    "outbound_requests_total",
+    "Requests made to upstream APIs, by response status (or error type).",
+    ["upstream", "method", "status"],
+)
+OUTBOUND_SECONDS = Histogram(
+    "outbound_request_seconds",
+    "Latency of requests to upstream APIs, excluding time waiting for a connection.",
+    ["upstream", "method"],
+    buckets=LATENCY_BUCKETS,
+)
+OUTBOUND_IN_FLIGHT = Gauge(
+    "outbound_requests_in_flight",
+    "Requests to upstream APIs currently in flight.",
+    ["upstream"],
+)
+
+HISTORY_WRITES = Counter(
+    "history_writes_total",
+    "Itinerary history rows by outcome of the write-behind buffer (written, retried, dropped).",
+    ["result"],
+)
+HISTORY_BUFFER_DEPTH = Gauge(
+    "history_buffer_depth",
+    "Itinerary history rows waiting to be written.",
+)
+
+INSIGHT_TIMEOUTS = Counter(
+    "qloo_insight_timeouts_total",
+    "Qloo insight calls that timed out and were answered with an empty result, by insight type.",
+    ["type"],
+)
+
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "Cache lookups by cache and result (hit, stale, miss, error).",
+    ["cache", "result"],
+)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Times the enclosed block into `trip_stage_seconds{stage=...}`."""
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.labels(stage).inc()
+        raise
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - started)
+
+
+def traced(stage: str) -> Callable:
+    """Decorator form of `span` for coroutine functions."""
+    def decorator(fn: Callable) -> Callable:
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with span(stage):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps an httpx transport to record outbound metrics for clients that do
+    not go through `ExternalAPIClient` (e.g. the OpenAI SDK). Latency and
+    in-flight counts cover the time until response headers arrive.
+    """
+
+    def __init__(self, upstream: str, transport):
+        self.upstream = upstream
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        OUTBOUND_IN_FLIGHT.labels(self.upstream).inc()
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = await self.transport.handle_async_request(request)
+            status = str(response.status_code)
+            return response
+        except Exception as e:
+            status = type(e).__name__
+            raise
+        finally:
+            OUTBOUND_SECONDS.labels(self.upstream, request.method).observe(time.perf_counter() - started)
+            OUTBOUND_REQUESTS.labels(self.upstream, request.method, status).inc()
+            OUTBOUND_IN_FLIGHT.labels(self.upstream).dec()
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+def record_cache_lookup(cache: str, result: str):
+    CACHE_LOOKUPS.labels(cache, result).inc()
+
+
+class _StatsCollector:
+    """Exports connection pool and single-flight counters at scrape time."""
+
+    def __init__(self):
+        self.clients: Dict[str, object] = {}
+        self.db_pools: Dict[str, Callable[[], dict]] = {}
+
+    def collect(self):
+        pool_waiting = GaugeMetricFamily("outbound_pool_requests_waiting", "Requests waiting for a connection.", labels=["upstream"])
+        pool_wait = CounterMetricFamily("outbound_pool_wait_seconds", "Total time spent waiting for a connection.", labels=["upstream"])
+        for name, client in self.clients.items():
+            stats = client.pool_stats()
+            pool_waiting.add_metric([name], stats["requests_waiting"])
+            pool_wait.add_metric([name], stats["pool_wait_seconds_total"])
+        yield from (pool_waiting, pool_wait)
+
+        db_checked_out = GaugeMetricFamily("db_pool_connections_checked_out", "Database connections in use.", labels=["pool"])
+        db_idle = GaugeMetricFamily("db_pool_connections_idle", "Idle database connections.", labels=["pool"])
+        db_overflow = GaugeMetricFamily("db_pool_overflow", "Connections open beyond pool_size.", labels=["pool"])
+        db_waiting = GaugeMetricFamily("db_pool_requests_waiting", "Checkouts waiting for a database connection.", labels=["pool"])
+        db_wait = CounterMetricFamily("db_pool_wait_seconds", "Total time spent waiting for a database connection.", labels=["pool"])
+        for name, stats_fn in self.db_pools.items():
+            stats = stats_fn()
+            db_checked_out.add_metric([name], stats["checked_out"])
+            db_idle.add_metric([name], stats["idle"])
+            db_overflow.add_metric([name], stats["overflow"])
+            db_waiting.add_metric([name], stats["requests_waiting"])
+            db_wait.add_metric([name], stats["wait_seconds_total"])
+        yield from (db_checked_out, db_idle, db_overflow, db_waiting, db_wait)
+
+        originated = CounterMetricFamily("single_flight_originated", "Calls that went to the backend.", labels=["group"])
+        coalesced = CounterMetricFamily("single_flight_coalesced", "Calls that joined one already in flight.", labels=["group"])
+        in_flight = GaugeMetricFamily("single_flight_in_flight", "Distinct calls currently in flight.", labels=["group"])
+        for group, stats in single_flight_stats().items():
+            originated.add_metric([group], stats["originated"])
+            coalesced.add_metric([group], stats["coalesced"])
+            in_flight.add_metric([group], stats["in_flight"])
+        yield from (originated, coalesced, in_flight)
+
+
+_stats_collector = _StatsCollector()
+REGISTRY.register(_stats_collector)
+
+
+def register_pool(name: str, client):
+    """Exports `client.pool_stats()` under the given upstream name."""
+    _stats_collector.clients[name] = client
+
+
+def register_db_pool(name: str, stats_fn: Callable[[], dict]):
+    """Exports a database pool's stats (see `app.database.pool_stats`) under the given name."""
+    _stats_collector.db_pools[name] = stats_fn
+
+
+def render_metrics() -> tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
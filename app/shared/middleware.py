@@ -0,0 +1,94 @@
+import time
+import uuid
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.shared.log_config import request_id_var
+from app.shared.metrics import HTTP_IN_FLIGHT, HTTP_REQUEST_SECONDS
+
+
+# Plain ASGI middleware rather than `@app.middleware("http")`, so streamed
+# (SSE / NDJSON) responses pass through untouched instead of being relayed
+# by BaseHTTPMiddleware
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the matched route, e.g. `/api/v1/sql/history/{user_id}`, to keep metric labels bounded."""
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    path = scope["path"]
+    if route.path_regex.match(path):
+        return route.path
+    # Routes of included routers may carry only their own part of the path;
+    # the router prefixes have no parameters, so take them from the URL
+    prefix = path.rsplit("/", route.path.count("/"))[0]
+    return prefix + route.path
+
+
+class RequestMetricsMiddleware:
+    """Request latency (until the response headers are sent) and in-flight requests, per route."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        observed = False
+
+        def observe(status: int):
+            nonlocal observed
+            if not observed:
+                observed = True
+                HTTP_REQUEST_SECONDS.labels(
+                    scope["method"],
+                    route_template(scope),
+                    str(status),
+                ).observe(time.perf_counter() - started)
+
+        async def send_with_metrics(message: Message):
+            if message["type"] == "http.response.start":
+                observe(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            observe(500)
+            HTTP_IN_FLIGHT.dec()
+
+
+class RequestIdMiddleware:
+    """
+    Correlates every log line of a request; reuses the caller's X-Request-ID
+    if given, and returns it on the response. The id is also kept in
+    `request.state.request_id`.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("X-Request-ID") or uuid.uuid4().hex
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        async def send_with_request_id(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,63 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Callable, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedProcessPool:
+    """
+    Process pool for CPU-bound work that would otherwise block the event loop.
+
+    Workers are spawned on first use, not forked, so they do not inherit the
+    event loop, open sockets or the logging thread. At most `max_pending`
+    tasks are handed to the executor at once; further callers wait their
+    turn, which keeps the executor's queue (and the arguments pickled into
+    it) bounded. Workers are replaced after `max_tasks_per_child` tasks to
+    return memory held by the parsing libraries.
+    """
+
+    def __init__(self, name: str, workers: int, max_pending: int, max_tasks_per_child: Optional[int] = None):
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_tasks_per_child = max_tasks_per_child
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=self.max_tasks_per_child,
+            )
+        return self._executor
+
+    async def run(self, fn: Callable, *args):
+        """Runs `fn(*args)` in a worker process; `fn` and its arguments must be picklable."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+
+        async with self._slots:
+            executor = self._get_executor()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(executor, partial(fn, *args))
+            except BrokenProcessPool:
+                # A worker died (e.g. a parser crashed on a malformed file);
+                # the executor is unusable from here on, so start a new one
+                logger.error("Process pool %s broke; restarting it", self.name)
+                if self._executor is executor:
+                    self._executor = None
+                    executor.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
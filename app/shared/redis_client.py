@@ -0,0 +1,44 @@
+import time
+from redis.asyncio import Redis
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
+
+from app.config import settings
+
+# After a connection failure, callers skip Redis for this long instead of
+# paying the connect timeout on every request.
+REDIS_RETRY_SECONDS = 30.0
+
+_redis: Redis | None = None
+_unavailable_until = 0.0
+
+
+def get_redis() -> Redis:
+    """Shared asyncio Redis client built from the app settings (lazily created)."""
+    global _redis
+    if _redis is None:
+        _redis = Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            password=settings.REDIS_PASSWORD or None,
+            socket_timeout=2.0,
+            socket_connect_timeout=2.0,
+            retry=Retry(ExponentialBackoff(cap=0.2, base=0.05), retries=1),
+        )
+    return _redis
+
+
+async def close_redis():
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+def redis_available() -> bool:
+    return time.monotonic() >= _unavailable_until
+
+
+def mark_redis_unavailable():
+    global _unavailable_until
+    _unavailable_until = time.monotonic() + REDIS_RETRY_SECONDS
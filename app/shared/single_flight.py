@@ -0,0 +1,54 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls into one.
+
+    The first caller for a key starts the call; callers arriving while it is
+    still in flight await the same task instead of issuing their own. A
+    cancelled caller does not cancel the shared call for the others.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.originated = 0
+        self.coalesced = 0
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        _groups[name] = self
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            self.originated += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved when every caller has gone away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "originated": self.originated,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls),
+        }
+
+
+_groups: Dict[str, SingleFlight] = {}
+
+
+def single_flight_stats() -> dict:
+    """Counters for every single-flight group, keyed by group name."""
+    return {name: group.stats() for name, group in _groups.items()}
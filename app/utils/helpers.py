@@ -0,0 +1,16 @@
+import json
+from typing import Any
+
+
+def format_sse(data: Any, event: str | None = None) -> str:
+    """Encodes one server-sent event; `data` is sent as a single JSON line."""
+    message = f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+    if event:
+        message = f"event: {event}\n{message}"
+    return message
+
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # stop reverse proxies from buffering the stream
+}
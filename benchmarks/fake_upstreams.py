@@ -0,0 +1,200 @@
+"""
+Local stand-ins for the Qloo, OpenWeatherMap and OpenAI APIs.
+
+One server answers all three so the app can be pointed at it through
+QLOO_BASE_URL, OPENWEATHERMAP_BASE_URL and OPENAI_BASE_URL:
+
+    python -m benchmarks.fake_upstreams --port 9100 \
+        --qloo-latency lognormal:150,0.4 --openai-latency fixed:2000 --qloo-error-rate 0.01
+
+Latency specs: fixed:<ms> | uniform:<lo_ms>,<hi_ms> | lognormal:<median_ms>,<sigma>
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+from dataclasses import dataclass
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DESTINATIONS = ["Lisbon", "Kyoto", "Lagos", "Mexico City", "Berlin", "Seoul"]
+TASTES = ["jazz", "seafood", "bookstores", "street food", "museums", "techno"]
+STYLES = ["relaxing", "adventurous", "low budget", "luxury"]
+
+
+@dataclass
+class Latency:
+    kind: str
+    a: float
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        kind, _, args = spec.partition(":")
+        values = [float(v) for v in args.split(",") if v]
+        if kind not in ("fixed", "uniform", "lognormal") or not values:
+            raise argparse.ArgumentTypeError(f"Bad latency spec: {spec}")
+        return cls(kind, *values)
+
+    def sample(self) -> float:
+        """Seconds to wait for one response."""
+        if self.kind == "fixed":
+            ms = self.a
+        elif self.kind == "uniform":
+            ms = random.uniform(self.a, self.b)
+        else:
+            ms = random.lognormvariate(math.log(self.a), self.b)
+        return max(ms, 0.0) / 1000
+
+
+@dataclass
+class UpstreamProfile:
+    latency: Latency
+    error_rate: float = 0.0
+
+
+def _pick(seed: str, options: list, count: int = 1) -> list:
+    digest = int(hashlib.sha256(seed.encode()).hexdigest(), 16)
+    return [options[(digest >> (8 * i)) % len(options)] for i in range(count)]
+
+
+def create_app(qloo: UpstreamProfile, weather: UpstreamProfile, openai: UpstreamProfile,
+               token_delay: float, tokens: int) -> FastAPI:
+    app = FastAPI(title="Fake upstreams")
+
+    async def delay_or_fail(profile: UpstreamProfile):
+        await asyncio.sleep(profile.latency.sample())
+        if random.random() < profile.error_rate:
+            return JSONResponse(status_code=503, content={"message": "injected failure"})
+        return None
+
+    @app.get("/v2/insights")
+    @app.get("/v2/insights/")
+    async def insights(request: Request):
+        if (failure := await delay_or_fail(qloo)) is not None:
+            return failure
+        filter_type = request.query_params.get("filter.type", "")
+        if filter_type == "urn:demographics":
+            return {"success": True, "data": {"age": [
+                {"group": "24_and_younger", "score": random.random()},
+                {"group": "25_to_29", "score": random.random()},
+            ]}}
+        if filter_type == "urn:heatmap":
+            return {"success": True, "data": {"points": [
+                {"location": {"latitude": 38.7 + random.random() / 10, "longitude": -9.1 - random.random() / 10}}
+                for _ in range(5)
+            ]}}
+        entities = [
+            {"name": f"Fake Place {i}", "properties": {
+                "address": f"{i} Rua Falsa", "business_rating": 4.5, "keywords": [{"name": "cozy"}],
+            }}
+            for i in range(8)
+        ]
+        return {"success": True, "results": {"entities": entities}, "data": [{"name": e["name"]} for e in entities]}
+
+    @app.get("/data/2.5/forecast")
+    async def forecast(q: str = "Lisbon"):
+        if (failure := await delay_or_fail(weather)) is not None:
+            return failure
+        now = int(time.time())
+        entries = []
+        for step in range(40):
+            ts = now + step * 3 * 3600
+            entries.append({
+                "dt": ts,
+                "dt_txt": time.strftime("%Y-%m-%d %H:00:00", time.gmtime(ts - ts % (3 * 3600))),
+                "main": {"temp": round(15 + 10 * random.random(), 1)},
+                "weather": [{"description": random.choice(["clear sky", "light rain", "few clouds"])}],
+            })
+        return {"cod": "200", "list": entries, "city": {"name": q}}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if (failure := await delay_or_fail(openai)) is not None:
+            return failure
+
+        prompt = body["messages"][-1]["content"]
+        system = body["messages"][0]["content"]
+        trip = {
+            "destination": _pick(prompt, DESTINATIONS)[0],
+            "duration": f"{_pick(prompt + 'd', [3, 4, 5, 7])[0]} days",
+            "tastes": sorted(set(_pick(prompt + "t", TASTES, 2))),
+            "style": _pick(prompt + "s", STYLES),
+        }
+        completion = {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4"),
+            "usage": {"prompt_tokens": 200, "completion_tokens": tokens, "total_tokens": 200 + tokens},
+        }
+
+        if body.get("tools"):
+            arguments = json.dumps({"is_complete": True, "missing_fields": [], **trip})
+            completion["choices"] = [{"index": 0, "finish_reason": "tool_calls", "message": {
+                "role": "assistant", "content": None,
+                "tool_calls": [{"id": "call_fake", "type": "function",
+                                "function": {"name": "report_trip", "arguments": arguments}}],
+            }}]
+            return completion
+
+        if "Respond ONLY with true or false" in system:
+            content = "true"
+        elif "Extract structured trip data" in system:
+            content = json.dumps(trip)
+        else:
+            content = " ".join(f"word{i}" for i in range(tokens))
+
+        if not body.get("stream"):
+            completion["choices"] = [{"index": 0, "finish_reason": "stop",
+                                      "message": {"role": "assistant", "content": content}}]
+            return completion
+
+        async def chunks():
+            for word in content.split(" "):
+                await asyncio.sleep(token_delay)
+                chunk = {**completion, "object": "chat.completion.chunk",
+                         "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+                chunk.pop("usage")
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--qloo-latency", type=Latency.parse, default=Latency.parse("lognormal:150,0.4"))
+    parser.add_argument("--weather-latency", type=Latency.parse, default=Latency.parse("lognormal:120,0.3"))
+    parser.add_argument("--openai-latency", type=Latency.parse, default=Latency.parse("lognormal:1500,0.5"))
+    parser.add_argument("--qloo-error-rate", type=float, default=0.0)
+    parser.add_argument("--weather-error-rate", type=float, default=0.0)
+    parser.add_argument("--openai-error-rate", type=float, default=0.0)
+    parser.add_argument("--openai-token-delay-ms", type=float, default=5.0,
+                        help="Delay between streamed tokens")
+    parser.add_argument("--openai-tokens", type=int, default=300,
+                        help="Words in a generated itinerary")
+    args = parser.parse_args()
+
+    app = create_app(
+        qloo=UpstreamProfile(args.qloo_latency, args.qloo_error_rate),
+        weather=UpstreamProfile(args.weather_latency, args.weather_error_rate),
+        openai=UpstreamProfile(args.openai_latency, args.openai_error_rate),
+        token_delay=args.openai_token_delay_ms / 1000,
+        tokens=args.openai_tokens,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
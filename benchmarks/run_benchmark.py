@@ -0,0 +1,242 @@
+"""
+Offline end-to-end benchmark of the trip-planning endpoints.
+
+Starts the fake upstreams and the app (uvicorn) as subprocesses, points the
+app at the fakes through QLOO_BASE_URL / OPENWEATHERMAP_BASE_URL /
+OPENAI_BASE_URL, then drives the endpoints open-loop at a target rate and
+reports latency percentiles and throughput per endpoint:
+
+    python -m benchmarks.run_benchmark --rps 20 --duration 60
+    python -m benchmarks.run_benchmark --endpoint extract-info --rps 50 \
+        --upstream-arg=--openai-latency=fixed:800 --json results.json
+
+Pass --app-url to drive an app that is already running (it must already be
+configured against the fakes, or real upstreams if that is what you want).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Complete prompts go through the local parser; vague ones need the LLM
+PROMPTS = [
+    "Plan a 4-day relaxing trip to Lisbon, I love jazz and seafood",
+    "5 days in Kyoto, adventurous, into street food and museums",
+    "A low budget weekend in Berlin for techno and bookstores",
+    "Take me somewhere warm for a week, I like good food",
+    "Something cultural and chill with live music, maybe 3 days",
+    "One week in Mexico City, luxury, art and tacos",
+]
+
+CT_PAYLOADS = [
+    {"destination": "Lisbon", "duration": "4 days", "tastes": ["jazz", "seafood"],
+     "style": ["relaxing"], "original_prompt": PROMPTS[0]},
+    {"destination": "Kyoto", "duration": "5 days", "tastes": ["street food", "museums"],
+     "style": ["adventurous"], "original_prompt": PROMPTS[1]},
+]
+
+ENDPOINTS: Dict[str, tuple[str, Callable[[], dict]]] = {
+    "plan-trip": ("/api/v1/endpoint/plan-trip", lambda: {"prompt": random.choice(PROMPTS)}),
+    "ct-plan-trip": ("/api/v1/ct-planner/plan-trip", lambda: random.choice(CT_PAYLOADS)),
+    "extract-info": ("/api/v1/trip/extract-info", lambda: {"prompt": random.choice(PROMPTS)}),
+}
+
+
+@dataclass
+class EndpointResult:
+    name: str
+    latencies: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    started: int = 0
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def summary(self, elapsed: float) -> dict:
+        ok = sum(count for status, count in self.statuses.items() if isinstance(status, int) and status < 400)
+        return {
+            "endpoint": self.name,
+            "requests": self.started,
+            "completed": len(self.latencies),
+            "ok": ok,
+            "errors": self.started - ok,
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+            "throughput_rps": round(ok / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": _ms(self.percentile(50)),
+            "p95_ms": _ms(self.percentile(95)),
+            "p99_ms": _ms(self.percentile(99)),
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+async def _one_request(http: httpx.AsyncClient, path: str, body: dict, result: EndpointResult):
+    start = time.perf_counter()
+    try:
+        response = await http.post(path, json=body)
+        result.statuses[response.status_code] += 1
+    except httpx.HTTPError as e:
+        result.statuses[type(e).__name__] += 1
+        return
+    result.latencies.append(time.perf_counter() - start)
+
+
+async def drive(app_url: str, names: List[str], rps: float, duration: float,
+                timeout: float, max_in_flight: int) -> tuple[List[EndpointResult], float]:
+    """
+    Open-loop load: requests are started on a fixed schedule regardless of how
+    fast earlier ones finish, so slow responses show up as latency instead of
+    silently lowering the offered rate.
+    """
+    results = {name: EndpointResult(name) for name in names}
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+    async with httpx.AsyncClient(base_url=app_url, timeout=timeout, limits=limits) as http:
+        tasks = []
+        total = int(rps * duration)
+        start = time.perf_counter()
+        for index in range(total):
+            delay = start + index / rps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            name = names[index % len(names)]
+            path, make_body = ENDPOINTS[name]
+            results[name].started += 1
+            tasks.append(asyncio.create_task(_one_request(http, path, make_body(), results[name])))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+    return list(results.values()), elapsed
+
+
+def _wait_until_up(url: str, process: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode}")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def _start_stack(args) -> List[subprocess.Popen]:
+    upstream_url = f"http://127.0.0.1:{args.upstream_port}"
+    upstream = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fake_upstreams", "--port", str(args.upstream_port), *args.upstream_arg],
+        cwd=REPO_ROOT,
+    )
+    _wait_until_up(upstream_url + "/docs", upstream)
+
+    env = {
+        # Required settings that the benchmark does not exercise
+        "POSTGRES_USER": "bench", "POSTGRES_PASSWORD": "bench", "POSTGRES_DB": "bench",
+        "POSTGRES_HOST": "127.0.0.1", "POSTGRES_PORT": "5432",
+        "REDIS_HOST": "127.0.0.1", "REDIS_PORT": "6379", "REDIS_PASSWORD": "",
+        **os.environ,
+        "QLOO_BASE": upstream_url,
+        "QLOO_BASE_URL": upstream_url,
+        "QLOO_API_KEY": "bench",
+        "OPENWEATHERMAP_BASE_URL": upstream_url + "/data/2.5",
+        "WEATHERAPPID": "bench",
+        "OPENAI_BASE_URL": upstream_url + "/v1",
+        "OPENAI_API_KEY": "bench",
+    }
+    if args.no_cache:
+        env["QLOO_CACHE_ENABLED"] = "false"
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.app_port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=REPO_ROOT,
+        env=env,
+        stdout=None if args.verbose else subprocess.DEVNULL,
+    )
+    processes = [upstream, app]
+    try:
+        _wait_until_up(f"http://127.0.0.1:{args.app_port}/docs", app)
+    except Exception:
+        _stop(processes)
+        raise
+    return processes
+
+
+def _stop(processes: List[subprocess.Popen]):
+    for process in reversed(processes):
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def _print_table(summaries: List[dict], elapsed: float):
+    columns = ["endpoint", "requests", "ok", "errors", "throughput_rps", "p50_ms", "p95_ms", "p99_ms"]
+    rows = [[str(summary[column]) for column in columns] for summary in summaries]
+    widths = [max(len(column), *(len(row[i]) for row in rows)) for i, column in enumerate(columns)]
+    print(f"\nCompleted in {elapsed:.1f}s")
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+    for summary in summaries:
+        if summary["errors"]:
+            print(f"{summary['endpoint']} statuses: {summary['statuses']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint", action="append", choices=sorted(ENDPOINTS),
+                        help="Endpoint to drive; repeat for a mix (default: all)")
+    parser.add_argument("--rps", type=float, default=10.0, help="Target request rate across all endpoints")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to offer load for")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request client timeout")
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--app-url", help="Drive an already running app instead of starting one")
+    parser.add_argument("--app-port", type=int, default=9000)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the app")
+    parser.add_argument("--upstream-port", type=int, default=9100)
+    parser.add_argument("--upstream-arg", action="append", default=[],
+                        help="Extra argument for benchmarks.fake_upstreams, e.g. --upstream-arg=--qloo-error-rate=0.05")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the Qloo Redis cache in the app")
+    parser.add_argument("--verbose", action="store_true", help="Show the app's stdout")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    names = args.endpoint or sorted(ENDPOINTS)
+
+    processes = [] if args.app_url else _start_stack(args)
+    app_url = args.app_url or f"http://127.0.0.1:{args.app_port}"
+    try:
+        results, elapsed = asyncio.run(
+            drive(app_url, names, args.rps, args.duration, args.timeout, args.max_in_flight)
+        )
+    finally:
+        _stop(processes)
+
+    summaries = [result.summary(elapsed) for result in results]
+    _print_table(summaries, elapsed)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"rps": args.rps, "duration": args.duration, "elapsed": elapsed, "results": summaries}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
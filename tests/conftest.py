@@ -0,0 +1,19 @@
+import os
+
+# app.config builds its settings at import time; these let modules that
+# read them be imported without a .env. Real environment values win.
+for name, value in {
+    "OPENAI_API_KEY": "test",
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+    "REDIS_PASSWORD": "",
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "POSTGRES_DB": "test",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "QLOO_API_KEY": "test",
+    "QLOO_BASE": "http://qloo.test",
+    "WEATHERAPPID": "test",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,83 @@
+# pytest tests/test_batch_planner_service.py
+
+import json
+import asyncio
+
+import pytest
+
+from app.schemas.prompt_request import BatchPromptRequest
+from app.schemas.tripdata import TripData
+from app.services import batch_planner_service
+from app.shared.errors import AppError
+
+
+TRIPS = {
+    "jazz in Paris": ("Paris", ["jazz"]),
+    "Jazz in  paris again": ("paris ", ["Jazz"]),
+    "sushi in Tokyo": ("Tokyo", ["sushi"]),
+    "nothing in Rome": ("Rome", []),
+    "slow in Oslo": ("Oslo", ["metal"]),
+}
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = {"lookups": [], "generated": []}
+
+    async def extract(prompt, model):
+        if prompt == "broken":
+            raise AppError("Could not understand the prompt", 422)
+        if prompt == "slow in Oslo":
+            await asyncio.sleep(0.2)
+        destination, tastes = TRIPS[prompt]
+        return TripData(destination=destination, duration="2 days", tastes=tastes, style=[], original_prompt=prompt)
+
+    async def get_insights(endpoints, return_exceptions=False):
+        calls["lookups"].extend(endpoints)
+        await asyncio.sleep(0.01)
+        if "sushi" in endpoints[0]:
+            return [AppError("Qloo is down", 502)]
+        return [{"results": {"entities": [{"name": endpoints[0]}]}}]
+
+    async def complete(request, trip, places):
+        calls["generated"].append(request.prompt)
+        return {"destination": trip.destination, "places": len(places)}
+
+    monkeypatch.setattr(batch_planner_service, "extract_trip_data", extract)
+    monkeypatch.setattr(batch_planner_service, "get_insights", get_insights)
+    monkeypatch.setattr(batch_planner_service, "complete_prompt_trip", complete)
+    return calls
+
+
+def plan(prompts):
+    async def collect():
+        return [json.loads(line) async for line in batch_planner_service.plan_trips_batch(BatchPromptRequest(prompts=prompts))]
+
+    return asyncio.run(collect())
+
+
+def test_identical_lookups_are_fetched_once(calls):
+    lines = plan(["jazz in Paris", "Jazz in  paris again"])
+
+    assert len(calls["lookups"]) == 1
+    assert sorted(line["index"] for line in lines) == [0, 1]
+    assert all(line["status"] == "ok" and line["result"]["places"] == 1 for line in lines)
+
+
+def test_failures_become_error_lines(calls):
+    lines = {line["index"]: line for line in plan(["broken", "sushi in Tokyo", "nothing in Rome", "jazz in Paris"])}
+
+    assert lines[0]["error"] == {"detail": "Could not understand the prompt", "status_code": 422}
+    assert lines[1]["error"] == {"detail": "Qloo is down", "status_code": 502}
+    assert lines[2]["error"]["status_code"] == 400
+    assert lines[3]["status"] == "ok"
+    assert lines[1]["prompt"] == "sushi in Tokyo"
+    assert calls["generated"] == ["jazz in Paris"]
+
+
+def test_prompts_do_not_wait_for_slow_extractions(calls):
+    lines = plan(["slow in Oslo", "jazz in Paris"])
+
+    assert [line["index"] for line in lines] == [1, 0]
+    # Paris was looked up and generated while Oslo was still being extracted
+    assert calls["generated"] == ["jazz in Paris", "slow in Oslo"]
@@ -0,0 +1,26 @@
+# pytest tests/test_errors.py
+
+import logging
+
+from fastapi import HTTPException
+from app.shared.errors import AppError, InternalAppError, error_payload
+
+def test_known_errors_keep_their_status():
+    assert error_payload(HTTPException(status_code=400, detail="No tastes")) == {"detail": "No tastes", "status_code": 400}
+    assert error_payload(AppError("Too large", 413)) == {"detail": "Too large", "status_code": 413}
+    assert error_payload(InternalAppError("Busy", code=503)) == {"detail": "Busy", "status_code": 503}
+
+def test_unexpected_errors_are_logged_as_500(caplog):
+    with caplog.at_level(logging.ERROR, logger="app.shared.errors"):
+        payload = error_payload(KeyError("dt_txt"), "Error during plan-trip stream")
+
+    assert payload == {"detail": "'dt_txt'", "status_code": 500}
+    [record] = caplog.records
+    assert record.getMessage() == "Error during plan-trip stream"
+    assert record.exc_info[0] is KeyError
+
+def test_known_errors_are_not_logged(caplog):
+    with caplog.at_level(logging.ERROR, logger="app.shared.errors"):
+        error_payload(AppError("Not found", 404))
+
+    assert caplog.records == []
@@ -0,0 +1,103 @@
+# pytest tests/test_external_api_client.py
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.shared.errors import InternalAppError
+from app.shared.external_api_client import ExternalAPIClient
+
+
+def make_client(handler, max_connections=10, pool_timeout=1.0) -> ExternalAPIClient:
+    api = ExternalAPIClient(
+        "http://upstream.test/v1",
+        timeout=httpx.Timeout(5.0, pool=pool_timeout),
+        limits=httpx.Limits(max_connections=max_connections),
+        name="test_external_api",
+    )
+    api.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return api
+
+
+def test_requests_wait_for_a_free_slot():
+    active = []
+    peak = []
+
+    async def handler(request):
+        active.append(request)
+        peak.append(len(active))
+        await asyncio.sleep(0.02)
+        active.remove(request)
+        return httpx.Response(200, json={"path": request.url.path})
+
+    api = make_client(handler, max_connections=2)
+
+    async def main():
+        return await asyncio.gather(*(api.get(f"/item/{index}") for index in range(5)))
+
+    results = asyncio.run(main())
+    stats = api.pool_stats()
+
+    assert [result["path"] for result in results] == [f"/v1/item/{index}" for index in range(5)]
+    assert max(peak) == 2
+    assert stats["requests_total"] == 5
+    assert stats["requests_in_flight"] == 0
+    assert stats["requests_waiting"] == 0
+    assert stats["pool_wait_seconds_max"] > 0
+
+
+def test_waiting_past_the_pool_timeout_raises_pool_timeout():
+    async def handler(request):
+        await asyncio.sleep(0.2)
+        return httpx.Response(200, json={})
+
+    api = make_client(handler, max_connections=1, pool_timeout=0.02)
+
+    async def main():
+        return await asyncio.gather(api.get("/slow"), api.get("/slow"), return_exceptions=True)
+
+    first, second = asyncio.run(main())
+
+    assert first == {}
+    assert isinstance(second, httpx.PoolTimeout)
+    assert api.pool_stats()["requests_total"] == 1
+
+
+def test_error_json_message_and_status_are_kept():
+    api = make_client(lambda request: httpx.Response(404, json={"message": "Unknown tag", "code": "not_found"}))
+
+    with pytest.raises(InternalAppError) as error:
+        asyncio.run(api.get("/insights"))
+
+    assert error.value.status_code == 404
+    assert error.value.message == "Unknown tag"
+    assert error.value.payload == {"message": "Unknown tag", "code": "not_found"}
+
+
+def test_error_without_json_uses_the_body_text():
+    api = make_client(lambda request: httpx.Response(502, text="Bad gateway"))
+
+    with pytest.raises(InternalAppError) as error:
+        asyncio.run(api.post("/insights", data={"q": 1}))
+
+    assert error.value.status_code == 502
+    assert error.value.message == "Bad gateway"
+    assert error.value.payload is None
+
+
+def test_error_with_empty_body_gets_a_generic_message():
+    api = make_client(lambda request: httpx.Response(500))
+
+    with pytest.raises(InternalAppError) as error:
+        asyncio.run(api.get("/insights"))
+
+    assert error.value.status_code == 500
+    assert error.value.message == "An unknown error occurred"
+
+
+def test_successful_response_that_is_not_json_raises_value_error():
+    api = make_client(lambda request: httpx.Response(200, text="<html>"))
+
+    with pytest.raises(ValueError):
+        asyncio.run(api.get("/insights"))
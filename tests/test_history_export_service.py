@@ -0,0 +1,118 @@
+# pytest tests/test_history_export_service.py
+
+import gzip
+import json
+import asyncio
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.base import Base
+from app.models.user import User
+from app.models.UserHistory import UserHistory
+from app.services import history_export_service
+from app.services.history_export_service import export_history
+
+START = datetime(2025, 9, 1, 12, 0, 0)
+ALICE, BOB = uuid4(), uuid4()
+# (user, destination, minutes after START)
+ROWS = [
+    (ALICE, "Lisbon", 0),
+    (BOB, "Paris", 1),
+    (ALICE, "paris", 2),
+    (ALICE, "Tokyo", 3),
+    (BOB, "Lisbon", 4),
+]
+
+
+@pytest.fixture
+def export(monkeypatch, tmp_path):
+    """Runs export_history against a sqlite copy of ROWS; returns the raw chunks."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'history.db'}")
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    monkeypatch.setattr(history_export_service, "read_session_maker", sessions)
+
+    async def setup():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all, tables=[User.__table__, UserHistory.__table__])
+        async with sessions() as session:
+            session.add_all(
+                UserHistory(
+                    id=uuid4(),
+                    user_id=user_id,
+                    prompt=f"A trip to {destination}",
+                    destination=destination,
+                    generated_itinerary=f"## Day 1 in {destination}",
+                    created_at=START + timedelta(minutes=minutes),
+                    updated_at=START + timedelta(minutes=minutes),
+                )
+                for user_id, destination, minutes in ROWS
+            )
+            await session.commit()
+
+    asyncio.run(setup())
+
+    def run(**filters):
+        async def collect():
+            return [chunk async for chunk in export_history(**filters)]
+
+        return asyncio.run(collect())
+
+    yield run
+    asyncio.run(engine.dispose())
+
+
+def records(chunks):
+    return [json.loads(line) for line in b"".join(chunks).splitlines()]
+
+
+def test_everything_is_exported_oldest_first(export):
+    exported = records(export())
+
+    assert [item["destination"] for item in exported] == [destination for _, destination, _ in ROWS]
+    assert exported[0]["generated_itinerary"] == "## Day 1 in Lisbon"
+
+
+def test_filters(export):
+    assert [item["destination"] for item in records(export(user_id=ALICE))] == ["Lisbon", "paris", "Tokyo"]
+    # Destination matches ignore case
+    assert [item["user_id"] for item in records(export(destination="PARIS"))] == [str(BOB), str(ALICE)]
+    # created_from is inclusive, created_to exclusive
+    window = records(export(created_from=START + timedelta(minutes=1), created_to=START + timedelta(minutes=3)))
+    assert [item["destination"] for item in window] == ["Paris", "paris"]
+    assert records(export(user_id=BOB, destination="Tokyo")) == []
+
+
+def test_summary_leaves_out_the_itinerary(export):
+    exported = records(export(summary=True))
+
+    assert len(exported) == len(ROWS)
+    assert all("generated_itinerary" not in item for item in exported)
+
+
+def test_chunks_hold_whole_lines(export, monkeypatch):
+    monkeypatch.setattr(history_export_service, "HISTORY_EXPORT_CHUNK_BYTES", 300)
+
+    chunks = export()
+
+    assert len(chunks) > 1
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+    assert len(records(chunks)) == len(ROWS)
+
+
+def test_gzip_stream_decompresses_to_the_same_ndjson(export, monkeypatch):
+    monkeypatch.setattr(history_export_service, "HISTORY_EXPORT_CHUNK_BYTES", 300)
+
+    plain = b"".join(export(user_id=ALICE))
+    compressed = b"".join(export(user_id=ALICE, compress=True))
+
+    assert compressed[:2] == b"\x1f\x8b"
+    assert gzip.decompress(compressed) == plain
+
+
+def test_empty_gzip_export_is_still_a_valid_file(export):
+    compressed = b"".join(export(destination="Nowhere", compress=True))
+
+    assert gzip.decompress(compressed) == b""
@@ -0,0 +1,106 @@
+# pytest tests/test_history_repo.py
+
+import asyncio
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.base import Base
+from app.models.user import User
+from app.models.UserHistory import UserHistory
+from app.repositories.history_repo import HistoryRepository
+
+START = datetime(2025, 9, 1, 12, 0, 0)
+
+
+def history(user_id: UUID, created_at: datetime, history_id: UUID | None = None) -> UserHistory:
+    return UserHistory(
+        id=history_id or uuid4(),
+        user_id=user_id,
+        prompt="3 days in Lisbon",
+        destination="Lisbon",
+        generated_itinerary="## Day 1",
+        created_at=created_at,
+        updated_at=created_at,
+    )
+
+
+def run_pages(rows, limit, user_id=None, summary=True):
+    """Walks every page; returns the ids of each page and the final cursor."""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def main():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all, tables=[User.__table__, UserHistory.__table__])
+        async with sessions() as session:
+            session.add_all(rows)
+            await session.commit()
+
+        pages, cursor = [], None
+        async with sessions() as session:
+            repo = HistoryRepository(session)
+            while True:
+                page, cursor = await repo.page(user_id=user_id, limit=limit, cursor=cursor, summary=summary)
+                pages.append([row.id for row in page])
+                if cursor is None:
+                    break
+        await engine.dispose()
+        return pages
+
+    return asyncio.run(main())
+
+
+def test_pages_are_newest_first_and_break_ties_on_id():
+    user_id = uuid4()
+    # Three entries share a timestamp, and a page boundary falls among them
+    tied = [history(user_id, START + timedelta(minutes=5)) for _ in range(3)]
+    rows = [history(user_id, START + timedelta(minutes=minutes)) for minutes in (9, 1, 7)] + tied
+
+    pages = run_pages(rows, limit=2)
+
+    expected = [row.id for row in sorted(rows, key=lambda row: (row.created_at, row.id), reverse=True)]
+    assert [len(page) for page in pages] == [2, 2, 2]
+    assert [history_id for page in pages for history_id in page] == expected
+
+
+def test_last_full_page_has_no_cursor():
+    def rows():
+        user_id = uuid4()
+        return [history(user_id, START + timedelta(minutes=minutes)) for minutes in range(4)]
+
+    assert [len(page) for page in run_pages(rows(), limit=2)] == [2, 2]
+    assert [len(page) for page in run_pages(rows(), limit=4)] == [4]
+    assert [len(page) for page in run_pages(rows(), limit=10)] == [4]
+
+
+def test_pages_are_filtered_by_user():
+    mine, theirs = uuid4(), uuid4()
+    rows = [history(mine if index % 2 else theirs, START + timedelta(minutes=index)) for index in range(6)]
+
+    pages = run_pages(rows, limit=2, user_id=mine, summary=False)
+
+    assert [history_id for page in pages for history_id in page] == [row.id for row in reversed(rows) if row.user_id == mine]
+
+
+class CapturingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+
+
+def test_insert_many_is_one_idempotent_insert():
+    session = CapturingSession()
+    rows = [{"id": uuid4(), "user_id": uuid4(), "prompt": f"trip {index}", "generated_itinerary": "## Day 1"} for index in range(3)]
+
+    asyncio.run(HistoryRepository(session).insert_many(rows))
+
+    [statement] = session.statements
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("INSERT INTO user_history")
+    assert sql.count("prompt_m") == 3
+    assert sql.endswith("ON CONFLICT (id) DO NOTHING")
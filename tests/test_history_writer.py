@@ -0,0 +1,126 @@
+# pytest tests/test_history_writer.py
+
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import exc as sa_exc
+
+from app.services import history_writer as writer_module
+from app.services.history_writer import HistoryWriteBuffer
+
+
+def row(label: str) -> dict:
+    return {"id": uuid.uuid4(), "user_id": uuid.uuid4(), "prompt": label}
+
+
+def connection_lost() -> Exception:
+    return sa_exc.OperationalError("INSERT", {}, ConnectionResetError("connection reset"))
+
+
+def rejected() -> Exception:
+    return sa_exc.IntegrityError("INSERT", {}, ValueError("violates foreign key constraint"))
+
+
+class FakeInserts:
+    """Records every batch passed to the database; `fail` returns the error a batch raises, if any."""
+
+    def __init__(self):
+        self.batches = []
+        self.fail = lambda batch: None
+
+    async def __call__(self, batch):
+        self.batches.append([r["prompt"] for r in batch])
+        error = self.fail(batch)
+        if error is not None:
+            raise error
+
+
+@pytest.fixture
+def inserts(monkeypatch):
+    fake = FakeInserts()
+    monkeypatch.setattr(writer_module, "insert_history_rows", fake)
+    monkeypatch.setattr(writer_module, "RETRY_BACKOFF_CAP", 0.01)
+    return fake
+
+
+def test_rows_are_flushed_in_batches_of_max_rows(inserts):
+    async def main():
+        buffer = HistoryWriteBuffer(flush_interval=5, max_rows=3, buffer_size=100)
+        await buffer.start()
+        for index in range(7):
+            await buffer.add(row(f"p{index}"))
+        await asyncio.sleep(0.05)
+        written_before_stop = list(inserts.batches)
+        await buffer.stop()
+        return written_before_stop
+
+    assert asyncio.run(main()) == [["p0", "p1", "p2"], ["p3", "p4", "p5"]]
+    # The partial batch is drained on stop
+    assert inserts.batches[-1] == ["p6"]
+
+
+def test_partial_batch_is_flushed_after_the_interval(inserts):
+    async def main():
+        buffer = HistoryWriteBuffer(flush_interval=0.05, max_rows=100, buffer_size=100)
+        await buffer.start()
+        await buffer.add(row("p0"))
+        await buffer.add(row("p1"))
+        await asyncio.sleep(0.2)
+        written = list(inserts.batches)
+        await buffer.stop()
+        return written
+
+    assert asyncio.run(main()) == [["p0", "p1"]]
+
+
+def test_connection_failures_are_retried_until_written(inserts):
+    failures = iter([connection_lost(), connection_lost()])
+    inserts.fail = lambda batch: next(failures, None)
+
+    async def main():
+        buffer = HistoryWriteBuffer(flush_interval=0.01, max_rows=10, buffer_size=100)
+        await buffer.start()
+        await buffer.add(row("p0"))
+        await buffer.stop()
+
+    asyncio.run(main())
+    assert inserts.batches == [["p0"], ["p0"], ["p0"]]
+
+
+def test_rejected_batch_is_split_at_once_and_only_the_bad_row_dropped(inserts):
+    inserts.fail = lambda batch: rejected() if any(r["prompt"] == "bad" for r in batch) else None
+
+    async def main():
+        buffer = HistoryWriteBuffer(flush_interval=5, max_rows=3, buffer_size=100)
+        await buffer.start()
+        for label in ("p0", "bad", "p2"):
+            await buffer.add(row(label))
+        await buffer.stop()
+
+    asyncio.run(main())
+    # One attempt for the batch, then one per row; the bad row is not retried
+    assert inserts.batches == [["p0", "bad", "p2"], ["p0"], ["bad"], ["p2"]]
+
+
+def test_stop_drains_queued_rows(inserts):
+    async def main():
+        buffer = HistoryWriteBuffer(flush_interval=10, max_rows=2, buffer_size=100)
+        await buffer.start()
+        buffer._queue.put_nowait(row("p0"))
+        buffer._queue.put_nowait(row("p1"))
+        buffer._queue.put_nowait(row("p2"))
+        await buffer.stop()
+        return buffer.depth
+
+    assert asyncio.run(main()) == 0
+    assert sorted(label for batch in inserts.batches for label in batch) == ["p0", "p1", "p2"]
+
+
+def test_add_without_a_running_buffer_writes_once_and_raises(inserts):
+    inserts.fail = lambda batch: connection_lost()
+    buffer = HistoryWriteBuffer(flush_interval=0.01, max_rows=10, buffer_size=100)
+
+    with pytest.raises(sa_exc.OperationalError):
+        asyncio.run(buffer.add(row("p0")))
+    assert inserts.batches == [["p0"]]
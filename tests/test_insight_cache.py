@@ -0,0 +1,132 @@
+# pytest tests/test_insight_cache.py
+
+import json
+import time
+import asyncio
+
+import pytest
+
+from app.services import insight_cache, qloo_service
+from app.services.insight_cache import (
+    DEFAULT_INSIGHT_TTL,
+    INSIGHT_STALE_TTL,
+    INSIGHT_TTLS,
+    acquire_refresh_lock,
+    get_cached_insight,
+    insight_cache_key,
+    insight_ttl,
+)
+
+PLACES = "/insights/?filter.type=urn:entity:place&signal.interests.tags=urn:tag:genre:jazz&filter.location.query=Paris"
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.expiries = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        self.expiries[key] = ex
+        return True
+
+
+@pytest.fixture(autouse=True)
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(insight_cache, "get_redis", lambda: fake)
+    monkeypatch.setattr(insight_cache, "redis_available", lambda: True)
+    monkeypatch.setattr(insight_cache, "QLOO_CACHE_ENABLED", True)
+    return fake
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    fetches = []
+
+    async def get_insight(endpoint):
+        fetches.append(endpoint)
+        return {"results": {"entities": [{"name": f"fresh {len(fetches)}"}]}}
+
+    monkeypatch.setattr(qloo_service, "QLOO_API_KEY", "test-key")
+    monkeypatch.setattr(qloo_service.qloo_adapter, "get_insight", get_insight)
+    return fetches
+
+
+def store(redis, endpoint, data, age):
+    redis.values[insight_cache_key(endpoint)] = json.dumps({"fetched_at": time.time() - age, "data": data})
+
+
+def test_cache_key_ignores_parameter_order_case_and_spacing():
+    variants = [
+        "/insights?filter.location.query=Paris&filter.type=urn:entity:place&signal.interests.tags=urn:tag:genre:jazz",
+        "/insights/?filter.type=URN:Entity:Place&signal.interests.tags=urn:tag:genre:jazz&filter.location.query=paris",
+        "/insights/?filter.type=urn:entity:place&signal.interests.tags=urn:tag:genre:jazz&filter.location.query=%20Paris%20",
+    ]
+
+    assert {insight_cache_key(endpoint) for endpoint in variants} == {insight_cache_key(PLACES)}
+    assert insight_cache_key(PLACES.replace("Paris", "New%20%20York")) == insight_cache_key(PLACES.replace("Paris", "new york"))
+    assert insight_cache_key(PLACES) != insight_cache_key(PLACES.replace("Paris", "Lyon"))
+    assert insight_cache_key(PLACES) != insight_cache_key(PLACES.replace("/insights/", "/v2/insights/"))
+
+
+def test_ttl_is_chosen_by_filter_type():
+    assert insight_ttl(PLACES) == INSIGHT_TTLS["urn:entity:place"]
+    assert insight_ttl("/insights/?filter.type=urn:demographics&signal.interests.tags=x") == INSIGHT_TTLS["urn:demographics"]
+    assert insight_ttl("/insights/?filter.type=urn:heatmap") == INSIGHT_TTLS["urn:heatmap"]
+    assert insight_ttl("/insights/?filter.type=urn:entity:artist") == DEFAULT_INSIGHT_TTL
+
+
+def test_entries_are_written_with_their_ttl_plus_the_stale_window(redis):
+    asyncio.run(insight_cache.set_cached_insight(PLACES, {"results": {}}))
+
+    assert redis.expiries[insight_cache_key(PLACES)] == INSIGHT_TTLS["urn:entity:place"] + INSIGHT_STALE_TTL
+
+
+def test_fresh_and_stale_entries(redis):
+    store(redis, PLACES, {"n": 1}, age=10)
+    assert asyncio.run(get_cached_insight(PLACES)) == ({"n": 1}, False)
+
+    store(redis, PLACES, {"n": 2}, age=INSIGHT_TTLS["urn:entity:place"] + 10)
+    assert asyncio.run(get_cached_insight(PLACES)) == ({"n": 2}, True)
+
+
+def test_stale_entry_is_served_and_refreshed_in_the_background(redis, fetches):
+    store(redis, PLACES, {"results": {"entities": [{"name": "old"}]}}, age=INSIGHT_TTLS["urn:entity:place"] + 10)
+
+    async def scenario():
+        served = await qloo_service.get_insight(PLACES)
+        await asyncio.gather(*qloo_service._refresh_tasks)
+        return served, await get_cached_insight(PLACES)
+
+    served, (refreshed, is_stale) = asyncio.run(scenario())
+
+    assert served == {"results": {"entities": [{"name": "old"}]}}
+    assert fetches == [PLACES]
+    assert refreshed == {"results": {"entities": [{"name": "fresh 1"}]}}
+    assert not is_stale
+
+
+def test_fresh_entry_is_served_without_a_fetch(redis, fetches):
+    store(redis, PLACES, {"results": {}}, age=10)
+
+    assert asyncio.run(qloo_service.get_insight(PLACES)) == {"results": {}}
+    assert fetches == []
+
+
+def test_refresh_lock_lets_one_refresher_through(redis, fetches):
+    async def scenario():
+        first = await acquire_refresh_lock(PLACES)
+        second = await acquire_refresh_lock(PLACES.replace("Paris", "paris"))
+        # Another replica holds the lock, so this refresh does nothing
+        await qloo_service._refresh_insight(PLACES)
+        return first, second
+
+    assert asyncio.run(scenario()) == (True, False)
+    assert fetches == []
+    assert redis.expiries[insight_cache_key(PLACES) + ":refresh"] == insight_cache.REFRESH_LOCK_SECONDS
@@ -0,0 +1,159 @@
+# pytest tests/test_itinerary_jobs.py
+
+import json
+import asyncio
+
+import pytest
+
+from app.schemas.prompt_request import PromptRequest
+from app.services import itinerary_job_service as jobs_module
+from app.services.itinerary_job_service import ItineraryJobQueue, get_job
+from app.shared.errors import AppError
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        # Statuses in the order they were written, per job
+        self.history = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.history.setdefault(key, []).append(json.loads(value)["status"])
+
+
+@pytest.fixture(autouse=True)
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(jobs_module, "get_redis", lambda: fake)
+    return fake
+
+
+def request(prompt: str = "3 days in Lisbon") -> PromptRequest:
+    return PromptRequest(prompt=prompt)
+
+
+def statuses(redis, job_id):
+    return redis.history[jobs_module.KEY_PREFIX + job_id]
+
+
+def test_job_runs_through_its_stages(monkeypatch, redis):
+    async def plan(request, on_stage=None):
+        await on_stage("extracting")
+        await on_stage("itinerary")
+        return {"itinerary": request.prompt}
+
+    monkeypatch.setattr(jobs_module, "plan_prompt_trip", plan)
+
+    async def scenario():
+        queue = ItineraryJobQueue(workers=1, queue_size=5)
+        await queue.start()
+        job = await queue.submit(request())
+        assert job["status"] == "queued"
+        await asyncio.sleep(0.05)
+        await queue.stop()
+        return await get_job(job["job_id"])
+
+    job = asyncio.run(scenario())
+
+    assert job["status"] == "succeeded"
+    assert job["stage"] == "itinerary"
+    assert job["result"] == {"itinerary": "3 days in Lisbon"}
+    assert statuses(redis, job["job_id"]) == ["queued", "running", "running", "succeeded"]
+
+
+def test_failed_job_records_the_error(monkeypatch):
+    async def plan(request, on_stage=None):
+        raise AppError("No destination found", 422)
+
+    monkeypatch.setattr(jobs_module, "plan_prompt_trip", plan)
+
+    async def scenario():
+        queue = ItineraryJobQueue(workers=1, queue_size=5)
+        await queue.start()
+        job = await queue.submit(request())
+        await asyncio.sleep(0.05)
+        await queue.stop()
+        return await get_job(job["job_id"])
+
+    job = asyncio.run(scenario())
+
+    assert job["status"] == "failed"
+    assert job["error"] == {"detail": "No destination found", "status_code": 422}
+
+
+def test_full_queue_and_stopped_queue_reject_with_503(monkeypatch):
+    started = []
+
+    async def plan(request, on_stage=None):
+        started.append(request.prompt)
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(jobs_module, "plan_prompt_trip", plan)
+    monkeypatch.setattr(jobs_module, "ITINERARY_JOB_STOP_TIMEOUT", 0.01)
+
+    async def scenario():
+        queue = ItineraryJobQueue(workers=1, queue_size=1)
+        await queue.start()
+        await queue.submit(request("first"))
+        await asyncio.sleep(0.01)
+        await queue.submit(request("second"))
+        with pytest.raises(AppError) as full:
+            await queue.submit(request("third"))
+        await queue.stop()
+        with pytest.raises(AppError) as stopped:
+            await queue.submit(request("fourth"))
+        return full.value, stopped.value
+
+    full, stopped = asyncio.run(scenario())
+
+    assert full.status_code == 503
+    assert stopped.status_code == 503
+    assert started == ["first"]
+
+
+def test_stop_interrupts_running_and_queued_jobs(monkeypatch, redis):
+    async def plan(request, on_stage=None):
+        await on_stage("extracting")
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(jobs_module, "plan_prompt_trip", plan)
+    monkeypatch.setattr(jobs_module, "ITINERARY_JOB_STOP_TIMEOUT", 0.01)
+
+    async def scenario():
+        queue = ItineraryJobQueue(workers=1, queue_size=5)
+        await queue.start()
+        running = await queue.submit(request("running"))
+        await asyncio.sleep(0.01)
+        queued = await queue.submit(request("queued"))
+        await queue.stop()
+        return await get_job(running["job_id"]), await get_job(queued["job_id"])
+
+    running, queued = asyncio.run(scenario())
+
+    for job in (running, queued):
+        assert job["status"] == "failed"
+        assert job["error"]["status_code"] == 503
+    assert statuses(redis, running["job_id"]) == ["queued", "running", "failed"]
+    assert statuses(redis, queued["job_id"]) == ["queued", "failed"]
+
+
+def test_stop_lets_running_jobs_finish_within_the_timeout(monkeypatch):
+    async def plan(request, on_stage=None):
+        await asyncio.sleep(0.05)
+        return {"itinerary": "done"}
+
+    monkeypatch.setattr(jobs_module, "plan_prompt_trip", plan)
+
+    async def scenario():
+        queue = ItineraryJobQueue(workers=1, queue_size=5)
+        await queue.start()
+        job = await queue.submit(request())
+        await asyncio.sleep(0.01)
+        await queue.stop()
+        return await get_job(job["job_id"])
+
+    assert asyncio.run(scenario())["status"] == "succeeded"
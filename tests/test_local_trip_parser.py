@@ -0,0 +1,71 @@
+# pytest tests/test_local_trip_parser.py
+
+from app.services import local_trip_parser
+from app.services.llm_service import extract_duration_days
+from app.services.local_trip_parser import parse_duration_days, parse_trip_locally
+
+def test_well_formed_prompt_is_parsed_with_high_confidence():
+    result = parse_trip_locally(
+        "I want a 5-day trip to Lisbon, into jazz music and indie bookstores, something relaxing and low budget."
+    )
+    assert result.is_confident
+    assert result.trip.destination == "Lisbon"
+    assert result.trip.duration == "5 days"
+    assert result.trip.tastes == ["jazz", "bookstores"]
+    assert result.trip.style == ["relaxing", "low budget"]
+
+def test_aliases_map_to_canonical_destination():
+    result = parse_trip_locally("NYC for three days of street food, budget trip")
+    assert result.trip.destination == "New York"
+    assert result.trip.duration == "3 days"
+
+def test_vague_prompt_is_not_trusted():
+    result = parse_trip_locally("sex")
+    assert result.confidence == 0.0
+    assert not result.is_confident
+
+def test_two_destinations_are_ambiguous():
+    result = parse_trip_locally("5 days in Paris or Rome for art, relaxing")
+    assert result.destination is None
+    assert not result.is_confident
+
+def test_duration_patterns():
+    assert parse_duration_days("a 4-day getaway") == 4
+    assert parse_duration_days("two weeks in Bali") == 14
+    assert parse_duration_days("3 nights in Porto") == 4
+    assert parse_duration_days("a long weekend") == 3
+    assert parse_duration_days("June 3 to June 8") == 6
+    assert parse_duration_days("3rd to 8th of June") == 6
+    assert parse_duration_days("somewhere warm") is None
+
+def test_articles_only_count_in_a_day_or_a_week():
+    assert parse_duration_days("a week in Bali") == 7
+    assert parse_duration_days("just a day in Rome") == 1
+    assert parse_duration_days("an amazing trip to Rome") is None
+    assert parse_duration_days("a night out in Lisbon") is None
+    assert parse_duration_days("somewhere I can surf twice a day") is None
+    assert parse_duration_days("museums, 3 times a week") is None
+
+def test_confidence_weighs_each_field():
+    assert parse_trip_locally("5 days in Lisbon for jazz, relaxing").confidence == 1.0
+
+    vague = parse_trip_locally("A weekend in Lisbon for jazz, relaxing")
+    assert vague.confidence == 0.9
+    assert vague.is_confident
+
+    no_style = parse_trip_locally("5 days in Lisbon for jazz")
+    assert no_style.confidence == 0.85
+    assert no_style.trip.style == []
+    assert not no_style.is_confident
+
+def test_threshold_can_admit_trips_without_a_style(monkeypatch):
+    monkeypatch.setattr(local_trip_parser, "LOCAL_PARSER_MIN_CONFIDENCE", 0.85)
+    assert parse_trip_locally("5 days in Lisbon for jazz").is_confident
+    assert not parse_trip_locally("Lisbon for jazz, relaxing").is_confident
+
+def test_extract_duration_days_counts_nights_and_weeks():
+    # Nights include the departure day; before the local parser only "N day" was read
+    assert extract_duration_days("3 nights in Porto") == 4
+    assert extract_duration_days("two weeks in Bali") == 14
+    assert extract_duration_days("a 4-day getaway") == 4
+    assert extract_duration_days("somewhere warm") == 5
@@ -0,0 +1,34 @@
+# pytest tests/test_log_config.py
+
+import json
+import logging
+from app.shared.log_config import DebugSamplingFilter, JsonFormatter, redact
+
+def make_record(level, msg, **extra):
+    record = logging.LogRecord("app.test", level, __file__, 1, msg, None, None)
+    record.__dict__.update(extra)
+    return record
+
+def test_redact_masks_tokens_and_secrets():
+    line = 'Authorization: Bearer abc.def {"client_secret": "s3cr3t", "code": "4/xyz"} status_code=500'
+    redacted = redact(line)
+
+    assert "abc.def" not in redacted
+    assert "s3cr3t" not in redacted
+    assert "4/xyz" not in redacted
+    assert "status_code=500" in redacted
+
+def test_json_formatter_includes_request_id_and_extra_fields():
+    record = make_record(logging.INFO, "Parsed trip data", request_id="req-1", destination="Lisbon")
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["message"] == "Parsed trip data"
+    assert entry["request_id"] == "req-1"
+    assert entry["destination"] == "Lisbon"
+    assert entry["level"] == "INFO"
+
+def test_debug_sampling_only_drops_debug_records():
+    sampler = DebugSamplingFilter(rate=0.0)
+
+    assert not sampler.filter(make_record(logging.DEBUG, "noisy"))
+    assert sampler.filter(make_record(logging.INFO, "kept"))
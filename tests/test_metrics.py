@@ -0,0 +1,36 @@
+# pytest tests/test_metrics.py
+
+import asyncio
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+from app.shared.metrics import MeteredTransport, span
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+def test_span_records_duration_and_errors():
+    before = sample("trip_stage_seconds_count", stage="test_stage")
+    errors_before = sample("trip_stage_errors_total", stage="test_stage")
+
+    with span("test_stage"):
+        pass
+    with pytest.raises(ValueError):
+        with span("test_stage"):
+            raise ValueError("boom")
+
+    assert sample("trip_stage_seconds_count", stage="test_stage") == before + 2
+    assert sample("trip_stage_errors_total", stage="test_stage") == errors_before + 1
+
+def test_metered_transport_counts_status_codes():
+    inner = httpx.MockTransport(lambda request: httpx.Response(429))
+    transport = MeteredTransport("test_upstream", inner)
+
+    async def call():
+        async with httpx.AsyncClient(transport=transport) as client:
+            await client.get("http://upstream.test/")
+
+    asyncio.run(call())
+
+    assert sample("outbound_requests_total", upstream="test_upstream", method="GET", status="429") == 1
+    assert sample("outbound_requests_in_flight", upstream="test_upstream") == 0
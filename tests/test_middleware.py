@@ -0,0 +1,64 @@
+# pytest tests/test_middleware.py
+
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from app.shared.log_config import request_id_var
+from app.shared.middleware import RequestIdMiddleware, RequestMetricsMiddleware
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+def make_app():
+    app = FastAPI()
+    api = APIRouter(prefix="/api/v1")
+    items = APIRouter()
+
+    @items.get("/history/{user_id}")
+    def history(user_id: str, request: Request):
+        return {"request_id": request.state.request_id, "logged_as": request_id_var.get()}
+
+    @items.get("/stream")
+    def stream():
+        def lines():
+            yield b"1\n"
+            yield request_id_var.get().encode() + b"\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    api.include_router(items, prefix="/sql")
+    app.include_router(api)
+    app.add_middleware(RequestMetricsMiddleware)
+    app.add_middleware(RequestIdMiddleware)
+    return app
+
+def test_metrics_are_labelled_with_the_route_template():
+    route = "/api/v1/sql/history/{user_id}"
+    before = sample("http_request_seconds_count", method="GET", route=route, status="200")
+
+    with TestClient(make_app()) as client:
+        # The value equals a literal segment of the path
+        assert client.get("/api/v1/sql/history/history").status_code == 200
+        assert client.get("/api/v1/sql/history/42").status_code == 200
+        assert client.get("/nowhere").status_code == 404
+
+    assert sample("http_request_seconds_count", method="GET", route=route, status="200") == before + 2
+    assert sample("http_request_seconds_count", method="GET", route="unmatched", status="404") >= 1
+    assert sample("http_requests_in_flight") == 0
+
+def test_request_id_is_reused_and_returned():
+    with TestClient(make_app()) as client:
+        response = client.get("/api/v1/sql/history/1", headers={"X-Request-ID": "abc"})
+        generated = client.get("/api/v1/sql/history/1")
+
+    assert response.headers["X-Request-ID"] == "abc"
+    assert response.json() == {"request_id": "abc", "logged_as": "abc"}
+    assert generated.headers["X-Request-ID"] == generated.json()["request_id"] != "abc"
+
+def test_streamed_responses_pass_through():
+    with TestClient(make_app()) as client:
+        response = client.get("/api/v1/sql/stream", headers={"X-Request-ID": "xyz"})
+
+    assert response.headers["X-Request-ID"] == "xyz"
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.text == "1\nxyz\n"
@@ -0,0 +1,16 @@
+# pytest tests/test_pagination.py
+
+import pytest
+from datetime import datetime, timezone
+from uuid import uuid4
+from app.utils.pagination import decode_cursor, encode_cursor
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 9, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    history_id = uuid4()
+
+    assert decode_cursor(encode_cursor(created_at, history_id)) == (created_at, history_id)
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
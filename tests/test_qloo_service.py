@@ -0,0 +1,79 @@
+# pytest tests/test_qloo_service.py
+
+import asyncio
+import logging
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.services import qloo_service
+from app.services.qloo_service import get_insights
+from app.shared.errors import InternalAppError
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def endpoint(name: str, delay: float) -> str:
+    return f"/insights/?filter.type=urn:entity:place&filter.location.query={name}&delay={delay}"
+
+
+@pytest.fixture
+def active(monkeypatch):
+    """Stubs get_insight: sleeps for the endpoint's `delay`, fails for `boom`."""
+    active = {"now": 0, "peak": 0}
+
+    async def get_insight(url):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        try:
+            await asyncio.sleep(float(url.rsplit("delay=", 1)[1]))
+            if "boom" in url:
+                raise InternalAppError("Qloo request error: boom")
+            return {"endpoint": url}
+        finally:
+            active["now"] -= 1
+
+    monkeypatch.setattr(qloo_service, "get_insight", get_insight)
+    return active
+
+
+def test_results_keep_the_order_of_the_endpoints(active):
+    endpoints = [endpoint("slow", 0.05), endpoint("fast", 0.0), endpoint("medium", 0.02)]
+
+    results = asyncio.run(get_insights(endpoints))
+
+    assert results == [{"endpoint": url} for url in endpoints]
+
+
+def test_concurrency_is_capped(active):
+    endpoints = [endpoint(f"city{index}", 0.01) for index in range(7)]
+
+    results = asyncio.run(get_insights(endpoints, max_concurrency=3))
+
+    assert len(results) == 7
+    assert active["peak"] == 3
+
+
+def test_timeout_yields_an_empty_result_and_is_counted(active, caplog):
+    before = sample("qloo_insight_timeouts_total", type="place")
+    endpoints = [endpoint("stuck", 1.0), endpoint("quick", 0.0)]
+
+    with caplog.at_level(logging.WARNING, logger=qloo_service.__name__):
+        results = asyncio.run(get_insights(endpoints, timeout=0.05))
+
+    assert results == [{}, {"endpoint": endpoints[1]}]
+    assert sample("qloo_insight_timeouts_total", type="place") == before + 1
+    assert "timed out" in caplog.text
+
+
+def test_other_errors_raise_unless_returned(active):
+    endpoints = [endpoint("boom", 0.0), endpoint("fine", 0.0)]
+
+    with pytest.raises(InternalAppError):
+        asyncio.run(get_insights(endpoints))
+
+    failed, fine = asyncio.run(get_insights(endpoints, return_exceptions=True))
+    assert isinstance(failed, InternalAppError)
+    assert fine == {"endpoint": endpoints[1]}
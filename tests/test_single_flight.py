@@ -0,0 +1,53 @@
+# pytest tests/test_single_flight.py
+
+import asyncio
+import pytest
+from app.shared.single_flight import SingleFlight
+
+def test_concurrent_calls_share_one_outbound_call():
+    flight = SingleFlight("test_share")
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "lisbon"
+
+    async def main():
+        return await asyncio.gather(*[flight.do("lisbon+jazz", fetch) for _ in range(5)])
+
+    assert asyncio.run(main()) == ["lisbon"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"originated": 1, "coalesced": 4, "in_flight": 0}
+
+def test_errors_reach_every_caller_and_key_is_released():
+    flight = SingleFlight("test_errors")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("qloo down")
+
+    async def main():
+        results = await asyncio.gather(*[flight.do("k", fail) for _ in range(3)], return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        with pytest.raises(RuntimeError):
+            await flight.do("k", fail)
+
+    asyncio.run(main())
+    assert flight.originated == 2
+
+def test_cancelled_caller_does_not_cancel_shared_call():
+    flight = SingleFlight("test_cancel")
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return 42
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("k", fetch))
+        second = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == 42
@@ -0,0 +1,126 @@
+# pytest tests/test_text_extractor_service.py
+import io
+import json
+import asyncio
+
+import fitz
+import pytest
+from starlette.datastructures import UploadFile
+
+from app.services import text_cache, text_extractor_service
+from app.shared.errors import AppError
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+
+@pytest.fixture(autouse=True)
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(text_cache, "get_redis", lambda: fake)
+    monkeypatch.setattr(text_cache, "redis_available", lambda: True)
+    return fake
+
+
+def make_pdf(pages: int) -> bytes:
+    doc = fitz.open()
+    for index in range(pages):
+        doc.new_page().insert_text((72, 72), f"Page number {index}")
+    return doc.tobytes()
+
+
+def extract(content: bytes, filename: str = "brochure.pdf") -> str:
+    async def run():
+        try:
+            return await text_extractor_service.extract_text_from_file(UploadFile(io.BytesIO(content), filename=filename))
+        finally:
+            text_extractor_service.extraction_pool.shutdown()
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("spool_bytes", [10 * 1024 * 1024, 1])
+def test_pdf_page_ranges_are_extracted_in_order(monkeypatch, spool_bytes):
+    monkeypatch.setattr(text_extractor_service, "TEXT_EXTRACT_PAGES_PER_TASK", 2)
+    monkeypatch.setattr(text_extractor_service, "TEXT_EXTRACT_SPOOL_BYTES", spool_bytes)
+    content = make_pdf(7)
+
+    with fitz.open(stream=content, filetype="pdf") as doc:
+        expected = "\n".join(page.get_text() for page in doc)
+
+    assert extract(content) == expected
+
+
+def test_upload_over_the_limit_is_rejected(monkeypatch):
+    monkeypatch.setattr(text_extractor_service, "TEXT_EXTRACT_MAX_UPLOAD_MB", 1)
+
+    with pytest.raises(AppError) as error:
+        extract(b"0" * (2 * 1024 * 1024))
+    assert error.value.status_code == 413
+
+
+def test_repeat_upload_is_served_from_the_cache(monkeypatch, redis):
+    content = make_pdf(3)
+    first = extract(content)
+    assert len(redis.values) == 1
+
+    def fail(*args):
+        raise AssertionError("parsed again")
+    monkeypatch.setattr(text_extractor_service, "extract_pdf", fail)
+
+    assert extract(content) == first
+
+
+def test_stream_yields_requested_pages_in_order(monkeypatch):
+    monkeypatch.setattr(text_extractor_service, "TEXT_EXTRACT_STREAM_PAGES_PER_TASK", 2)
+    upload = UploadFile(io.BytesIO(make_pdf(9)), filename="brochure.pdf")
+
+    async def run():
+        try:
+            records = await text_extractor_service.stream_text_from_file(upload, first_page=3, last_page=8)
+            return [json.loads(line) async for line in records]
+        finally:
+            text_extractor_service.extraction_pool.shutdown()
+
+    records = asyncio.run(run())
+    assert [record["page"] for record in records] == [3, 4, 5, 6, 7, 8]
+    assert records[0]["text"].strip() == "Page number 2"
+
+
+def test_stream_past_the_last_page_is_rejected():
+    upload = UploadFile(io.BytesIO(make_pdf(3)), filename="brochure.pdf")
+
+    async def run():
+        try:
+            await text_extractor_service.stream_text_from_file(upload, first_page=4)
+        finally:
+            text_extractor_service.extraction_pool.shutdown()
+
+    with pytest.raises(AppError) as error:
+        asyncio.run(run())
+    assert error.value.status_code == 416
+
+
+def test_unread_stream_releases_the_spooled_upload(monkeypatch, tmp_path):
+    monkeypatch.setattr(text_extractor_service, "TEXT_EXTRACT_SPOOL_BYTES", 1)
+    monkeypatch.setattr(text_extractor_service.tempfile, "tempdir", str(tmp_path))
+    upload = UploadFile(io.BytesIO(make_pdf(3)), filename="brochure.pdf")
+
+    async def run():
+        try:
+            records = await text_extractor_service.stream_text_from_file(upload)
+            spooled = list(tmp_path.iterdir())
+            await records.aclose()
+            return spooled
+        finally:
+            text_extractor_service.extraction_pool.shutdown()
+
+    assert len(asyncio.run(run())) == 1
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,209 @@
+# pytest tests/test_trip_extraction_service.py
+
+import json
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.schemas.tripdata import TripData
+from app.services import trip_extraction_service
+from app.services.trip_extraction_service import (
+    cache_trip,
+    extract_trip_data,
+    get_cached_trip,
+    normalize_prompt,
+    validate_and_extract_trip,
+)
+from app.shared.cache import TTLCache
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture(autouse=True)
+def trip_cache(monkeypatch):
+    cache = TTLCache(maxsize=16, ttl=60)
+    monkeypatch.setattr(trip_extraction_service, "_trip_cache", cache)
+    return cache
+
+
+def trip(prompt: str) -> TripData:
+    return TripData(destination="Lisbon", duration="5 days", tastes=["jazz"], style=["relaxing"], original_prompt=prompt)
+
+
+def test_normalize_prompt_folds_case_punctuation_and_spacing():
+    assert normalize_prompt("  5 Days in LISBON!!  Jazz,   please. ") == "5 days in lisbon jazz please"
+    assert normalize_prompt("5 days in Lisbon - jazz") == normalize_prompt("5 days in lisbon jazz")
+    assert normalize_prompt("São Paulo, 3 days") == "são paulo 3 days"
+    assert normalize_prompt("5 days in Lisbon") != normalize_prompt("6 days in Lisbon")
+
+
+def test_cached_trip_hit_and_miss():
+    hits = sample("cache_lookups_total", cache="trip_extraction", result="hit")
+    misses = sample("cache_lookups_total", cache="trip_extraction", result="miss")
+
+    assert get_cached_trip("5 days in Lisbon, jazz", "gpt-4") is None
+    cache_trip(trip("5 days in Lisbon, jazz"), "gpt-4")
+    cached = get_cached_trip("5 DAYS in lisbon jazz!", "gpt-4")
+
+    assert cached.destination == "Lisbon"
+    # The cached trip carries the prompt it was asked with
+    assert cached.original_prompt == "5 DAYS in lisbon jazz!"
+    # Entries are per model
+    assert get_cached_trip("5 days in Lisbon, jazz", "gpt-4o") is None
+    assert sample("cache_lookups_total", cache="trip_extraction", result="hit") == hits + 1
+    assert sample("cache_lookups_total", cache="trip_extraction", result="miss") == misses + 2
+
+
+def test_llm_extraction_is_cached(monkeypatch):
+    calls = []
+    # Vague enough that the local parser defers to the LLM
+    prompt = "Somewhere sunny with friends, we like jazz"
+
+    async def generate(user_input, model):
+        calls.append(user_input)
+        return json.dumps({"destination": "Lisbon", "duration": "5 days", "tastes": ["jazz"], "style": ["relaxing"]})
+
+    monkeypatch.setattr(trip_extraction_service, "generate_trip_json", generate)
+
+    first = asyncio.run(extract_trip_data(prompt, "gpt-4"))
+    second = asyncio.run(extract_trip_data(prompt.upper(), "gpt-4"))
+
+    assert calls == [prompt]
+    assert first.destination == second.destination == "Lisbon"
+    assert second.original_prompt == prompt.upper()
+
+
+def test_incomplete_trips_are_not_cached(monkeypatch):
+    calls = []
+    prompt = "Somewhere sunny with friends, we like jazz"
+
+    async def generate(user_input, model):
+        calls.append(user_input)
+        return json.dumps({"destination": "Lisbon", "duration": "", "tastes": ["jazz"], "style": []})
+
+    monkeypatch.setattr(trip_extraction_service, "generate_trip_json", generate)
+
+    asyncio.run(extract_trip_data(prompt, "gpt-4"))
+    asyncio.run(extract_trip_data(prompt, "gpt-4"))
+
+    assert len(calls) == 2
+    assert get_cached_trip(prompt, "gpt-4") is None
+
+
+def test_local_parse_is_cached(monkeypatch):
+    async def generate(user_input, model):
+        raise AssertionError("the local parser should have answered")
+
+    monkeypatch.setattr(trip_extraction_service, "generate_trip_json", generate)
+    prompt = "5 days in Lisbon for jazz, relaxing"
+
+    trip = asyncio.run(extract_trip_data(prompt, "gpt-4"))
+
+    assert trip.destination == "Lisbon"
+    assert get_cached_trip(prompt.upper(), "gpt-4").destination == "Lisbon"
+
+
+class FakeCompletions:
+    """Stands in for `client.chat.completions`, answering with the given tool calls."""
+
+    def __init__(self, *tool_calls):
+        self.tool_calls = list(tool_calls)
+        self.requests = []
+
+    async def create(self, **request):
+        self.requests.append(request)
+        message = SimpleNamespace(content=None, tool_calls=self.tool_calls or None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def report_trip(arguments) -> SimpleNamespace:
+    if not isinstance(arguments, str):
+        arguments = json.dumps(arguments)
+    return SimpleNamespace(function=SimpleNamespace(name="report_trip", arguments=arguments))
+
+
+@pytest.fixture
+def completions(monkeypatch):
+    def use(*tool_calls):
+        fake = FakeCompletions(*tool_calls)
+        monkeypatch.setattr(trip_extraction_service, "client", SimpleNamespace(chat=SimpleNamespace(completions=fake)))
+        return fake
+
+    return use
+
+
+def validate(prompt="5 days in Lisbon, jazz, relaxing"):
+    return asyncio.run(validate_and_extract_trip(prompt, "gpt-4o"))
+
+
+def test_complete_report_is_parsed_into_a_trip(completions):
+    fake = completions(report_trip({
+        "is_complete": True,
+        "destination": "Lisbon",
+        "duration": "5 days",
+        "tastes": ["jazz"],
+        "style": ["relaxing"],
+        "missing_fields": [],
+    }))
+
+    result = validate()
+
+    assert result.missing_fields == []
+    assert result.trip.destination == "Lisbon"
+    assert result.trip.original_prompt == "5 days in Lisbon, jazz, relaxing"
+    assert fake.requests[0]["tool_choice"] == {"type": "function", "function": {"name": "report_trip"}}
+
+
+def test_incomplete_report_lists_missing_fields(completions):
+    completions(report_trip({
+        "is_complete": False,
+        "destination": "Lisbon",
+        "tastes": ["jazz"],
+        "missing_fields": ["duration"],
+    }))
+
+    result = validate("Lisbon, jazz")
+
+    assert result.trip is None
+    # Empty fields count as missing even when the model does not list them
+    assert result.missing_fields == ["duration", "style"]
+
+
+def test_report_claiming_completeness_with_empty_fields_is_incomplete(completions):
+    completions(report_trip({"is_complete": True, "destination": "Lisbon", "missing_fields": []}))
+
+    assert validate().missing_fields == ["duration", "tastes", "style"]
+
+
+def test_absent_tool_call_means_everything_is_missing(completions):
+    completions()
+
+    result = validate()
+
+    assert result.trip is None
+    assert result.missing_fields == ["destination", "duration", "tastes", "style"]
+
+
+def test_malformed_arguments_are_rejected(completions):
+    completions(report_trip('{"is_complete": true, "destination": "Lis'))
+
+    with pytest.raises(ValueError):
+        validate()
+
+
+def test_wrongly_typed_fields_are_rejected(completions):
+    completions(report_trip({
+        "is_complete": True,
+        "destination": "Lisbon",
+        "duration": "5 days",
+        "tastes": "jazz",
+        "style": ["relaxing"],
+        "missing_fields": [],
+    }))
+
+    with pytest.raises(ValueError):
+        validate()
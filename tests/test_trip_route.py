@@ -0,0 +1,109 @@
+# pytest tests/test_trip_route.py
+
+import json
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import trip_route
+from app.services import trip_extraction_service
+from app.services.trip_extraction_service import extract_trip_data
+from app.shared.cache import TTLCache
+
+# Vague enough that the local parser defers to the LLM
+PROMPT = "Somewhere sunny for a while, we like jazz"
+
+
+@pytest.fixture(autouse=True)
+def trip_cache(monkeypatch):
+    monkeypatch.setattr(trip_extraction_service, "_trip_cache", TTLCache(maxsize=16, ttl=60))
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(trip_route.router, prefix="/trip")
+    return TestClient(app)
+
+
+@pytest.fixture
+def report(monkeypatch):
+    """Makes the report_trip tool call answer with the given arguments; returns the calls made."""
+    calls = []
+
+    def use(arguments: dict):
+        async def create(**request):
+            calls.append(request)
+            tool_call = SimpleNamespace(function=SimpleNamespace(name="report_trip", arguments=json.dumps(arguments)))
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=None, tool_calls=[tool_call]))])
+
+        completions = SimpleNamespace(create=create)
+        monkeypatch.setattr(trip_extraction_service, "client", SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+
+    use.calls = calls
+    return use
+
+
+def plan_trip_extracts(monkeypatch, trip: dict):
+    """Runs the plan-trip extraction (LLM path) for PROMPT, answering with `trip`."""
+    async def generate(user_input, model):
+        return json.dumps(trip)
+
+    monkeypatch.setattr(trip_extraction_service, "generate_trip_json", generate)
+    return asyncio.run(extract_trip_data(PROMPT, "gpt-4"))
+
+
+def test_incomplete_trip_from_plan_trip_is_not_served_by_extract_info(monkeypatch, client, report):
+    trip = plan_trip_extracts(monkeypatch, {"destination": "Lisbon", "duration": "", "tastes": ["jazz"], "style": []})
+    assert trip.destination == "Lisbon"
+    report({"is_complete": False, "destination": "Lisbon", "tastes": ["jazz"], "missing_fields": ["duration", "style"]})
+
+    response = client.post("/trip/extract-info", json={"prompt": PROMPT, "model": "gpt-4"})
+
+    assert response.status_code == 400
+    assert "Please provide more detail" in response.json()["detail"]
+
+
+COMPLETE = {"destination": "Lisbon", "duration": "5 days", "tastes": ["jazz"], "style": ["relaxing"]}
+
+
+def test_complete_trip_from_plan_trip_is_still_validated(monkeypatch, client, report):
+    plan_trip_extracts(monkeypatch, COMPLETE)
+    report({"is_complete": False, "destination": "Lisbon", "missing_fields": ["duration", "tastes", "style"]})
+
+    response = client.post("/trip/extract-info", json={"prompt": PROMPT, "model": "gpt-4"})
+
+    assert response.status_code == 400
+    assert len(report.calls) == 1
+
+
+def test_validated_trip_is_served_from_the_cache(client, report):
+    report({**COMPLETE, "is_complete": True, "missing_fields": []})
+
+    first = client.post("/trip/extract-info", json={"prompt": PROMPT, "model": "gpt-4"})
+    second = client.post("/trip/extract-info", json={"prompt": PROMPT.upper(), "model": "gpt-4"})
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == {**COMPLETE, "original_prompt": PROMPT}
+    assert second.json()["original_prompt"] == PROMPT.upper()
+    assert len(report.calls) == 1
+    # Other models are validated on their own
+    assert client.post("/trip/extract-info", json={"prompt": PROMPT, "model": "gpt-4-turbo"}).status_code == 200
+    assert len(report.calls) == 2
+
+
+def test_malformed_report_is_a_422(monkeypatch, client):
+    async def create(**request):
+        tool_call = SimpleNamespace(function=SimpleNamespace(name="report_trip", arguments='{"is_complete": tr'))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=None, tool_calls=[tool_call]))])
+
+    completions = SimpleNamespace(create=create)
+    monkeypatch.setattr(trip_extraction_service, "client", SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+
+    response = client.post("/trip/extract-info", json={"prompt": PROMPT, "model": "gpt-4"})
+
+    assert response.status_code == 422
+    assert "Invalid trip structure" in response.json()["detail"]
@@ -0,0 +1,27 @@
+# pytest tests/test_ttl_cache.py
+
+import time
+from app.shared.cache import TTLCache
+
+def test_returns_value_until_ttl_expires():
+    cache = TTLCache(maxsize=10, ttl=0.05)
+    cache.set("lisbon", ["sunny"])
+    assert cache.get("lisbon") == ["sunny"]
+    time.sleep(0.06)
+    assert cache.get("lisbon") is None
+
+def test_per_entry_ttl_overrides_default():
+    cache = TTLCache(maxsize=10, ttl=0.01)
+    cache.set("kyoto", "rain", ttl=60)
+    time.sleep(0.02)
+    assert "kyoto" in cache
+
+def test_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
@@ -0,0 +1,116 @@
+# pytest tests/test_user_cache.py
+
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.base import Base
+from app.models.user import User
+from app.repositories.user_repo import UserRepository
+from app.schemas.user import CurrentUser, UserCreate
+from app.services import user_cache
+from app.shared.cache import TTLCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+
+def current_user(email: str = "ada@example.com", name: str = "Ada") -> CurrentUser:
+    return CurrentUser(id=uuid.uuid4(), name=name, email=email, google_id="g-1")
+
+
+@pytest.fixture(autouse=True)
+def local_cache(monkeypatch):
+    cache = TTLCache(maxsize=2, ttl=60)
+    monkeypatch.setattr(user_cache, "_users", cache)
+    monkeypatch.setattr(user_cache, "USER_CACHE_REDIS", False)
+    return cache
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(user_cache, "USER_CACHE_REDIS", True)
+    monkeypatch.setattr(user_cache, "get_redis", lambda: fake)
+    monkeypatch.setattr(user_cache, "redis_available", lambda: True)
+    return fake
+
+
+def test_local_tier_expires_and_evicts(local_cache):
+    async def main():
+        await user_cache.cache_user(current_user("a@example.com"))
+        await user_cache.cache_user(current_user("b@example.com"))
+        local_cache.set("b@example.com", current_user("b@example.com"), ttl=0)
+        await user_cache.cache_user(current_user("c@example.com"))
+        await user_cache.cache_user(current_user("d@example.com"))
+        return [await user_cache.get_cached_user(f"{name}@example.com") for name in "abcd"]
+
+    a, b, c, d = asyncio.run(main())
+    assert a is None  # evicted, least recently used
+    assert b is None  # expired
+    assert c.email == "c@example.com" and d.email == "d@example.com"
+
+
+def test_redis_tier_refills_the_local_cache(local_cache, redis):
+    user = current_user()
+
+    async def main():
+        await user_cache.cache_user(user)
+        local_cache.clear()
+        return await user_cache.get_cached_user(user.email)
+
+    assert asyncio.run(main()) == user
+    assert user.email in local_cache
+    # Keys do not carry the email address
+    assert all(user.email not in key for key in redis.values)
+
+
+def test_changes_are_invalidated_on_commit_only(local_cache, redis):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def main():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all, tables=[User.__table__])
+
+        async with sessions() as session:
+            created = await UserRepository(session).create(UserCreate(name="Ada", email="ada@example.com", google_id="g-1"))
+            await session.commit()
+
+        stale = CurrentUser.model_validate(created)
+        await user_cache.cache_user(stale)
+
+        async with sessions() as session:
+            await UserRepository(session).update(created.id, name="Ada Lovelace")
+            still_cached_before_commit = await user_cache.get_cached_user("ada@example.com")
+            await session.rollback()
+        cached_after_rollback = await user_cache.get_cached_user("ada@example.com")
+
+        async with sessions() as session:
+            await UserRepository(session).update(created.id, name="Ada Lovelace")
+            await session.commit()
+        await asyncio.sleep(0)  # let the scheduled Redis delete run
+        cached_after_commit = await user_cache.get_cached_user("ada@example.com")
+
+        await engine.dispose()
+        return still_cached_before_commit, cached_after_rollback, cached_after_commit
+
+    before_commit, after_rollback, after_commit = asyncio.run(main())
+    assert before_commit.name == "Ada"
+    assert after_rollback.name == "Ada"
+    assert after_commit is None
+    assert redis.values == {}
@@ -0,0 +1,54 @@
+# pytest tests/test_weather_service.py
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import weather_service
+from app.services.weather_service import fetch_weather_forecast
+from app.shared.cache import TTLCache
+
+FORECAST = {
+    "list": [
+        {"dt_txt": "2025-09-01 09:00:00", "weather": [{"description": "light rain"}], "main": {"temp": 18.0}},
+        {"dt_txt": "2025-09-01 12:00:00", "weather": [{"description": "clear sky"}], "main": {"temp": 24.5}},
+        {"dt_txt": "2025-09-02 12:00:00", "weather": [{"description": "few clouds"}], "main": {"temp": 22.1}},
+    ]
+}
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    monkeypatch.setattr(weather_service, "_forecast_cache", TTLCache(maxsize=16, ttl=60))
+
+    def respond(response: httpx.Response):
+        monkeypatch.setattr(
+            weather_service.weather_client,
+            "client",
+            httpx.AsyncClient(transport=httpx.MockTransport(lambda request: response)),
+        )
+
+    return respond
+
+
+def test_forecast_lists_noon_entries(upstream):
+    upstream(httpx.Response(200, json=FORECAST))
+
+    forecast = asyncio.run(fetch_weather_forecast("Lisbon", "2 days in Lisbon"))
+
+    assert forecast == "2025-09-01: Clear Sky, 24.5°C\n2025-09-02: Few Clouds, 22.1°C"
+
+
+def test_unknown_city_is_unavailable_not_an_error(upstream):
+    upstream(httpx.Response(404, json={"cod": "404", "message": "city not found"}))
+
+    assert asyncio.run(fetch_weather_forecast("Atlantis", "2 days in Atlantis")) == "Weather data unavailable."
+
+
+def test_other_upstream_errors_are_reported(upstream):
+    upstream(httpx.Response(401, json={"cod": 401, "message": "Invalid API key"}))
+
+    forecast = asyncio.run(fetch_weather_forecast("Lisbon", "2 days in Lisbon"))
+
+    assert forecast == "⚠️ Error fetching weather: Invalid API key"
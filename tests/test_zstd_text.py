@@ -0,0 +1,14 @@
+# pytest tests/test_zstd_text.py
+
+from app.models.types import ZstdText
+
+def test_zstd_text_round_trip_and_compresses():
+    itinerary = "## Day 1\n\nMorning: jazz at **Hot Clube** in Lisbon. 🎷\n" * 40
+    column_type = ZstdText()
+
+    stored = column_type.process_bind_param(itinerary, None)
+
+    assert isinstance(stored, bytes)
+    assert len(stored) * 5 < len(itinerary.encode())
+    assert column_type.process_result_value(stored, None) == itinerary
+    assert column_type.process_bind_param(None, None) is None